@@ -0,0 +1,77 @@
+from random import Random
+
+'''
+Decisions an agent can make.
+'''
+FOLD = 'f'
+CALL = 'c'
+RAISE = 'r'
+
+'''
+Strategy interface. The game asks a player's agent for every decision instead of calling input().
+'''
+class Agent(object):
+
+	'''
+	Called when the player is dealt a hand.
+	'''
+	def see_hand(self, player, hand):
+		pass
+
+	'''
+	Return a (decision, raise_by) tuple: decision is FOLD, CALL or RAISE and raise_by is only used to raise.
+	'''
+	def decide(self, player, curr_round, amount_to_call):
+		raise NotImplementedError('Agents must implement decide')
+
+'''
+Agent for a human at the terminal.
+'''
+class HumanAgent(Agent):
+
+	def see_hand(self, player, hand):
+		input('Player ' + str(player.id) + ', press enter to see your hand')
+		print('Player', player.id, 'your hand is', hand)
+		input('Press enter when you\'re ready to move on')
+		print('\n' * 50)
+
+	def decide(self, player, curr_round, amount_to_call):
+		res = input('Would you like to fold, call, or raise? (f/c/r) ')
+		if res == CALL:
+			return CALL, 0
+		elif res == RAISE:
+			raise_by = input('How much would you like to raise? ')
+			return RAISE, int(raise_by)
+		else: # assume 'f'
+			return FOLD, 0
+
+'''
+Agent that always calls.
+'''
+class CallingStationAgent(Agent):
+
+	def decide(self, player, curr_round, amount_to_call):
+		return CALL, 0
+
+'''
+Agent that folds, calls or raises at random. It never folds when calling is free and
+only raises what it can afford, in multiples of the minimum bid.
+'''
+class RandomAgent(Agent):
+
+	def __init__(self, seed = None, fold_probability = 0.2, raise_probability = 0.2, max_raises = 3):
+		self.rng = Random(seed)
+		self.fold_probability = fold_probability
+		self.raise_probability = raise_probability
+		self.max_raises = max_raises # largest raise, in minimum bids
+
+	def decide(self, player, curr_round, amount_to_call):
+		roll = self.rng.random()
+		if roll < self.fold_probability and amount_to_call > 0:
+			return FOLD, 0
+
+		# number of minimum bids the player can afford to raise by
+		raises = min(self.max_raises, (player.money - amount_to_call) // curr_round.minimum_bid)
+		if roll > 1 - self.raise_probability and raises > 0:
+			return RAISE, curr_round.minimum_bid * self.rng.randint(1, raises)
+		return CALL, 0
@@ -0,0 +1,301 @@
+import os
+import sys
+from multiprocessing import Pool
+import numpy as np
+from .BatchEvaluator import evaluate_batch
+from .Evaluator import CARD_BITS
+from .HandHistory import HistoryReader, RECORD, SEAT, SHOWDOWN, SHOWED, CALL, RAISE, FOLD, STREET, NO_CARD, VARIANT_NAMES
+
+'''
+Per-player statistics over recorded hand histories, in one streaming pass.
+Files are cut into chunks of records, chunks are analysed across a process pool and each worker sends
+back a small dict of PlayerStats, which are merged. Hold'em showdowns are re-scored with the batch evaluator,
+showdowns of other variants (see HandHistory.VARIANT_NAMES) with the variant's own rules.
+'''
+
+CHUNK_HANDS = 100000 # records per task
+SHOWDOWN_BATCH = 1 << 16 # showdown hands scored at once
+
+class PlayerStats(object):
+
+	def __init__(self, id_):
+		self.id = id_
+		self.hands = 0
+		self.vpip_hands = 0 # hands the player put money in preflop without being forced to
+		self.pfr_hands = 0 # hands the player raised preflop
+		self.raises = 0
+		self.calls = 0 # calls that put money in (checks are not counted)
+		self.showdowns = 0
+		self.showdown_wins = 0 # showdowns with the best hand, including split pots
+		self.net = 0
+		self.position_hands = dict() # position (0 = first left of the dealer) -> hands
+		self.position_net = dict() # position -> net winnings
+
+	def __repr__(self):
+		return 'PlayerStats(id=%r, hands=%r, vpip=%.3f, pfr=%.3f, af=%.2f, wsd=%.3f, net=%r)' % (
+			self.id, self.hands, self.vpip, self.pfr, self.aggression_factor, self.showdown_win_rate, self.net)
+
+	def merge(self, other):
+		for name in ('hands', 'vpip_hands', 'pfr_hands', 'raises', 'calls', 'showdowns', 'showdown_wins', 'net'):
+			setattr(self, name, getattr(self, name) + getattr(other, name))
+		for position, hands in other.position_hands.items():
+			self.position_hands[position] = self.position_hands.get(position, 0) + hands
+			self.position_net[position] = self.position_net.get(position, 0) + other.position_net[position]
+		return self
+
+	@property
+	def vpip(self):
+		return self.vpip_hands / self.hands if self.hands else 0.0
+
+	@property
+	def pfr(self):
+		return self.pfr_hands / self.hands if self.hands else 0.0
+
+	'''
+	Raises per call. Infinite for a player who raised but never called.
+	'''
+	@property
+	def aggression_factor(self):
+		if self.calls == 0:
+			return float('inf') if self.raises else 0.0
+		return self.raises / self.calls
+
+	@property
+	def showdown_win_rate(self):
+		return self.showdown_wins / self.showdowns if self.showdowns else 0.0
+
+	'''
+	Return {position: (hands, net winnings)}.
+	'''
+	@property
+	def net_by_position(self):
+		return {position: (self.position_hands[position], self.position_net[position]) for position in sorted(self.position_hands)}
+
+'''
+Return the stats of player id_, adding them to stats if needed.
+'''
+def player_stats(stats, id_):
+	player = stats.get(id_)
+	if player is None:
+		player = stats[id_] = PlayerStats(id_)
+	return player
+
+'''
+Showdown hands waiting to be scored: one row of 7 card codes per shown hand, with rows of a hand kept together.
+When the buffer fills up every row is scored in one evaluate_batch call and the best rows of each hand win.
+'''
+class ShowdownBatch(object):
+
+	def __init__(self, stats, size = SHOWDOWN_BATCH):
+		self.stats = stats
+		self.codes = np.empty((size, 7), dtype=np.int64)
+		self.owners = np.empty(size, dtype=np.int64) # player id of each row
+		self.starts = [] # first row of each hand
+		self.rows = 0
+
+	def add_hand(self, shown, board):
+		if self.rows + len(shown) > len(self.owners):
+			self.flush()
+		self.starts.append(self.rows)
+		for id_, hole in shown:
+			self.codes[self.rows] = (hole[0], hole[1], *board)
+			self.owners[self.rows] = id_
+			self.rows += 1
+
+	def flush(self):
+		if not self.rows:
+			return
+		ranks = evaluate_batch(self.codes[:self.rows])
+		starts = np.array(self.starts)
+		best = np.maximum.reduceat(ranks, starts)
+		hand_of_row = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, self.rows)))
+		owners = self.owners[:self.rows]
+		shown = np.bincount(owners)
+		won = np.bincount(owners[ranks == best[hand_of_row]], minlength=len(shown))
+		for id_ in np.flatnonzero(shown):
+			player = player_stats(self.stats, int(id_))
+			player.showdowns += int(shown[id_])
+			player.showdown_wins += int(won[id_])
+		self.starts = []
+		self.rows = 0
+
+'''
+Score a showdown hand by hand with a variant's rules, as ShowdownBatch does for hold'em.
+'''
+def score_showdown(stats, variant, shown, board):
+	board_bits = [CARD_BITS[code] for code in board if code != NO_CARD]
+	ranks = [variant.evaluate([CARD_BITS[code] for code in hole if code != NO_CARD], board_bits) for id_, hole in shown]
+	best = max(ranks)
+	for (id_, hole), rank in zip(shown, ranks):
+		player = player_stats(stats, id_)
+		player.showdowns += 1
+		player.showdown_wins += rank == best
+
+_readers = {} # path -> ((size, mtime), HistoryReader), so a process maps each file once
+
+'''
+Return a reader of the file at path, reopening it when the file has changed since it was mapped
+(a reader of a file that has grown would not see the new records).
+'''
+def _reader(path):
+	stat = os.stat(path)
+	version = (stat.st_size, stat.st_mtime_ns)
+	cached = _readers.get(path)
+	if cached is None or cached[0] != version:
+		if cached is not None:
+			cached[1].close()
+		_readers[path] = (version, HistoryReader(path))
+	return _readers[path][1]
+
+def _close_readers():
+	for version, reader in _readers.values():
+		reader.close()
+	_readers.clear()
+
+'''
+Analyse the records of one file from offset start up to offset end. Return {player id: PlayerStats}.
+'''
+def analyze_chunk(path, start = None, end = None):
+	reader = _reader(path)
+	map_ = reader.map
+	stats = dict()
+	showdowns = ShowdownBatch(stats)
+	variants = dict() # variant index -> Variant, for hands not played as hold'em
+	for offset in reader.offsets(start, end):
+		length, seed, seat_count, flags, street, variant, board = RECORD.unpack_from(map_, offset)
+		players = []
+		shown = []
+		for position in range(seat_count):
+			id_, stack, hole, net, result = SEAT.unpack_from(map_, offset + RECORD.size + position * SEAT.size)
+			player = player_stats(stats, id_)
+			player.hands += 1
+			player.net += net
+			player.position_hands[position] = player.position_hands.get(position, 0) + 1
+			player.position_net[position] = player.position_net.get(position, 0) + net
+			players.append(player)
+			if result & SHOWED:
+				shown.append((id_, hole))
+
+		# walk the action stream (see HandHistory), decoding the varints in place
+		actions = map_[offset + RECORD.size + seat_count * SEAT.size:offset + length]
+		voluntary = set()
+		raised = set()
+		street, i = 0, 0
+		while i < len(actions):
+			value = actions[i]
+			i += 1
+			if value >= 0x80: # seat << 3 | kind only needs a second byte past 16 seats
+				value, shift = value & 0x7F, 7
+				while actions[i - 1] >= 0x80:
+					value |= (actions[i] & 0x7F) << shift
+					i += 1
+					shift += 7
+			position, kind = value >> 3, value & 7
+			if kind == STREET:
+				street = position
+				continue
+			if kind == FOLD:
+				continue
+			amount = 0
+			shift = 0
+			while True:
+				byte = actions[i]
+				i += 1
+				amount |= (byte & 0x7F) << shift
+				if byte < 0x80:
+					break
+				shift += 7
+			if kind == RAISE:
+				players[position].raises += 1
+				if street == 0:
+					voluntary.add(position)
+					raised.add(position)
+			elif kind == CALL and amount:
+				players[position].calls += 1
+				if street == 0:
+					voluntary.add(position)
+		for position in voluntary:
+			players[position].vpip_hands += 1
+		for position in raised:
+			players[position].pfr_hands += 1
+
+		if flags & SHOWDOWN and shown:
+			if variant == 0:
+				showdowns.add_hand(shown, board)
+			else:
+				if variant not in variants:
+					from .Variant import VARIANTS
+					variants[variant] = VARIANTS[VARIANT_NAMES[variant]]()
+				score_showdown(stats, variants[variant], shown, board)
+	showdowns.flush()
+	return stats
+
+def _analyze_task(args):
+	return analyze_chunk(*args)
+
+# build the evaluator tables when a worker starts rather than in its first chunk
+def _warm_worker():
+	evaluate_batch(np.arange(7).reshape(1, 7))
+
+'''
+Cut the files into (path, start, end) chunks of about chunk_hands records, reading only the record lengths.
+'''
+def chunks(paths, chunk_hands = CHUNK_HANDS):
+	for path in paths:
+		with HistoryReader(path) as reader:
+			start, hands = None, 0
+			for offset in reader.offsets():
+				if start is None:
+					start = offset
+				hands += 1
+				if hands == chunk_hands:
+					yield path, start, offset + RECORD.unpack_from(reader.map, offset)[0]
+					start, hands = None, 0
+			if start is not None:
+				yield path, start, len(reader.map)
+
+'''
+Analyse every hand in the history files. Return {player id: PlayerStats}.
+Chunks run across a process pool; with processes=0 they run in the calling process.
+'''
+def analyze(paths, processes = None, chunk_hands = CHUNK_HANDS):
+	totals = dict()
+	if processes == 0:
+		try:
+			for chunk in chunks(paths, chunk_hands):
+				merge_stats(totals, analyze_chunk(*chunk))
+		finally:
+			_close_readers()
+		return totals
+	with Pool(processes, initializer=_warm_worker) as pool:
+		for partial in pool.imap_unordered(_analyze_task, chunks(paths, chunk_hands)):
+			merge_stats(totals, partial)
+	return totals
+
+def merge_stats(totals, partial):
+	for id_, stats in partial.items():
+		if id_ in totals:
+			totals[id_].merge(stats)
+		else:
+			totals[id_] = stats
+	return totals
+
+'''
+Return a text table of the stats, one row per player, then net winnings by position.
+'''
+def report(stats):
+	lines = ['%6s %10s %6s %6s %6s %6s %10s' % ('player', 'hands', 'vpip', 'pfr', 'af', 'wsd', 'net')]
+	for id_ in sorted(stats):
+		player = stats[id_]
+		lines.append('%6d %10d %6.3f %6.3f %6.2f %6.3f %10d' % (id_, player.hands, player.vpip, player.pfr,
+			player.aggression_factor, player.showdown_win_rate, player.net))
+	lines.append('')
+	lines.append('net winnings by position (0 = first left of the dealer)')
+	for id_ in sorted(stats):
+		lines.append('%6d  ' % id_ + '  '.join('%d: %d/%d' % (position, net, hands)
+			for position, (hands, net) in stats[id_].net_by_position.items()))
+	return '\n'.join(lines)
+
+if __name__ == '__main__':
+	# python -m poker.Analytics history files...
+	print(report(analyze(sys.argv[1:])))
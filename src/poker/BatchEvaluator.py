@@ -0,0 +1,113 @@
+import itertools
+import os
+import numpy as np
+from .Evaluator import CARD_BITS, FLUSH_BEST, PRODUCTS, UNIQUE5, TABLES_PATH, TABLES_VERSION
+
+'''
+Vectorized hand evaluation for large arrays of hands.
+
+Hands are rows of card codes (0-51, (value - 2) * 4 + suit index, as in Evaluator.CARD_BITS)
+and every row gets the same rank Evaluator.evaluate would give it.
+
+The table of non-flush ranks takes about half a second to build, so it is built on the first evaluation,
+saved next to the evaluator's tables and memory-mapped from there by every later process.
+'''
+
+SUIT_OF_CODE = np.arange(52, dtype=np.int64) % 4
+PRIME_OF_CODE = np.array([bits & 0xFF for bits in CARD_BITS], dtype=np.int64)
+RANK_BIT_OF_CODE = np.array([bits >> 16 for bits in CARD_BITS], dtype=np.int64)
+FLUSH_BEST_ARRAY = np.array(FLUSH_BEST, dtype=np.int32)
+UNIQUE5_ARRAY = np.array(UNIQUE5, dtype=np.int32)
+PAIRED_KEYS = np.array(sorted(PRODUCTS), dtype=np.int64)
+PAIRED_RANKS = np.array([PRODUCTS[key] for key in sorted(PRODUCTS)], dtype=np.int32)
+CHUNK_SIZE = 1 << 20 # rows evaluated at a time, bounds temporary memory
+NONFLUSH_PATH = os.path.join(os.path.dirname(TABLES_PATH), 'nonflush_ranks_v%d.npy' % TABLES_VERSION)
+
+_nonflush_keys = None # sorted prime products of every 5, 6 and 7-card rank multiset
+_nonflush_ranks = None # best non-flush rank for each key
+
+'''
+Return the ranks of rank-only 5-card hands (no flushes), given M x 5 arrays of rank bits and primes.
+'''
+def _rank5_nonflush(rank_bits, primes):
+	ranks = UNIQUE5_ARRAY[np.bitwise_or.reduce(rank_bits, axis=1)]
+	products = np.prod(primes, axis=1)
+	index = np.minimum(np.searchsorted(PAIRED_KEYS, products), len(PAIRED_KEYS) - 1)
+	return np.where(ranks > 0, ranks, PAIRED_RANKS[index])
+
+'''
+Build the table of best non-flush ranks for every multiset of 5, 6 or 7 ranks (at most 4 of each):
+a 2 x M array of the sorted prime products of the multisets and their ranks.
+'''
+def _build_nonflush_table():
+	keys, ranks = [], []
+	for n in (5, 6, 7):
+		multisets = np.array([ms for ms in itertools.combinations_with_replacement(range(13), n)
+			if max(ms.count(r) for r in set(ms)) <= 4], dtype=np.int64)
+		rank_bits, primes = np.left_shift(1, multisets), PRIME_OF_CODE[multisets * 4]
+		best = np.zeros(len(multisets), dtype=np.int32)
+		for columns in itertools.combinations(range(n), 5):
+			columns = list(columns)
+			best = np.maximum(best, _rank5_nonflush(rank_bits[:, columns], primes[:, columns]))
+		keys.append(np.prod(primes, axis=1))
+		ranks.append(best)
+
+	keys, ranks = np.concatenate(keys), np.concatenate(ranks)
+	order = np.argsort(keys)
+	return np.stack([keys[order], ranks[order].astype(np.int64)])
+
+'''
+Memory-map the non-flush table from path, or build it and write it there when it is missing or unreadable
+(a directory that cannot be written just leaves the table in memory).
+'''
+def _load_nonflush_table(path = NONFLUSH_PATH):
+	global _nonflush_keys, _nonflush_ranks
+	try:
+		table = np.load(path, mmap_mode='r')
+		if table.ndim != 2 or len(table) != 2 or table.dtype != np.int64:
+			raise ValueError('%s is not a non-flush rank table' % path)
+	except (OSError, ValueError):
+		table = _build_nonflush_table()
+		temporary = '%s.%d.tmp' % (path, os.getpid())
+		try:
+			os.makedirs(os.path.dirname(path), exist_ok=True)
+			with open(temporary, 'wb') as f:
+				np.save(f, table)
+			os.replace(temporary, path)
+		except OSError:
+			pass
+	_nonflush_keys, _nonflush_ranks = table[0], table[1]
+
+'''
+Return the ranks of an N x k array of card codes (k = 5, 6 or 7) as an array of N integers.
+Each hand must hold k distinct cards; one with 5 or more cards of a rank raises ValueError.
+'''
+def evaluate_batch(codes):
+	codes = np.asarray(codes, dtype=np.int64)
+	if codes.ndim != 2 or not 5 <= codes.shape[1] <= 7:
+		raise ValueError('Hands must be an N x 5, N x 6 or N x 7 array of card codes')
+	if _nonflush_keys is None:
+		_load_nonflush_table()
+
+	ranks = np.empty(len(codes), dtype=np.int32)
+	for start in range(0, len(codes), CHUNK_SIZE):
+		ranks[start:start + CHUNK_SIZE] = _evaluate_chunk(codes[start:start + CHUNK_SIZE])
+	return ranks
+
+def _evaluate_chunk(codes):
+	suits = SUIT_OF_CODE[codes]
+	rank_bits = RANK_BIT_OF_CODE[codes]
+
+	# a suit holding 5 or more cards makes the best hand on its own
+	flush_ranks = np.zeros(len(codes), dtype=np.int32)
+	for suit in range(4):
+		suit_mask = np.bitwise_or.reduce(np.where(suits == suit, rank_bits, 0), axis=1)
+		flush_ranks = np.maximum(flush_ranks, FLUSH_BEST_ARRAY[suit_mask])
+
+	products = np.prod(PRIME_OF_CODE[codes], axis=1)
+	index = np.minimum(np.searchsorted(_nonflush_keys, products), len(_nonflush_keys) - 1)
+	# every hand of distinct cards holds at most 4 of a rank, so its product is a key
+	if not np.array_equal(_nonflush_keys[index], products):
+		row = int(np.argmax(_nonflush_keys[index] != products))
+		raise ValueError('Hand %r repeats a card' % codes[row].tolist())
+	return np.where(flush_ranks > 0, flush_ranks, _nonflush_ranks[index])
@@ -0,0 +1,224 @@
+import itertools
+import random
+import time
+from .Deck import Deck
+from .Hand import Hand, FinalHand
+from .Evaluator import encode, evaluate5
+
+'''
+Benchmarks for the hot paths of the game. Run with: python -m poker.Benchmark
+'''
+
+'''
+Hand scoring as FinalHand.score_hand did it before the lookup tables, kept as a reference point.
+'''
+def legacy_score_hand(hand):
+	score = 0
+
+	# pre-calculate all hand possibilities
+	royal_flush = hand.royal_flush()
+	straight_flush = hand.straight_flush()
+	four_of_a_kind, kind = hand.four_of_a_kind()
+	full_house, highest_rank = hand.four_of_a_kind()
+	flush, high_card = hand.flush()
+	straight, high_card = hand.straight()
+	three_of_a_kind, kind = hand.three_of_a_kind()
+	two_pair, high_pair = hand.two_pair()
+	one_pair, pair = hand.one_pair()
+	highest_card = hand.high_card()
+
+	# calculate hand score
+	if royal_flush:
+		score += 10
+	elif straight_flush:
+		score += 9 + (highest_card / 100)
+	elif four_of_a_kind:
+		score += 8 + (kind / 100)
+	elif full_house:
+		score += 7 + (highest_rank / 100)
+	elif flush:
+		score += 6 + (high_card / 100)
+	elif straight:
+		score += 5 + (high_card / 100)
+	elif three_of_a_kind:
+		score += 4 + (kind / 100)
+	elif two_pair:
+		score += 3 + (high_pair / 100) + (highest_card / 1000)
+	elif one_pair:
+		score += 2 + (pair / 100) + (highest_card / 1000)
+	else:
+		score += 1 + (hand.high_card() / 100)
+
+	return score
+
+'''
+Return n random 5-card hands (lists of Card objects) drawn with a fixed seed.
+'''
+def random_hands(n, seed = 0):
+	rng = random.Random(seed)
+	cards = Deck().cards
+	return [rng.sample(cards, 5) for i in range(n)]
+
+'''
+Return the seconds taken by func over every hand.
+'''
+def time_hands(func, hands):
+	start = time.perf_counter()
+	for hand in hands:
+		func(hand)
+	return time.perf_counter() - start
+
+def bench_score_hand(n = 20000, seed = 0):
+	hands = random_hands(n, seed)
+	encoded = [[encode(card) for card in hand] for hand in hands]
+
+	legacy = time_hands(lambda cards: legacy_score_hand(FinalHand(cards)), hands)
+	final_hand = time_hands(lambda cards: FinalHand(cards).score_hand(), hands)
+	tables = time_hands(lambda codes: evaluate5(*codes), encoded)
+
+	print('5-card hand scoring (%d hands)' % n)
+	print(' - legacy score_hand:    %7.2f us/hand' % (legacy / n * 1e6))
+	print(' - FinalHand.score_hand: %7.2f us/hand (%.1fx)' % (final_hand / n * 1e6, legacy / final_hand))
+	print(' - evaluate5:            %7.2f us/hand (%.1fx)' % (tables / n * 1e6, legacy / tables))
+
+def bench_score_hands(n = 5000, seed = 0):
+	rng = random.Random(seed)
+	cards = Deck().cards
+	deals = [rng.sample(cards, 7) for i in range(n)]
+
+	# scoring all 21 combinations the way Hand.score_hands used to
+	legacy = time_hands(lambda cards: max(FinalHand(list(hand)).score_hand() for hand in itertools.combinations(cards, 5)), deals)
+	single_pass = time_hands(lambda cards: Hand(cards[:2]).score(cards[2:]), deals)
+
+	print('7-card hand scoring (%d hands)' % n)
+	print(' - 21 FinalHands:        %7.2f us/hand' % (legacy / n * 1e6))
+	print(' - Hand.score:           %7.2f us/hand (%.1fx)' % (single_pass / n * 1e6, legacy / single_pass))
+
+'''
+Return an n x size array of random card codes without repeated cards in a row.
+'''
+def random_codes(rng, n, size, chunk = 100000):
+	import numpy as np
+	# first columns of a random permutation of each row
+	return np.concatenate([np.argsort(rng.random((min(chunk, n - i), 52)), axis=1)[:, :size] for i in range(0, n, chunk)])
+
+'''
+Time the batch evaluator on random hands (tests/test_batch_evaluator.py checks its ranks against the scalar evaluator).
+'''
+def bench_batch(n = 1000000, seed = 0):
+	import numpy as np
+	from .BatchEvaluator import evaluate_batch
+
+	rng = np.random.default_rng(seed)
+	for size in (5, 6, 7):
+		codes = random_codes(rng, n, size)
+		evaluate_batch(codes[:1]) # build tables outside the timing
+
+		start = time.perf_counter()
+		ranks = evaluate_batch(codes)
+		elapsed = time.perf_counter() - start
+		print('Batch %d-card scoring (%d hands): %.3f s, %.0f hands/s' % (size, len(ranks), elapsed, len(ranks) / elapsed))
+
+'''
+Time complete headless rounds for tables of calling stations and random agents.
+'''
+def bench_simulate(n = 20000, players = 6, seed = 0):
+	from .Agent import CallingStationAgent, RandomAgent
+	from .Poker import simulate
+
+	for name, agents in [('calling station', [CallingStationAgent() for i in range(players)]),
+			('random', [RandomAgent(seed + i) for i in range(players)])]:
+		start = time.perf_counter()
+		hands = simulate(n, agents, seed=seed)
+		elapsed = time.perf_counter() - start
+		print('Headless %d-player rounds, %s agents (%d hands): %.0f hands/s' % (players, name, hands, hands / elapsed))
+
+'''
+Report how many rollouts and how tight an interval the equity calculator reaches in a 100 ms budget.
+'''
+def bench_equity(time_budget = 0.1, seed = 0):
+	from .Card import Card
+	from .Equity import EquityCalculator
+
+	hands = [[Card(14, 'Hearts'), Card(14, 'Spades')], [Card(13, 'Hearts'), Card(13, 'Clubs')]]
+	board = [Card(2, 'Hearts'), Card(7, 'Hearts'), Card(12, 'Spades')]
+	with EquityCalculator() as calculator:
+		calculator.equity(hands, samples=1000) # workers are up and warm
+		for cards in ([], board):
+			start = time.perf_counter()
+			result = calculator.equity(hands, cards, samples=10 ** 7, time_budget=time_budget, seed=seed)
+			elapsed = time.perf_counter() - start
+			print('Equity with %d board cards: %d rollouts in %.0f ms, equity %s +/- %.4f' % (len(cards), result.samples, elapsed * 1000, [round(e, 4) for e in result.equity], max(result.margins)))
+
+'''
+Compare cloning a Round's GameState with deep-copying the Round itself.
+'''
+def bench_state(n = 100000, players = 6, seed = 0):
+	import copy
+	from .Agent import CallingStationAgent
+	from .Poker import Poker, Round
+
+	game = Poker(100, seed=seed, agents=[CallingStationAgent() for i in range(players)])
+	game.initialize()
+	this_round = Round(game, game.players_left)
+	this_round.do_blinds()
+	this_round.pre_flop()
+	state = this_round.export_state()
+	rng = random.Random(seed)
+
+	start = time.perf_counter()
+	for i in range(n):
+		state.clone()
+	clone = (time.perf_counter() - start) / n
+	start = time.perf_counter()
+	for i in range(n // 1000):
+		copy.deepcopy(this_round)
+	deepcopy = (time.perf_counter() - start) / (n // 1000)
+	start = time.perf_counter()
+	for i in range(n // 100):
+		state.clone().rollout(rng).payoffs()
+	rollout = (time.perf_counter() - start) / (n // 100)
+	print('GameState.clone: %.2f us, deepcopy(Round): %.0f us (%.0fx), clone + rollout to showdown: %.0f us' % (clone * 1e6, deepcopy * 1e6, deepcopy / clone, rollout * 1e6))
+
+'''
+Time headless play with and without a HistoryWriter, then scanning and decoding the history.
+'''
+def bench_history(n = 10000, players = 6, seed = 0):
+	import os
+	import tempfile
+	from .Agent import RandomAgent
+	from .Poker import simulate
+	from .HandHistory import HistoryWriter, HistoryReader
+
+	agents = [RandomAgent(seed=i) for i in range(players)]
+	path = os.path.join(tempfile.mkdtemp(), 'bench.hh')
+	start = time.perf_counter()
+	simulate(n, agents, seed=seed)
+	plain = time.perf_counter() - start
+	with HistoryWriter(path) as writer:
+		start = time.perf_counter()
+		simulate(n, agents, seed=seed, observer=writer)
+		recorded = time.perf_counter() - start
+	with HistoryReader(path) as reader:
+		start = time.perf_counter()
+		matched = reader.count(player=1, showdown=True)
+		scan = time.perf_counter() - start
+		start = time.perf_counter()
+		for hand in reader:
+			hand.seats
+			for action in hand.actions():
+				pass
+		decode = time.perf_counter() - start
+	print('history: %.1f bytes/hand, play %.0f us/hand (%.0f us without writer), filter %.2f us/hand (%d matched), full decode %.1f us/hand' % (
+		os.path.getsize(path) / n, recorded / n * 1e6, plain / n * 1e6, scan / n * 1e6, matched, decode / n * 1e6))
+	os.remove(path)
+	os.rmdir(os.path.dirname(path))
+
+if __name__ == '__main__':
+	bench_score_hand()
+	bench_score_hands()
+	bench_batch()
+	bench_simulate()
+	bench_equity()
+	bench_state()
+	bench_history()
@@ -0,0 +1,357 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from .Benchmark import random_hands
+from .Deck import Deck
+from .Hand import Hand, FinalHand
+from .Pot import Pot
+
+'''
+Reproducible benchmarks of the hot paths, with results saved as JSON and compared between runs.
+
+	poker bench run [--save results.json] [--baseline old.json] [--only name ...]
+	poker bench startup [--repeat 15]
+	poker bench compare old.json new.json [--threshold 0.1]
+
+Every benchmark builds its inputs from a fixed seed and times repeat samples of a batch of operations.
+Results hold per-operation median and percentile timings, the peak memory traced while running one batch
+and the number of memory blocks still allocated after it. compare flags a benchmark as a regression when
+its median is more than threshold slower and the interquartile ranges of the two runs do not overlap;
+it exits with status 1 if any benchmark regressed.
+
+Startup benchmarks time what a new process pays once (importing the package and the game, and its first
+evaluations) in a fresh interpreter for every sample, and are reported and compared like the others.
+'''
+
+REPEAT = 15
+THRESHOLD = 0.1
+
+'''
+Each benchmark takes a seed and returns (run, ops): a function doing a batch of work, and the number of
+operations in the batch.
+'''
+def score_hand(seed):
+	hands = random_hands(2000, seed)
+	def run():
+		for cards in hands:
+			FinalHand(cards).score_hand()
+	return run, len(hands)
+
+def score_hands(seed):
+	rng = random.Random(seed)
+	cards = Deck().cards
+	deals = [rng.sample(cards, 7) for i in range(500)]
+	hands = [(Hand(deal[:2]), deal[2:]) for deal in deals]
+	def run():
+		for hand, board in hands:
+			hand.score_hands(board)
+	return run, len(hands)
+
+'''
+Score Omaha (4 hole cards) and short-deck hands on river boards, per hand.
+'''
+def score_variant(name):
+	def setup(seed):
+		from .Variant import VARIANTS
+		variant = VARIANTS[name]()
+		rng = random.Random(seed)
+		deals = [rng.sample(variant.cards, variant.hole_cards + 5) for i in range(500)]
+		hands = [(Hand(deal[:variant.hole_cards], variant=variant), deal[variant.hole_cards:]) for deal in deals]
+		def run():
+			for hand, board in hands:
+				hand.score(board)
+		return run, len(hands)
+	return setup
+
+def deck_create(seed):
+	def run():
+		for i in range(1000):
+			Deck(seed)
+	return run, 1000
+
+def deck_shuffle(seed):
+	deck = Deck(seed)
+	def run():
+		for i in range(1000):
+			deck.reset()
+			deck.shuffle()
+	return run, 1000
+
+'''
+Deal a 6-handed round: 2 hole cards each, then the flop, turn and river.
+'''
+def deck_deal(seed):
+	deck = Deck(seed)
+	def run():
+		for i in range(1000):
+			deck.reset()
+			for player in range(6):
+				deck.deal(2)
+			deck.deal(3)
+			deck.deal(1)
+			deck.deal(1)
+	return run, 1000
+
+'''
+A 6-handed betting round on a new Pot: blinds, a raise, calls and a fold, asking for the amount to call
+and whether the pot is balanced before every bet.
+'''
+def pot_betting(seed):
+	rng = random.Random(seed)
+	players = [object() for i in range(6)]
+	scripts = [[rng.choice('ccf') if i != 2 else 'r' for i in range(6)] for j in range(100)]
+	def run():
+		for script in scripts:
+			pot = Pot()
+			pot.add_bet(players[0], 1)
+			pot.add_bet(players[1], 2)
+			for player, decision in zip(players[2:] + players[:2], script):
+				pot.balanced()
+				to_call = pot.amount_to_call(player)
+				if decision == 'f':
+					pot.remove_player(player)
+				else:
+					pot.add_bet(player, to_call + (4 if decision == 'r' else 0))
+			while not pot.balanced():
+				for player in players:
+					if player in pot.money and not pot.is_all_in(player):
+						pot.add_bet(player, pot.amount_to_call(player))
+	return run, len(scripts)
+
+'''
+Full headless rounds (Round.play) between random agents, per hand.
+'''
+def round_play(players):
+	def setup(seed):
+		from .Agent import RandomAgent
+		from .Poker import simulate
+		hands = 2000 // players
+		def run():
+			simulate(hands, [RandomAgent(seed + i) for i in range(players)], seed=seed)
+		return run, hands
+	return setup
+
+BENCHMARKS = [
+	('score_hand', score_hand),
+	('score_hands', score_hands),
+	('score_omaha', score_variant('omaha')),
+	('score_short_deck', score_variant('short_deck')),
+	('deck_create', deck_create),
+	('deck_shuffle', deck_shuffle),
+	('deck_deal', deck_deal),
+	('pot_betting', pot_betting),
+] + [('round_play_%dp' % players, round_play(players)) for players in range(2, 11)]
+
+# (name, code) timed from the start of a new interpreter, after which the import and lookup tables are paid for
+STARTUP = [
+	('import_package', 'import poker'),
+	('import_game', 'import poker.Poker'),
+	('first_evaluate', 'from poker.Evaluator import CARD_BITS, evaluate; evaluate(CARD_BITS[:7])'),
+	('first_batch', 'import numpy as np; from poker.BatchEvaluator import evaluate_batch; evaluate_batch(np.arange(7).reshape(1, 7))'),
+]
+
+
+#####################################################################
+
+'''
+Return the q-th percentile (0-100) of sorted values, interpolating between neighbours.
+'''
+def percentile(values, q):
+	position = (len(values) - 1) * q / 100
+	low = int(position)
+	high = min(low + 1, len(values) - 1)
+	return values[low] + (values[high] - values[low]) * (position - low)
+
+'''
+Return how many more memory blocks are allocated after run() than before it.
+'''
+def retained_blocks(run):
+	gc.collect()
+	blocks = sys.getallocatedblocks()
+	run()
+	gc.collect()
+	return sys.getallocatedblocks() - blocks
+
+'''
+Time repeat samples of run and return the benchmark's result dict. Garbage collection is off while timing.
+'''
+def measure(run, ops, repeat = REPEAT):
+	run() # warm up caches and lazily built tables
+	times = []
+	gc.collect()
+	gc.disable()
+	try:
+		for i in range(repeat):
+			start = time.perf_counter()
+			run()
+			times.append((time.perf_counter() - start) / ops)
+	finally:
+		gc.enable()
+
+	tracemalloc.start()
+	run()
+	peak = tracemalloc.get_traced_memory()[1]
+	tracemalloc.stop()
+	blocks = retained_blocks(run) - retained_blocks(lambda: None) # less the measurement's own blocks
+
+	times.sort()
+	median = percentile(times, 50)
+	return {
+		'ops': ops,
+		'repeat': repeat,
+		'median': median,
+		'mean': sum(times) / len(times),
+		'min': times[0],
+		'p5': percentile(times, 5),
+		'p25': percentile(times, 25),
+		'p75': percentile(times, 75),
+		'p95': percentile(times, 95),
+		'ops_per_sec': 1 / median,
+		'peak_bytes': peak,
+		'retained_blocks': blocks,
+	}
+
+'''
+Time code in repeat fresh interpreters (after one that writes any missing table files) and return the result
+dict. Times are taken inside the interpreter, so they leave out its own start, which process_median adds back.
+'''
+def measure_startup(code, repeat = REPEAT):
+	package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+	environment = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [package_root, os.environ.get('PYTHONPATH')])))
+	script = 'import time\nstart = time.perf_counter()\n%s\nprint(time.perf_counter() - start)' % code
+	command = [sys.executable, '-c', script]
+	subprocess.run(command, env=environment, check=True, stdout=subprocess.DEVNULL)
+	times, processes = [], []
+	for i in range(repeat):
+		start = time.perf_counter()
+		output = subprocess.run(command, env=environment, check=True, stdout=subprocess.PIPE, universal_newlines=True).stdout
+		processes.append(time.perf_counter() - start)
+		times.append(float(output.split()[-1]))
+
+	times.sort()
+	median = percentile(times, 50)
+	return {
+		'ops': 1,
+		'repeat': repeat,
+		'median': median,
+		'mean': sum(times) / len(times),
+		'min': times[0],
+		'p5': percentile(times, 5),
+		'p25': percentile(times, 25),
+		'p75': percentile(times, 75),
+		'p95': percentile(times, 95),
+		'ops_per_sec': 1 / median,
+		'process_median': percentile(sorted(processes), 50),
+	}
+
+'''
+Run the benchmarks (all, or those named in only) and return the results with a description of the machine.
+'''
+def run_benchmarks(only = None, repeat = REPEAT, seed = 0, log = print):
+	results = {}
+	for name, setup in BENCHMARKS:
+		if only and name not in only:
+			continue
+		run, ops = setup(seed)
+		results[name] = measure(run, ops, repeat)
+		if log is not None:
+			log(format_result(name, results[name]))
+	for name, code in STARTUP:
+		if only and name not in only:
+			continue
+		results[name] = measure_startup(code, repeat)
+		if log is not None:
+			log(format_result(name, results[name]))
+	return {
+		'machine': {
+			'python': platform.python_version(),
+			'implementation': platform.python_implementation(),
+			'platform': platform.platform(),
+			'processor': platform.processor(),
+		},
+		'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+		'seed': seed,
+		'results': results,
+	}
+
+def format_result(name, result):
+	if 'process_median' in result:
+		return '%-16s median %10.2f ms  p5 %10.2f ms  p95 %10.2f ms  whole process %8.2f ms' % (
+			name, result['median'] * 1e3, result['p5'] * 1e3, result['p95'] * 1e3, result['process_median'] * 1e3)
+	return '%-16s median %10.2f us  p5 %10.2f us  p95 %10.2f us  %12.0f ops/s  peak %8.1f KiB  retained %d blocks' % (
+		name, result['median'] * 1e6, result['p5'] * 1e6, result['p95'] * 1e6, result['ops_per_sec'],
+		result['peak_bytes'] / 1024, result['retained_blocks'])
+
+'''
+Compare two runs. Return a list of (name, old median, new median, ratio, status) for benchmarks in both,
+where status is 'regression', 'improvement' or 'ok'.
+'''
+def compare(old, new, threshold = THRESHOLD):
+	rows = []
+	for name, result in new['results'].items():
+		if name not in old['results']:
+			continue
+		before = old['results'][name]
+		ratio = result['median'] / before['median']
+		status = 'ok'
+		if ratio > 1 + threshold and result['p25'] > before['p75']:
+			status = 'regression'
+		elif ratio < 1 - threshold and result['p75'] < before['p25']:
+			status = 'improvement'
+		rows.append((name, before['median'], result['median'], ratio, status))
+	return rows
+
+def format_comparison(rows):
+	lines = ['%-16s %12s %12s %8s' % ('benchmark', 'old (us)', 'new (us)', 'ratio')]
+	for name, before, after, ratio, status in rows:
+		lines.append('%-16s %12.2f %12.2f %7.2fx %s' % (name, before * 1e6, after * 1e6, ratio, '' if status == 'ok' else status.upper()))
+	return '\n'.join(lines)
+
+def load(path):
+	with open(path) as f:
+		return json.load(f)
+
+def main(argv = None, prog = None):
+	parser = argparse.ArgumentParser(prog=prog, description='Benchmark the hot paths of the game.')
+	commands = parser.add_subparsers(dest='command', required=True)
+	run = commands.add_parser('run', help='run the benchmarks')
+	run.add_argument('--only', nargs='+', help='names of the benchmarks to run')
+	run.add_argument('--repeat', type=int, default=REPEAT, help='timed samples per benchmark')
+	run.add_argument('--seed', type=int, default=0)
+	run.add_argument('--save', help='write the results to this JSON file')
+	run.add_argument('--baseline', help='compare with the results in this JSON file')
+	run.add_argument('--threshold', type=float, default=THRESHOLD, help='slowdown of the median that counts as a regression')
+	startup = commands.add_parser('startup', help='time imports and first evaluations in new processes')
+	startup.add_argument('--repeat', type=int, default=REPEAT, help='processes started per benchmark')
+	comparison = commands.add_parser('compare', help='compare two saved runs')
+	comparison.add_argument('old')
+	comparison.add_argument('new')
+	comparison.add_argument('--threshold', type=float, default=THRESHOLD)
+	args = parser.parse_args(argv)
+
+	if args.command == 'startup':
+		run_benchmarks([name for name, code in STARTUP], args.repeat)
+		return 0
+	if args.command == 'run':
+		new = run_benchmarks(args.only, args.repeat, args.seed)
+		if args.save:
+			with open(args.save, 'w') as f:
+				json.dump(new, f, indent=2)
+		if not args.baseline:
+			return 0
+		old = load(args.baseline)
+	else:
+		old, new = load(args.old), load(args.new)
+	rows = compare(old, new, args.threshold)
+	print(format_comparison(rows))
+	return 1 if any(status == 'regression' for name, before, after, ratio, status in rows) else 0
+
+if __name__ == '__main__':
+	sys.exit(main())
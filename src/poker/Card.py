@@ -0,0 +1,81 @@
+from .Suits import Suits
+from .FaceValues import FaceValues
+from .Evaluator import CARD_BITS, SUIT_ORDER
+
+'''
+Cards are backed by an integer code from 0 to 51 ((value - 2) * 4 + suit index).
+Only 52 Card objects ever exist: Card(value, suit) returns the interned card, so equality is identity.
+'''
+class Card(object):
+
+	__slots__ = ('code', 'value', 'suit', 'bits')
+	CARDS = [] # all 52 cards, indexed by code
+
+	def __new__(cls, value, suit):
+		if not 2 <= value <= 14 or suit not in SUIT_ORDER:
+			raise ValueError('No card has value %r and suit %r (values run from 2 to 14, suits are %s)' % (value, suit, ', '.join(SUIT_ORDER)))
+		return cls.CARDS[(value - 2) * 4 + SUIT_ORDER.index(suit)]
+
+	'''
+	Return the card with the given code.
+	'''
+	@classmethod
+	def from_code(cls, code):
+		return cls.CARDS[code]
+
+	'''
+	Return the card with the given evaluator encoding (see Evaluator.encode_card).
+	'''
+	@classmethod
+	def from_bits(cls, bits):
+		return cls.CARDS[(bits >> 8 & 0xF) * 4 + (bits >> 12 & 0xF).bit_length() - 1]
+
+	# is self greater than other?
+	def __gt__(self, other):
+		return self.value > other.value
+
+	def __hash__(self):
+		return self.code
+
+	# interned cards stay interned when pickled to other processes
+	def __reduce__(self):
+		return (Card.from_code, (self.code,))
+
+	# representation of object for developer (i.e., Card(value=4, suit='Hearts'))
+	def __repr__(self):
+		return 'Card(value=%r, suit=%r)' % (self.value, self.suit)
+
+	# representation of object for player
+	def __str__(self):
+		return str(FaceValues.FACEVALUES[self.value]) + str(self.suit_symbol)
+
+	@property
+	def suit_symbol(self):
+		return Suits.SUITS[self.suit]
+
+	# return color of card
+	def color(self):
+		return 'red' if self.suit in [Suits.HEARTS, Suits.DIAMONDS] else 'black'
+
+def _intern_cards():
+	for code, bits in enumerate(CARD_BITS):
+		card = object.__new__(Card)
+		card.code = code
+		card.value = code // 4 + 2
+		card.suit = SUIT_ORDER[code % 4]
+		card.bits = bits # evaluator encoding
+		Card.CARDS.append(card)
+
+_intern_cards()
+
+#####################################################################
+
+'''
+c = Card(4, 'Hearts')
+print(c.color())
+print(repr(c))
+print(c)
+c = Card(12, 'Clubs')
+print(c)
+'''
+
@@ -0,0 +1,80 @@
+from random import Random
+from .Card import Card
+from .Suits import Suits
+
+'''
+Deck of the 52 interned cards (or of a Variant's cards), reused from round to round.
+Cards are drawn lazily with a partial Fisher-Yates shuffle: each deal swaps a random undealt card
+to the end of the undealt part, so only the cards that are dealt ever get shuffled.
+A deck reset with the same seed deals exactly the same cards.
+'''
+class Deck(object):
+
+	card_suits = Suits.SUITS.keys()
+
+	def __init__(self, seed = None, variant = None):
+		self.rng = Random(seed) # seedable stream the deck draws from
+		self.all_cards = variant.cards if variant is not None else Card.CARDS
+		self.cards = []
+		self.remaining = 0 # cards[:remaining] are undealt
+		self.create_deck()
+
+	# initialize deck from the interned cards
+	def create_deck(self):
+		self.cards = list(self.all_cards)
+		self.remaining = len(self.cards)
+
+	'''
+	Put every card back in the deck in place, reseeding the deck's stream if a seed is given.
+	'''
+	def reset(self, seed = None):
+		self.cards[:] = self.all_cards
+		self.remaining = len(self.cards)
+		if seed is not None:
+			self.rng.seed(seed)
+
+	# return deck in class format
+	def __repr__(self):
+		return 'Deck()'
+
+	# return undealt cards in value-suit format
+	def __str__(self):
+		return str([str(card) for card in self.cards[:self.remaining]])
+
+	def __len__(self):
+		return self.remaining
+
+	'''
+	Shuffle all undealt cards. Not needed before dealing, since every deal draws a random card.
+	'''
+	def shuffle(self):
+		cards, random = self.cards, self.rng.random
+		for i in range(self.remaining - 1, 0, -1):
+			j = int(random() * (i + 1))
+			cards[i], cards[j] = cards[j], cards[i]
+
+	def deal(self, number_of_cards):
+		return self.deal_into([None] * number_of_cards)
+
+	'''
+	Deal cards into buffer[start:start + number_of_cards] (the rest of the buffer by default).
+	'''
+	def deal_into(self, buffer, start = 0, number_of_cards = None):
+		if number_of_cards is None:
+			number_of_cards = len(buffer) - start
+		if number_of_cards > self.remaining:
+			raise ValueError('Cannot deal %d cards from a deck of %d' % (number_of_cards, self.remaining))
+		cards, random, remaining = self.cards, self.rng.random, self.remaining
+		for i in range(start, start + number_of_cards):
+			j = int(random() * remaining)
+			remaining -= 1
+			cards[j], cards[remaining] = cards[remaining], cards[j]
+			buffer[i] = cards[remaining]
+		self.remaining = remaining
+		return buffer
+
+'''
+d = Deck()
+print(d)
+'''
+
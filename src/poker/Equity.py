@@ -0,0 +1,338 @@
+import itertools
+import math
+import os
+import pickle
+import time
+from collections import OrderedDict
+from multiprocessing import Pool, TimeoutError
+import numpy as np
+from .BatchEvaluator import evaluate_batch
+
+'''
+Equity of known hands against each other, with an optional partial board (the Pot's cards after the flop or turn).
+Monte Carlo rollouts are spread across a process pool; each task has its own seeded random stream and
+sends back per-player counters, not hands. When few cards are left to come, every board can be
+enumerated exactly instead, and exact results are cached under a suit-canonical key.
+'''
+
+Z_95 = 1.959964 # 95% normal quantile
+MIN_BATCH = 200 # smallest task, and the size of the first tasks of a time-budgeted query
+
+'''
+Return a card code list for a Hand or list of Card objects.
+'''
+def card_codes(cards):
+	cards = getattr(cards, 'cards', cards)
+	return [card.code for card in cards]
+
+'''
+Raise ValueError unless the hole and board card codes are all different and there are at most 5 board cards.
+'''
+def check_cards(hole_codes, board_codes):
+	if len(board_codes) > 5 or len(set(board_codes).union(*hole_codes)) != len(board_codes) + sum(map(len, hole_codes)):
+		raise ValueError('Hands and board must be distinct cards with at most 5 board cards')
+
+'''
+Run samples random rollouts and return (wins, ties, share_sum, share_squares) lists with one entry per player.
+A player's share of a rollout is 1 for a win, 1/k for a k-way tie and 0 for a loss.
+'''
+def rollouts(hole_codes, board_codes, samples, seed):
+	rng = np.random.default_rng(seed)
+	dead = set(board_codes).union(*hole_codes)
+	live = np.array([code for code in range(52) if code not in dead], dtype=np.int64)
+	needed = 5 - len(board_codes)
+
+	# deal the rest of the board: first columns of a random permutation of the live cards for every rollout
+	return score_boards(hole_codes, board_codes, live[np.argsort(rng.random((samples, len(live))), axis=1)[:, :needed]])
+
+'''
+Score every completion of the board (an array with one row of new board cards per rollout)
+and return the per-player counters described in rollouts.
+'''
+def score_boards(hole_codes, board_codes, boards):
+	samples = len(boards)
+	if board_codes:
+		boards = np.hstack([np.broadcast_to(np.array(board_codes, dtype=np.int64), (samples, len(board_codes))), boards])
+
+	ranks = np.empty((len(hole_codes), samples), dtype=np.int32)
+	for i, hole in enumerate(hole_codes):
+		hands = np.hstack([np.broadcast_to(np.array(hole, dtype=np.int64), (samples, len(hole))), boards])
+		ranks[i] = evaluate_batch(hands)
+
+	winners = ranks == ranks.max(axis=0)
+	winner_counts = winners.sum(axis=0)
+	shares = winners / winner_counts
+	return (winners[:, winner_counts == 1].sum(axis=1).tolist(),
+		winners[:, winner_counts > 1].sum(axis=1).tolist(),
+		shares.sum(axis=1).tolist(),
+		(shares * shares).sum(axis=1).tolist())
+
+def _rollouts_task(args):
+	return rollouts(*args)
+
+# build the evaluator tables when a worker starts rather than in its first query
+def _warm_worker():
+	evaluate_batch(np.arange(7).reshape(1, 7))
+
+
+##################################################################
+
+'''
+Win/tie/loss probabilities and equity of each player, with 95% confidence intervals on equity.
+'''
+class EquityResult(object):
+
+	def __init__(self, players, exact = False):
+		self.exact = exact # every board was enumerated, so there is no sampling error
+		self.samples = 0
+		self.wins = [0] * players
+		self.ties = [0] * players
+		self.share_sum = [0.0] * players
+		self.share_squares = [0.0] * players
+
+	def __repr__(self):
+		return 'EquityResult(samples=%r, equity=%r)' % (self.samples, [round(e, 4) for e in self.equity] if self.samples else None)
+
+	def add(self, samples, counters):
+		self.samples += samples
+		for total, counts in zip((self.wins, self.ties, self.share_sum, self.share_squares), counters):
+			for i, count in enumerate(counts):
+				total[i] += count
+
+	def _check_samples(self):
+		if not self.samples:
+			raise ValueError('No rollouts have been scored yet')
+
+	@property
+	def win(self):
+		self._check_samples()
+		return [wins / self.samples for wins in self.wins]
+
+	@property
+	def tie(self):
+		self._check_samples()
+		return [ties / self.samples for ties in self.ties]
+
+	@property
+	def loss(self):
+		self._check_samples()
+		return [1 - (wins + ties) / self.samples for wins, ties in zip(self.wins, self.ties)]
+
+	@property
+	def equity(self):
+		self._check_samples()
+		return [share / self.samples for share in self.share_sum]
+
+	'''
+	Half-width of the 95% confidence interval on each player's equity.
+	'''
+	@property
+	def margins(self):
+		if self.exact:
+			return [0.0] * len(self.share_sum)
+		self._check_samples()
+		margins = []
+		for share, squares in zip(self.share_sum, self.share_squares):
+			mean = share / self.samples
+			variance = max(squares / self.samples - mean * mean, 0.0)
+			margins.append(Z_95 * math.sqrt(variance / self.samples))
+		return margins
+
+	@property
+	def confidence_intervals(self):
+		return [(max(equity - margin, 0.0), min(equity + margin, 1.0)) for equity, margin in zip(self.equity, self.margins)]
+
+
+##################################################################
+
+'''
+Equity calculator keeping a process pool alive between queries, so each query only pays for its rollouts.
+With processes=0 rollouts run in the calling process.
+'''
+class EquityCalculator(object):
+
+	def __init__(self, processes = None):
+		self.workers = 1 if processes == 0 else processes or os.cpu_count()
+		self.pool = Pool(self.workers, initializer=_warm_worker) if processes != 0 else None
+		self.stale = [] # tasks a query ran out of time waiting for, still running in the pool
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc_info):
+		self.close()
+
+	def close(self):
+		if self.pool is not None:
+			self.pool.terminate()
+			self.pool = None
+
+	'''
+	Estimate equity of hands (Hand objects or lists of Cards) with the given board cards.
+	Stops after samples rollouts, after time_budget seconds, or once every equity's
+	95% confidence interval is within +/- tolerance, whichever comes first.
+	With a time budget, tasks start at MIN_BATCH rollouts and are then sized from the measured speed to
+	fit in the time left. At least one task is always waited for, so a result has some rollouts even
+	when the budget is shorter than a task.
+	'''
+	def equity(self, hands, board = (), samples = 100000, time_budget = None, tolerance = None, seed = None, batch_size = 5000):
+		hole_codes = [card_codes(hand) for hand in hands]
+		board_codes = card_codes(board)
+		check_cards(hole_codes, board_codes)
+
+		# let tasks left over from a query that ran out of time finish before this query's clock starts
+		for task_result in self.stale:
+			task_result.wait()
+		self.stale = []
+
+		result = EquityResult(len(hole_codes))
+		seeds = np.random.SeedSequence(seed) # every task gets its own child stream
+		deadline = None if time_budget is None else time.perf_counter() + time_budget
+		speed = None # rollouts per second of one worker, measured as tasks come back
+
+		while result.samples < samples:
+			size_limit = batch_size
+			if deadline is not None:
+				left = deadline - time.perf_counter()
+				size_limit = min(batch_size, MIN_BATCH if speed is None else max(MIN_BATCH, int(speed * left / 2)))
+			sizes = []
+			for i in range(self.workers):
+				size = min(size_limit, samples - result.samples - sum(sizes))
+				if size > 0:
+					sizes.append(size)
+			tasks = [(hole_codes, board_codes, size, child) for size, child in zip(sizes, seeds.spawn(len(sizes)))]
+
+			start = time.perf_counter()
+			done = 0
+			if self.pool is None:
+				for task, size in zip(tasks, sizes):
+					result.add(size, _rollouts_task(task))
+					done += size
+			else:
+				pending = [self.pool.apply_async(_rollouts_task, (task,)) for task in tasks]
+				for i, (task_result, size) in enumerate(zip(pending, sizes)):
+					# nothing back yet: wait for this task however long it takes
+					timeout = None if deadline is None or not result.samples else max(deadline - time.perf_counter(), 0)
+					try:
+						result.add(size, task_result.get(timeout))
+						done += size
+					except TimeoutError:
+						self.stale = pending[i:] # out of time, keep what has come back
+						break
+			elapsed = time.perf_counter() - start
+			if done and elapsed > 0:
+				speed = done / len(sizes) / elapsed
+
+			if deadline is not None and time.perf_counter() >= deadline:
+				break
+			if tolerance is not None and result.samples and max(result.margins) <= tolerance:
+				break
+
+		return result
+
+'''
+Estimate equity with a pool that only lives for this call. See EquityCalculator.equity.
+'''
+def equity(hands, board = (), processes = None, **options):
+	with EquityCalculator(processes) as calculator:
+		return calculator.equity(hands, board, **options)
+
+
+##################################################################
+
+'''
+Return the suit-canonical key of hole_codes (one code list per player) and board_codes:
+the smallest of the situation's 24 suit relabelings, with each hand's and the board's codes sorted.
+Situations that only differ by suits have the same equity and the same key.
+'''
+def canonical_key(hole_codes, board_codes):
+	best = None
+	for suits in itertools.permutations(range(4)):
+		key = (tuple(tuple(sorted(code - code % 4 + suits[code % 4] for code in hole)) for hole in hole_codes),
+			tuple(sorted(code - code % 4 + suits[code % 4] for code in board_codes)))
+		if best is None or key < best:
+			best = key
+	return best
+
+'''
+Bounded LRU cache of exact equity counters with hit/miss statistics.
+Given a path, the cache is loaded from it when created and written back by save().
+'''
+class EquityCache(object):
+
+	def __init__(self, maxsize = 100000, path = None):
+		self.maxsize = maxsize
+		self.path = path
+		self.entries = OrderedDict()
+		self.hits = 0
+		self.misses = 0
+		if path is not None and os.path.exists(path):
+			with open(path, 'rb') as f:
+				self.entries.update(pickle.load(f))
+			self.trim()
+
+	def __len__(self):
+		return len(self.entries)
+
+	def __repr__(self):
+		return 'EquityCache(size=%r, hits=%r, misses=%r)' % (len(self.entries), self.hits, self.misses)
+
+	def get(self, key):
+		value = self.entries.get(key)
+		if value is None:
+			self.misses += 1
+		else:
+			self.hits += 1
+			self.entries.move_to_end(key)
+		return value
+
+	def put(self, key, value):
+		self.entries[key] = value
+		self.entries.move_to_end(key)
+		self.trim()
+
+	def trim(self):
+		while len(self.entries) > self.maxsize:
+			self.entries.popitem(last=False) # least recently used
+
+	@property
+	def hit_rate(self):
+		lookups = self.hits + self.misses
+		return self.hits / lookups if lookups else 0.0
+
+	'''
+	Write the cache to its path (replacing the old file only once the new one is complete).
+	'''
+	def save(self, path = None):
+		path = path or self.path
+		with open(path + '.tmp', 'wb') as f:
+			pickle.dump(list(self.entries.items()), f, protocol=pickle.HIGHEST_PROTOCOL)
+		os.replace(path + '.tmp', path)
+
+EXACT_CACHE = EquityCache() # shared by exact_equity calls that do not pass their own cache
+
+'''
+Exact equity of hands (Hand objects or lists of Cards) with the given board cards, enumerating every
+way the board can be completed. Meant for the flop and turn, where few boards remain.
+'''
+def exact_equity(hands, board = (), cache = EXACT_CACHE):
+	hole_codes = [card_codes(hand) for hand in hands]
+	board_codes = card_codes(board)
+	check_cards(hole_codes, board_codes)
+	key = canonical_key(hole_codes, board_codes)
+	counters = cache.get(key) if cache is not None else None
+
+	if counters is None:
+		hole_codes, board_codes = [list(hole) for hole in key[0]], list(key[1])
+		dead = set(board_codes).union(*hole_codes)
+		live = [code for code in range(52) if code not in dead]
+		needed = 5 - len(board_codes)
+		boards = list(itertools.combinations(live, needed))
+		boards = np.array(boards, dtype=np.int64).reshape(len(boards), needed) # one empty row on the river
+		counters = (len(boards), score_boards(hole_codes, board_codes, boards))
+		if cache is not None:
+			cache.put(key, counters)
+
+	result = EquityResult(len(hole_codes), exact=True)
+	result.add(*counters)
+	return result
@@ -0,0 +1,366 @@
+import itertools
+import marshal
+import os
+from .Suits import Suits
+
+'''
+Table-driven evaluator for 5, 6 and 7-card hands.
+
+Every card is encoded as a 32-bit integer:
+
+	xxxbbbbb bbbbbbbb cdhsrrrr xxpppppp
+
+	p = prime number of rank (deuce=2, trey=3, four=5, ..., ace=41)
+	r = rank index of card (deuce=0, trey=1, ..., ace=12)
+	cdhs = suit bit of card
+	b = bit turned on depending on rank of card
+
+Each of the 7462 distinct 5-card hands gets an exact integer rank, from 1 (7-5-4-3-2 offsuit)
+to 7462 (royal flush). Higher ranks beat lower ranks and equal ranks split.
+
+The tables take tens of milliseconds to build, so they are saved to TABLES_PATH the first time and
+every later process (i.e. each worker of a pool) just reads them back. They are stored with marshal, which
+is built in and loads faster than pickle, whose own import would cost as much as reading the tables.
+'''
+
+PRIMES = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41]
+SUIT_ORDER = list(Suits.SUITS.keys()) # Hearts, Diamonds, Clubs, Spades
+SUIT_BITS = {suit: 0x1000 << i for i, suit in enumerate(SUIT_ORDER)}
+
+HIGH_CARD = 'High Card'
+ONE_PAIR = 'One Pair'
+TWO_PAIR = 'Two Pair'
+THREE_OF_A_KIND = 'Three of a Kind'
+STRAIGHT = 'Straight'
+FLUSH = 'Flush'
+FULL_HOUSE = 'Full House'
+FOUR_OF_A_KIND = 'Four of a Kind'
+STRAIGHT_FLUSH = 'Straight Flush'
+
+TABLES_VERSION = 1 # bump when the layout or content of the tables changes
+TABLES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'evaluator_tables.bin')
+NONFLUSH_PATH = os.path.join(os.path.dirname(TABLES_PATH), 'nonflush_best.bin')
+NONFLUSH_LOAD_AFTER = 1000 # cache misses before the complete NONFLUSH_BEST table is read in
+
+'''
+Return the evaluator encoding for a card with the given value (2-14) and suit name.
+'''
+def encode_card(value, suit):
+	r = value - 2
+	return (1 << (16 + r)) | SUIT_BITS[suit] | (r << 8) | PRIMES[r]
+
+# 52 card encodings, indexed by card code ((value - 2) * 4 + suit index)
+CARD_BITS = [encode_card(value, suit) for value in range(2, 15) for suit in SUIT_ORDER]
+
+'''
+Return the evaluator encoding for a Card object.
+'''
+def encode(card):
+	return card.bits
+
+
+#####################################################################
+
+# straights from the wheel (5-high) up to broadway (ace-high), as 13-bit rank masks
+STRAIGHTS = [0b1000000001111] + [0b11111 << i for i in range(9)]
+
+'''
+Build the lookup tables by listing every hand class from weakest to strongest.
+ranks are the rank indexes in the deck and straights its straights, weakest first. A deck with fewer ranks
+makes flushes rarer than full houses, so flush_beats_full_house swaps the two categories.
+'''
+def _build_tables(ranks = range(13), straights = STRAIGHTS, flush_beats_full_house = False):
+	flushes = [0] * 7937 # indexed by the 13-bit rank mask of a flush
+	unique5 = [0] * 7937 # indexed by the 13-bit rank mask of 5 distinct ranks
+	products = {} # prime product of a paired hand -> rank
+	category_starts = []
+
+	straight_set = set(straights)
+	distinct = sorted(sum(1 << r for r in five) for five in itertools.combinations(ranks, 5))
+	no_straights = [mask for mask in distinct if mask not in straight_set]
+
+	rank = 0
+	def next_rank(category):
+		nonlocal rank
+		if not category_starts or category_starts[-1][1] != category:
+			category_starts.append((rank + 1, category))
+		rank += 1
+		return rank
+
+	def prime_product(hand_ranks):
+		product = 1
+		for r in hand_ranks:
+			product *= PRIMES[r]
+		return product
+
+	def kickers(n, exclude):
+		# combinations of n distinct ranks, weakest first
+		others = [r for r in ranks if r not in exclude]
+		return sorted(itertools.combinations(others, n), key=lambda ks: sorted(ks, reverse=True))
+
+	def add_flushes():
+		for mask in no_straights:
+			flushes[mask] = next_rank(FLUSH)
+
+	def add_full_houses():
+		for trips in ranks:
+			for pair in (r for r in ranks if r != trips):
+				products[prime_product((trips,) * 3 + (pair,) * 2)] = next_rank(FULL_HOUSE)
+
+	for mask in no_straights:
+		unique5[mask] = next_rank(HIGH_CARD)
+	for pair in ranks:
+		for ks in kickers(3, (pair,)):
+			products[prime_product((pair, pair) + ks)] = next_rank(ONE_PAIR)
+	for low, high in sorted(itertools.combinations(ranks, 2), key=lambda p: (p[1], p[0])):
+		for ks in kickers(1, (high, low)):
+			products[prime_product((high, high, low, low) + ks)] = next_rank(TWO_PAIR)
+	for trips in ranks:
+		for ks in kickers(2, (trips,)):
+			products[prime_product((trips,) * 3 + ks)] = next_rank(THREE_OF_A_KIND)
+	for mask in straights:
+		unique5[mask] = next_rank(STRAIGHT)
+	if flush_beats_full_house:
+		add_full_houses()
+		add_flushes()
+	else:
+		add_flushes()
+		add_full_houses()
+	for quads in ranks:
+		for kicker in (r for r in ranks if r != quads):
+			products[prime_product((quads,) * 4 + (kicker,))] = next_rank(FOUR_OF_A_KIND)
+	for mask in straights:
+		flushes[mask] = next_rank(STRAIGHT_FLUSH)
+
+	return flushes, unique5, products, category_starts, rank
+
+
+#####################################################################
+
+'''
+Return the rank of 5 encoded cards.
+'''
+def evaluate5(c1, c2, c3, c4, c5):
+	q = (c1 | c2 | c3 | c4 | c5) >> 16
+	if c1 & c2 & c3 & c4 & c5 & 0xF000:
+		return FLUSHES[q]
+	rank = UNIQUE5[q]
+	if rank:
+		return rank
+	return PRODUCTS[(c1 & 0xFF) * (c2 & 0xFF) * (c3 & 0xFF) * (c4 & 0xFF) * (c5 & 0xFF)]
+
+'''
+Return the rank of the best 5-card hand among 5, 6 or 7 Card objects.
+'''
+def evaluate_cards(cards):
+	if len(cards) == 5:
+		return evaluate5(*[encode(card) for card in cards])
+	return evaluate([encode(card) for card in cards])
+
+'''
+Return the name of the category (i.e., 'Full House') of a hand rank.
+'''
+def hand_category(rank):
+	category = None
+	for start, name in CATEGORY_STARTS:
+		if rank < start:
+			break
+		category = name
+	return category
+
+
+#####################################################################
+
+'''
+Best flush rank for every 13-bit suit mask holding 5 or more ranks (0 when there is no flush).
+'''
+def _build_flush_best(flushes, straights = STRAIGHTS):
+	straights = straights[::-1] # strongest first
+	flush_best = [0] * 8192
+	for mask in range(8192):
+		if bin(mask).count('1') < 5:
+			continue
+		for straight in straights:
+			if mask & straight == straight:
+				flush_best[mask] = flushes[straight]
+				break
+		else:
+			top5 = mask
+			while bin(top5).count('1') > 5:
+				top5 &= top5 - 1 # drop the lowest rank
+			flush_best[mask] = flushes[top5]
+	return flush_best
+
+'''
+Return the standard deck's (flushes, unique5, products, category_starts, best_rank, flush_best) tables from
+the file at path, building them and writing the file when it is missing or out of date. A directory that
+cannot be written (i.e. a read-only install) only means the tables are built in every process.
+'''
+def _load_tables(path = TABLES_PATH):
+	tables = _read_table(path)
+	if tables is not None:
+		return tables
+	flushes, unique5, products, category_starts, best_rank = _build_tables()
+	tables = (flushes, unique5, products, category_starts, best_rank, _build_flush_best(flushes))
+	_save_table(path, tables)
+	return tables
+
+'''
+Write value to path with marshal, through a temporary file so a reader never sees half of it.
+'''
+def _save_table(path, value):
+	temporary = '%s.%d.tmp' % (path, os.getpid()) # processes starting together each write their own copy
+	try:
+		os.makedirs(os.path.dirname(path), exist_ok=True)
+		with open(temporary, 'wb') as f:
+			f.write(marshal.dumps(((TABLES_VERSION, marshal.version), value)))
+		os.replace(temporary, path)
+	except OSError:
+		pass
+
+'''
+Return the table saved at path by _save_table, or None when it is missing or out of date.
+'''
+def _read_table(path):
+	try:
+		with open(path, 'rb') as f:
+			version, value = marshal.loads(f.read()) # much faster than marshal.load on the file
+		if version == (TABLES_VERSION, marshal.version):
+			return value
+	except (OSError, EOFError, ValueError, TypeError):
+		pass
+	return None
+
+FLUSHES, UNIQUE5, PRODUCTS, CATEGORY_STARTS, BEST_RANK, FLUSH_BEST = _load_tables() # BEST_RANK = 7462 (royal flush)
+NONFLUSH_BEST = {} # prime product of 5-7 ranks -> best rank, filled on first sight of each rank multiset
+_nonflush_complete = False
+
+'''
+Return the best rank of the non-flush 5-card hands found in the encoded cards.
+'''
+def _best_nonflush(cards):
+	best = 0
+	for c1, c2, c3, c4, c5 in itertools.combinations(cards, 5):
+		rank = UNIQUE5[(c1 | c2 | c3 | c4 | c5) >> 16]
+		if not rank:
+			rank = PRODUCTS[(c1 & 0xFF) * (c2 & 0xFF) * (c3 & 0xFF) * (c4 & 0xFF) * (c5 & 0xFF)]
+		if rank > best:
+			best = rank
+	return best
+
+'''
+Return the rank of the best 5-card hand among 5, 6 or 7 encoded cards in a single pass.
+A suit holding 5 or more cards can only make a flush or straight flush, which beats anything
+the other 2 cards could pair into, so it is read straight off its rank mask.
+'''
+def evaluate(cards):
+	suit_masks = [0] * 9 # indexed by suit bit (1, 2, 4, 8)
+	product = 1
+	for card in cards:
+		suit_masks[card >> 12 & 0xF] |= card >> 16
+		product *= card & 0xFF
+	rank = FLUSH_BEST[suit_masks[1]] or FLUSH_BEST[suit_masks[2]] or FLUSH_BEST[suit_masks[4]] or FLUSH_BEST[suit_masks[8]]
+	if rank:
+		return rank
+	return nonflush_rank(product, cards)
+
+'''
+Return the best non-flush rank of the encoded cards (5-7 of them) whose primes multiply to product.
+'''
+def nonflush_rank(product, cards):
+	rank = NONFLUSH_BEST.get(product)
+	if rank is None:
+		if len(NONFLUSH_BEST) >= NONFLUSH_LOAD_AFTER and not _nonflush_complete:
+			_load_nonflush_best()
+			return NONFLUSH_BEST[product]
+		rank = NONFLUSH_BEST[product] = _best_nonflush(cards)
+	return rank
+
+'''
+Best non-flush rank of every multiset of 5, 6 and 7 ranks, keyed by prime product. The best of n ranks
+is the best of the n-1 rank multisets left by dropping one of them, so each takes a few lookups.
+'''
+def _build_nonflush_best():
+	best = {}
+	for n in (5, 6, 7):
+		for ranks in itertools.combinations_with_replacement(range(13), n):
+			distinct = set(ranks)
+			if any(ranks.count(r) > 4 for r in distinct):
+				continue
+			product = 1
+			for r in ranks:
+				product *= PRIMES[r]
+			if n == 5:
+				mask = 0
+				for r in distinct:
+					mask |= 1 << r
+				best[product] = UNIQUE5[mask] or PRODUCTS[product]
+			else:
+				best[product] = max(best[product // PRIMES[r]] for r in distinct)
+	return best
+
+'''
+Fill NONFLUSH_BEST with every rank multiset from the file at NONFLUSH_PATH (building and writing it when
+needed). Reading all ~74k entries costs about as much as a thousand cache misses, so a process only
+does it once it has evaluated enough hands for the misses to outweigh the read.
+'''
+def _load_nonflush_best(path = NONFLUSH_PATH):
+	global _nonflush_complete
+	best = _read_table(path)
+	if best is None:
+		best = _build_nonflush_best()
+		_save_table(path, best)
+	NONFLUSH_BEST.update(best)
+	_nonflush_complete = True
+
+
+#####################################################################
+
+'''
+Lookup tables and evaluation for a deck other than the standard 52 cards (i.e. the 36-card short deck),
+built the same way as the module's tables. Cards keep their usual encodings; only the ranks differ.
+'''
+class RankTables(object):
+
+	def __init__(self, ranks = range(13), straights = STRAIGHTS, flush_beats_full_house = False):
+		self.flushes, self.unique5, self.products, self.category_starts, self.best_rank = _build_tables(ranks, straights, flush_beats_full_house)
+		self.flush_best = _build_flush_best(self.flushes, straights)
+		self.nonflush_best = {} # as NONFLUSH_BEST
+
+	def evaluate5(self, c1, c2, c3, c4, c5):
+		q = (c1 | c2 | c3 | c4 | c5) >> 16
+		if c1 & c2 & c3 & c4 & c5 & 0xF000:
+			return self.flushes[q]
+		return self.unique5[q] or self.products[(c1 & 0xFF) * (c2 & 0xFF) * (c3 & 0xFF) * (c4 & 0xFF) * (c5 & 0xFF)]
+
+	'''
+	Return the rank of the best 5-card hand among 5, 6 or 7 encoded cards, as evaluate.
+	A flush is read straight off its suit's rank mask, which is only right while a flush beats
+	anything the other cards could make, as it does with 7 cards or when flushes beat full houses.
+	'''
+	def evaluate(self, cards):
+		suit_masks = [0] * 9
+		product = 1
+		for card in cards:
+			suit_masks[card >> 12 & 0xF] |= card >> 16
+			product *= card & 0xFF
+		flush_best = self.flush_best
+		rank = flush_best[suit_masks[1]] or flush_best[suit_masks[2]] or flush_best[suit_masks[4]] or flush_best[suit_masks[8]]
+		if rank:
+			return rank
+		rank = self.nonflush_best.get(product)
+		if rank is None:
+			unique5, products = self.unique5, self.products
+			rank = 0
+			for c1, c2, c3, c4, c5 in itertools.combinations(cards, 5):
+				rank = max(rank, unique5[(c1 | c2 | c3 | c4 | c5) >> 16] or products[(c1 & 0xFF) * (c2 & 0xFF) * (c3 & 0xFF) * (c4 & 0xFF) * (c5 & 0xFF)])
+			self.nonflush_best[product] = rank
+		return rank
+
+	def category(self, rank):
+		category = None
+		for start, name in self.category_starts:
+			if rank < start:
+				break
+			category = name
+		return category
@@ -0,0 +1,245 @@
+from array import array
+from random import Random
+from .Agent import FOLD, CALL, RAISE
+from .Evaluator import CARD_BITS, evaluate
+from .Pot import settle_layers
+
+'''
+Flat game state of a Round for search and rollouts.
+
+Everything lives in small integer arrays indexed by seat (seats are numbered in the Round's
+player_order, starting left of the dealer), so a state is cloned by copying a handful of arrays.
+The state follows the same rules as Round: step() applies a fold, call or raise for the player
+to act and deal() is the chance move that deals the next street.
+'''
+
+# phases
+BETTING = 0 # waiting for the player at to_act
+CHANCE = 1 # waiting for the next street to be dealt
+DONE = 2 # one player left or showdown reached
+
+# seat status
+ACTIVE = 0
+FOLDED = 1
+ALL_IN = 2
+
+NO_BET = -1 # seat has no bet in the pot (never bet, or folded)
+NO_CARD = -1
+STREET_CARDS = [0, 3, 1, 1] # cards dealt to start each street
+
+class GameState(object):
+
+	__slots__ = ('seats', 'stacks', 'bets', 'contributions', 'status', 'cards', 'deck',
+		'deck_remaining', 'phase', 'street', 'to_act', 'actions_left', 'highest_bet', 'minimum_bid')
+
+	def __init__(self, seats, minimum_bid = 2):
+		self.seats = seats
+		self.stacks = array('q', [0] * seats)
+		self.bets = array('q', [NO_BET] * seats) # bets in the pot this round
+		self.contributions = array('q', [0] * seats) # all money put in, kept when folding
+		self.status = array('b', [ACTIVE] * seats)
+		self.cards = array('b', [NO_CARD] * (2 * seats + 5)) # 2 hole cards per seat, then the board
+		self.deck = array('b', range(52)) # deck[:deck_remaining] are undealt card codes
+		self.deck_remaining = 52
+		self.phase = BETTING
+		self.street = 0
+		self.to_act = 0
+		self.actions_left = 0
+		self.highest_bet = 0
+		self.minimum_bid = minimum_bid
+
+	def __repr__(self):
+		return 'GameState(seats=%r, street=%r, phase=%r, to_act=%r, stacks=%r, bets=%r)' % (
+			self.seats, self.street, self.phase, self.to_act, list(self.stacks), list(self.bets))
+
+	'''
+	Return an independent copy of the state.
+	'''
+	def clone(self):
+		state = GameState.__new__(GameState)
+		state.seats = self.seats
+		state.stacks = self.stacks[:]
+		state.bets = self.bets[:]
+		state.contributions = self.contributions[:]
+		state.status = self.status[:]
+		state.cards = self.cards[:]
+		state.deck = self.deck[:]
+		state.deck_remaining = self.deck_remaining
+		state.phase = self.phase
+		state.street = self.street
+		state.to_act = self.to_act
+		state.actions_left = self.actions_left
+		state.highest_bet = self.highest_bet
+		state.minimum_bid = self.minimum_bid
+		return state
+
+	snapshot = clone
+
+	'''
+	Overwrite this state with a snapshot taken earlier, reusing this state's arrays.
+	'''
+	def restore(self, snapshot):
+		self.stacks[:] = snapshot.stacks
+		self.bets[:] = snapshot.bets
+		self.contributions[:] = snapshot.contributions
+		self.status[:] = snapshot.status
+		self.cards[:] = snapshot.cards
+		self.deck[:] = snapshot.deck
+		self.deck_remaining = snapshot.deck_remaining
+		self.phase = snapshot.phase
+		self.street = snapshot.street
+		self.to_act = snapshot.to_act
+		self.actions_left = snapshot.actions_left
+		self.highest_bet = snapshot.highest_bet
+
+	#####################################################################
+
+	def in_round(self):
+		return [seat for seat in range(self.seats) if self.status[seat] != FOLDED]
+
+	def winner(self):
+		players = self.in_round()
+		return players[0] if len(players) == 1 else None
+
+	'''
+	Return true if every player who can still bet, and has bet, has matched the highest bet (as Pot.balanced).
+	'''
+	def balanced(self):
+		for seat in range(self.seats):
+			if self.status[seat] == ACTIVE and self.bets[seat] != NO_BET and self.bets[seat] != self.highest_bet:
+				return False
+		return True
+
+	def amount_to_call(self, seat):
+		return self.highest_bet - max(self.bets[seat], 0)
+
+	def next_seat(self, seat):
+		for offset in range(1, self.seats + 1):
+			next_seat = (seat + offset) % self.seats
+			if self.status[next_seat] != FOLDED:
+				return next_seat
+		return seat
+
+	'''
+	Return the decisions the player to act can make, as (decision, lowest raise_by, highest raise_by) tuples.
+	'''
+	def legal_actions(self):
+		if self.phase != BETTING:
+			return []
+		seat = self.to_act
+		actions = [(FOLD, 0, 0), (CALL, 0, 0)]
+		most = self.stacks[seat] - self.amount_to_call(seat)
+		if most > 0:
+			actions.append((RAISE, 1, most))
+		return actions
+
+	'''
+	Apply a decision of the player to act and move on to the next player, street or the end of the round.
+	'''
+	def step(self, decision, raise_by = 0):
+		if self.phase != BETTING:
+			raise ValueError('No player is to act')
+		seat = self.to_act
+		next_up = self.next_seat(seat) # before seat folds, as in Round.betting
+		amount_to_call = min(self.amount_to_call(seat), self.stacks[seat])
+
+		if decision == CALL:
+			self.bid(seat, amount_to_call)
+		elif decision == RAISE:
+			if raise_by <= 0 or self.stacks[seat] < amount_to_call + raise_by:
+				raise ValueError('Raise of %r is not valid' % raise_by)
+			self.bid(seat, amount_to_call + raise_by)
+		else:
+			self.fold(seat)
+
+		self.to_act = next_up
+		self.actions_left = max(self.actions_left - 1, 0)
+		self.advance()
+		return self
+
+	def bid(self, seat, amount):
+		self.stacks[seat] -= amount
+		self.bets[seat] = max(self.bets[seat], 0) + amount
+		self.contributions[seat] += amount
+		if self.bets[seat] > self.highest_bet:
+			self.highest_bet = self.bets[seat]
+		if self.stacks[seat] == 0:
+			self.status[seat] = ALL_IN
+
+	def fold(self, seat):
+		bet = self.bets[seat]
+		self.status[seat] = FOLDED
+		self.bets[seat] = NO_BET
+		if bet == self.highest_bet:
+			self.highest_bet = max(max(self.bets), 0)
+
+	'''
+	Skip players who have nothing to decide and close the betting once the pot is balanced.
+	'''
+	def advance(self):
+		while self.phase == BETTING:
+			if self.winner() is not None:
+				self.phase = DONE
+			elif self.actions_left == 0 and self.balanced():
+				self.phase = DONE if self.street == 3 else CHANCE
+			elif self.status[self.to_act] == ALL_IN:
+				self.to_act = self.next_seat(self.to_act)
+				self.actions_left = max(self.actions_left - 1, 0)
+			else:
+				break
+
+	'''
+	Chance move: deal the next street, either the given card codes or cards drawn with rng.
+	'''
+	def deal(self, rng = None, codes = None):
+		if self.phase != CHANCE:
+			raise ValueError('No cards are waiting to be dealt')
+		self.street += 1
+		board_start = 2 * self.seats + sum(STREET_CARDS[:self.street])
+		for i in range(STREET_CARDS[self.street]):
+			self.cards[board_start + i] = self.draw(rng, None if codes is None else codes[i])
+		self.phase = BETTING
+		self.actions_left = len(self.in_round()) # every player gets a chance to bet
+		self.advance()
+		return self
+
+	'''
+	Take a card code out of the deck: the given one, or a random one (partial Fisher-Yates, as Deck.deal).
+	'''
+	def draw(self, rng = None, code = None):
+		deck = self.deck
+		if code is None:
+			j = int((rng or _rng).random() * self.deck_remaining)
+		else:
+			j = deck.index(code, 0, self.deck_remaining)
+		self.deck_remaining -= 1
+		deck[j], deck[self.deck_remaining] = deck[self.deck_remaining], deck[j]
+		return deck[self.deck_remaining]
+
+	'''
+	Play the round out at random from here: random decisions from policy (or calls) and random cards.
+	'''
+	def rollout(self, rng = None, policy = None):
+		while self.phase != DONE:
+			if self.phase == CHANCE:
+				self.deal(rng)
+			else:
+				self.step(*(policy(self) if policy is not None else (CALL, 0)))
+		return self
+
+	'''
+	Return the money each seat wins at the end of the round, settling side pots as Pot.settle does.
+	'''
+	def payoffs(self):
+		if self.phase != DONE:
+			raise ValueError('The round is not over')
+		winner = self.winner()
+		if winner is not None:
+			ranks = {winner: 0}
+		else:
+			board = [CARD_BITS[code] for code in self.cards[2 * self.seats:]]
+			ranks = {seat: evaluate([CARD_BITS[self.cards[2 * seat]], CARD_BITS[self.cards[2 * seat + 1]]] + board) for seat in self.in_round()}
+		payouts = settle_layers(enumerate(self.contributions), ranks, range(self.seats))
+		return [payouts.get(seat, 0) for seat in range(self.seats)]
+
+_rng = Random()
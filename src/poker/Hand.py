@@ -0,0 +1,289 @@
+import itertools
+from operator import attrgetter, itemgetter
+from collections import Counter
+from .Evaluator import evaluate, evaluate_cards, hand_category, nonflush_rank, FLUSH_BEST, STRAIGHTS, HIGH_CARD, ONE_PAIR, TWO_PAIR, THREE_OF_A_KIND, FOUR_OF_A_KIND
+from .Preflop import preflop_table, DEFAULT_PATH
+
+'''
+Player's hand (2 cards, or as many as the Variant deals)
+'''
+class Hand(object):
+
+	def __init__(self, cards, game = None, variant = None):
+		self.cards = cards # array of 2 cards
+		self.game = game
+		self.variant = variant # None for Texas hold'em
+		self.tracker = HandTracker(cards) if variant is None else variant.tracker(cards) # hand strength, updated as board cards land
+
+	def __repr__(self):
+		return repr([card for card in self.cards])
+
+	def __str__(self):
+		return str([card.__str__() for card in self.cards])
+
+	'''
+	Rank the best 5-card hand made from the hand and pot_cards in a single pass (higher is better).
+	'''
+	def score(self, pot_cards):
+		if self.variant is not None:
+			return self.variant.score(self.cards, pot_cards)
+		return evaluate([card.bits for card in self.cards] + [card.bits for card in pot_cards])
+
+	'''
+	Return the FinalHand that makes the given score, only searching combinations when asked for.
+	'''
+	def best_hand(self, pot_cards, score = None):
+		if score is None:
+			score = self.score(pot_cards)
+		if self.variant is not None:
+			for cards in self.variant.combinations(self.cards, pot_cards):
+				if self.variant.evaluate5(*[card.bits for card in cards]) == score:
+					return FinalHand(list(cards))
+			return None
+		for cards in itertools.combinations(list(pot_cards) + list(self.cards), 5):
+			if evaluate_cards(cards) == score:
+				return FinalHand(list(cards))
+
+	'''
+	Preflop equity of the hand against the given number of random hands, read from the preflop table file.
+	'''
+	def preflop_equity(self, opponents = 1, path = DEFAULT_PATH):
+		return preflop_table(path).equity(self.cards, opponents)
+
+	'''
+	Preflop equity of the hand against another Hand's starting hand, read from the preflop table file.
+	'''
+	def preflop_equity_vs(self, other, path = DEFAULT_PATH):
+		return preflop_table(path).equity_vs(self.cards, other.cards)
+
+	'''
+	Score the best possible hand with pot_cards. Return the score and the hand that makes it.
+	'''
+	def score_hands(self, pot_cards):
+		score = self.score(pot_cards)
+		return score, self.best_hand(pot_cards, score)
+
+
+##################################################################
+
+'''
+Incremental hand strength of a player's cards plus the board cards seen so far.
+Each added card updates suit masks, rank counts and the prime product in constant time, so the current
+rank, category and draws never need a full re-evaluation. The rank is only looked up when asked for,
+so a hand that folds before the showdown never pays for it.
+'''
+class HandTracker(object):
+
+	def __init__(self, cards = ()):
+		self.bits = [] # evaluator encodings of the cards seen
+		self.suit_masks = [0] * 4 # rank mask per suit
+		self.rank_mask = 0
+		self.rank_counts = [0] * 13
+		self.pairs = self.trips = self.quads = 0 # number of ranks seen at least 2, 3 and 4 times
+		self.product = 1
+		self._rank = None # best 5-card rank of the cards seen, None until asked for
+		self.add_cards(cards)
+
+	def add_cards(self, cards):
+		for card in cards:
+			self.add(card)
+
+	def add(self, card):
+		bits = card.bits
+		self.bits.append(bits)
+		suit = card.code % 4
+		self.suit_masks[suit] |= bits >> 16
+		self.rank_mask |= bits >> 16
+		rank_index = card.code // 4
+		self.rank_counts[rank_index] += 1
+		count = self.rank_counts[rank_index]
+		if count == 2:
+			self.pairs += 1
+		elif count == 3:
+			self.trips += 1
+		elif count == 4:
+			self.quads += 1
+		self.product *= bits & 0xFF
+		self._rank = None
+
+	'''
+	Best 5-card rank of the cards seen, 0 until 5 cards are seen.
+	With 7 cards or fewer a flush beats anything the other cards could make, as in Evaluator.evaluate.
+	'''
+	@property
+	def rank(self):
+		if self._rank is None:
+			if len(self.bits) < 5:
+				return 0
+			masks = self.suit_masks
+			self._rank = (FLUSH_BEST[masks[0]] or FLUSH_BEST[masks[1]] or FLUSH_BEST[masks[2]] or FLUSH_BEST[masks[3]]
+				or nonflush_rank(self.product, self.bits))
+		return self._rank
+
+	'''
+	Name of the made hand so far (i.e., 'One Pair'), even before 5 cards are seen.
+	'''
+	@property
+	def category(self):
+		if self.rank:
+			return hand_category(self.rank)
+		if self.quads:
+			return FOUR_OF_A_KIND
+		if self.trips:
+			return THREE_OF_A_KIND
+		if self.pairs >= 2:
+			return TWO_PAIR
+		if self.pairs:
+			return ONE_PAIR
+		return HIGH_CARD
+
+	'''
+	Number of unseen cards that would complete a flush (0 once a flush is made or no card is left to come).
+	'''
+	@property
+	def flush_outs(self):
+		if len(self.bits) >= 7:
+			return 0
+		most = max(bin(mask).count('1') for mask in self.suit_masks)
+		return 13 - most if most == 4 else 0
+
+	'''
+	Number of unseen cards that would complete a straight (0 once a straight is made or no card is left to come).
+	'''
+	@property
+	def straight_outs(self):
+		if len(self.bits) >= 7:
+			return 0
+		completing = 0
+		for straight in STRAIGHTS:
+			missing = straight & ~self.rank_mask
+			if not missing:
+				return 0
+			if missing & (missing - 1) == 0: # exactly one rank missing
+				completing |= missing
+		return 4 * bin(completing).count('1')
+
+##################################################################
+
+'''
+Final hand (5 cards) used to determine winner at the end of each round
+'''
+class FinalHand(object):
+
+	def __init__(self, cards):
+		if (len(cards)) != 5:
+			print('Final hands must have 5 cards!')
+		self.cards = sorted(cards, key=attrgetter('value'))
+		self._counter = None
+
+	def __str__(self):
+		return str([card.__str__() for card in self.cards])
+
+	'''
+	Dictionary with counts of each card value, only built when a category check needs it.
+	'''
+	@property
+	def counter(self):
+		if self._counter is None:
+			self._counter = Counter([card.value for card in self.cards])
+		return self._counter
+
+	'''
+	Return the exact rank of the hand (1-7462, higher is better) from the evaluator lookup tables.
+	'''
+	def score_hand(self):
+		return evaluate_cards(self.cards)
+
+	'''
+	Return the name of the hand's category (i.e., 'Two Pair').
+	'''
+	def category(self):
+		return hand_category(self.score_hand())
+
+	'''
+	Returns the nth most repeated card.
+	'''
+	def get_repeated_card(self, n):
+		# most_common(5) returns a list of the 5 most common elements and their counts
+		return self.counter.most_common(5)[n-1]
+
+	def royal_flush(self):
+		flush, high_card = self.flush()
+		return flush and all(card.value in [10, 11, 12, 13, 14] for card in self.cards)
+
+	def straight_flush(self):
+		flush, high_card = self.flush()
+		straight, high_card = self.straight()
+		return straight and flush
+
+	def four_of_a_kind(self):
+		return max(self.counter.values()) == 4, max(self.counter.items(), key=itemgetter(1))[0]
+
+	def full_house(self):
+		return self.get_repeated_card(1)[1] == 3 and self.get_repeated_card(2)[1] == 2, self.get_repeated_card(2)[0]
+
+	def flush(self):
+		a_suit = self.cards[0].suit
+		return all(card.suit == a_suit for card in self.cards), self.high_card()
+
+	def straight(self):
+		prev = self.cards[0]
+		for card in self.cards:
+			if card != prev and card.value != prev.value + 1:
+				return False, self.high_card()
+			prev = card
+
+		return True, self.high_card()
+
+	def three_of_a_kind(self):
+		return max(self.counter.values()) == 3, max(self.counter.items(), key=itemgetter(1))[0]
+
+	def two_pair(self):
+		return self.get_repeated_card(1)[1] == 2 and self.get_repeated_card(2)[1] == 2, self.get_repeated_card(2)[0]
+
+	def one_pair(self):
+		return self.get_repeated_card(1)[1] == 2, self.get_repeated_card(1)[0]
+
+	'''
+	Return value of highest card
+	'''
+	def high_card(self):
+		return max([card.value for card in self.cards])
+
+#################################################################
+
+'''
+h = Hand([Card(11, 'Clubs'), Card(10, 'Spades')])
+score, bh = h.score_hands([Card(3, 'Spades'), Card(9, 'Clubs'), Card(13, 'Hearts'), Card(10, 'Clubs'), Card(14, 'Spades')])
+
+royal_flush = FinalHand([Card(11, 'Hearts'), Card(10, 'Hearts'), Card(12, 'Hearts'), Card(13, 'Hearts'), Card(14, 'Hearts')])
+print(royal_flush.royal_flush())
+
+straight_flush = FinalHand([Card(8, 'Hearts'), Card(9, 'Hearts'), Card(10, 'Hearts'), Card(11, 'Hearts'), Card(12, 'Hearts')])
+print(straight_flush.straight_flush())
+
+four_of_a_kind = FinalHand([Card(11, 'Hearts'), Card(11, 'Spades'), Card(11, 'Diamonds'), Card(13, 'Hearts'), Card(11, 'Clubs')])
+print(four_of_a_kind.four_of_a_kind())
+
+full_house = FinalHand([Card(11, 'Hearts'), Card(11, 'Spades'), Card(11, 'Diamonds'), Card(13, 'Hearts'), Card(13, 'Clubs')])
+print(full_house.full_house())
+
+flush = FinalHand([Card(11, 'Hearts'), Card(12, 'Hearts'), Card(10, 'Hearts'), Card(13, 'Hearts'), Card(13, 'Hearts')])
+print(flush.flush())
+
+straight = FinalHand([Card(8, 'Hearts'), Card(9, 'Clubs'), Card(10, 'Spades'), Card(11, 'Hearts'), Card(12, 'Hearts')])
+print(straight.straight())
+
+three_of_a_kind = FinalHand([Card(11, 'Hearts'), Card(11, 'Spades'), Card(11, 'Diamonds'), Card(13, 'Hearts'), Card(6, 'Clubs')])
+print(three_of_a_kind.three_of_a_kind())
+
+two_pair = FinalHand([Card(11, 'Hearts'), Card(11, 'Spades'), Card(13, 'Diamonds'), Card(13, 'Hearts'), Card(6, 'Clubs')])
+print(two_pair.two_pair())
+
+one_pair = FinalHand([Card(13, 'Hearts'), Card(11, 'Spades'), Card(11, 'Diamonds'), Card(4, 'Hearts'), Card(6, 'Clubs')])
+print(one_pair.one_pair())
+
+hand = Hand([Card(11, 'Hearts'), Card(10, 'Hearts')])
+hand.score_hands([Card(9, 'Spades'), Card(3, 'Hearts'), Card(13, 'Hearts'), Card(14, 'Hearts'), Card(6, 'Diamonds')])
+'''
+
@@ -0,0 +1,348 @@
+import mmap
+import os
+import struct
+from collections import namedtuple
+from .Observer import Observer
+
+'''
+Compact, append-only binary hand histories.
+
+A history file starts with an 8-byte file header (magic, version) followed by one record per hand:
+	record header	length, seed, seats, flags, street, variant, board	(fixed width, 21 bytes)
+	seats			id, stack, hole cards, net, result					(fixed width, 15 bytes each, in turn order)
+	actions			varint action stream, to the end of the record
+The variant is an index into VARIANT_NAMES and every seat has room for MAX_HOLE_CARDS hole cards (Omaha).
+Cards are stored as their codes (0-51, NO_CARD when not dealt) and length covers the whole record, so a
+reader can skip a hand, or check its seats, without decoding the actions. Seats are numbered by position:
+0 is the first player left of the dealer, the last seat is the dealer.
+
+Each action is a varint of seat << 3 | kind, followed by a varint amount (chips put in) for blinds, calls
+and raises. A STREET action marks the deal of the flop, turn or river, with the street number as its seat.
+'''
+
+MAGIC = b'PKHH'
+VERSION = 2
+FILE_HEADER = struct.Struct('<4sHxx')
+RECORD = struct.Struct('<IQBBBB5s') # length, seed, seats, flags, street, variant, board
+SEAT = struct.Struct('<HI4siB') # player id, stack at the start of the hand, hole cards, net winnings, result
+NO_CARD = 0xFF
+MAX_HOLE_CARDS = 4
+VARIANT_NAMES = ['holdem', 'omaha', 'short_deck'] # Variant.name of each variant index
+
+# record flags
+SHOWDOWN = 1
+
+# seat results
+FOLDED = 1
+ALL_IN = 2
+SHOWED = 4
+WON = 8
+
+# action kinds
+SMALL_BLIND = 0
+BIG_BLIND = 1
+FOLD = 2
+CALL = 3
+RAISE = 4
+STREET = 5
+KIND_NAMES = ['small_blind', 'big_blind', 'fold', 'call', 'raise', 'street']
+
+SeatRecord = namedtuple('SeatRecord', ['position', 'id', 'stack', 'hole', 'net', 'result'])
+ActionRecord = namedtuple('ActionRecord', ['street', 'position', 'kind', 'amount'])
+
+'''
+Append the varint encoding of a non-negative integer to a bytearray.
+'''
+def write_varint(buffer, value):
+	while value > 0x7F:
+		buffer.append(value & 0x7F | 0x80)
+		value >>= 7
+	buffer.append(value)
+
+'''
+Decode the varint at offset of buffer. Return (value, offset after it).
+'''
+def read_varint(buffer, offset):
+	value = shift = 0
+	while True:
+		byte = buffer[offset]
+		offset += 1
+		value |= (byte & 0x7F) << shift
+		if byte < 0x80:
+			return value, offset
+		shift += 7
+
+
+#####################################################################
+
+'''
+Observer that records every hand of a game to a history file.
+Records are gathered in a buffer and written in batches of about buffer_size bytes,
+so the game loop only appends bytes to memory. Hands are added to an existing history after its last complete record.
+'''
+class HistoryWriter(Observer):
+
+	def __init__(self, path, buffer_size = 1 << 20):
+		self.path = path
+		self.buffer_size = buffer_size
+		self.buffer = bytearray()
+		self.file = open(path, 'ab')
+		if self.file.tell() == 0:
+			self.buffer += FILE_HEADER.pack(MAGIC, VERSION)
+		else:
+			with open(path, 'rb') as f:
+				header = f.read(FILE_HEADER.size)
+			if len(header) < FILE_HEADER.size or FILE_HEADER.unpack(header) != (MAGIC, VERSION):
+				self.file.close()
+				raise ValueError('%s is not a version %d hand history, so hands cannot be added to it' % (path, VERSION))
+			with HistoryReader(path) as reader:
+				end = reader.end()
+			if end < self.file.tell(): # drop a record cut short by a crash, so new hands follow the complete ones
+				self.file.truncate(end)
+				self.file.seek(end)
+		self.hands = 0
+		self.round = None
+		self.handlers = {
+			'round_start': self.round_start,
+			'blind': self.blind,
+			'blind_failed': self.blind_failed,
+			'fold': self.fold,
+			'call': self.call,
+			'raise': self.raise_,
+			'flop': self.street,
+			'card': self.street,
+			'showdown': self.showdown,
+			'round_winner': self.round_winner,
+			'round_end': self.round_end,
+		}
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc_info):
+		self.close()
+
+	def event(self, name, **info):
+		handler = self.handlers.get(name)
+		if handler is not None:
+			handler(**info)
+
+	def round_start(self, round, **info):
+		self.round = round
+		self.positions = {player: position for position, player in enumerate(round.player_order)}
+		self.stacks = [player.money for player in round.player_order]
+		self.results = [0] * len(self.stacks)
+		self.flags = 0
+		self.actions = bytearray()
+
+	def blind(self, player, type_, amount, **info):
+		write_varint(self.actions, self.positions[player] << 3 | (SMALL_BLIND if type_ == 'small' else BIG_BLIND))
+		write_varint(self.actions, amount)
+
+	def blind_failed(self, player, **info):
+		self.results[self.positions[player]] |= FOLDED
+
+	def fold(self, player, **info):
+		self.results[self.positions[player]] |= FOLDED
+		write_varint(self.actions, self.positions[player] << 3 | FOLD)
+
+	def call(self, player, amount, **info):
+		write_varint(self.actions, self.positions[player] << 3 | CALL)
+		write_varint(self.actions, amount)
+
+	def raise_(self, player, amount, **info):
+		write_varint(self.actions, self.positions[player] << 3 | RAISE)
+		write_varint(self.actions, amount)
+
+	def street(self, **info):
+		write_varint(self.actions, self.round.street << 3 | STREET)
+
+	def showdown(self, player, **info):
+		self.flags |= SHOWDOWN
+		self.results[self.positions[player]] |= SHOWED
+
+	def round_winner(self, player, **info):
+		self.results[self.positions[player]] |= WON
+
+	'''
+	Write the finished hand to the buffer, flushing the buffer once it is full.
+	'''
+	def round_end(self, **info):
+		players = self.round.player_order
+		board = bytes([card.code for card in self.round.pot.cards]).ljust(5, bytes([NO_CARD]))
+		variant = VARIANT_NAMES.index(self.round.variant.name) if self.round.variant is not None else 0
+		length = RECORD.size + SEAT.size * len(players) + len(self.actions)
+		self.buffer += RECORD.pack(length, self.round.seed, len(players), self.flags, self.round.street, variant, board)
+		for position, player in enumerate(players):
+			hole = bytes([card.code for card in player.hand.cards] if player.hand is not None else []).ljust(MAX_HOLE_CARDS, bytes([NO_CARD]))
+			result = self.results[position] | (ALL_IN if self.round.pot.is_all_in(player) else 0)
+			self.buffer += SEAT.pack(player.id, self.stacks[position], hole, player.money - self.stacks[position], result)
+		self.buffer += self.actions
+		self.round = None
+		self.hands += 1
+		if len(self.buffer) >= self.buffer_size:
+			self.flush()
+
+	def flush(self):
+		self.file.write(self.buffer)
+		self.file.flush()
+		self.buffer.clear()
+
+	def close(self):
+		if not self.file.closed:
+			self.flush()
+			self.file.close()
+
+
+#####################################################################
+
+'''
+A hand in a memory-mapped history file. Only the record header is decoded up front;
+seats, board and actions are decoded when asked for.
+'''
+class HandRecord(object):
+
+	__slots__ = ('map', 'offset', 'length', 'seed', 'seat_count', 'flags', 'street', 'variant')
+
+	def __init__(self, map_, offset):
+		self.map = map_
+		self.offset = offset
+		self.length, self.seed, self.seat_count, self.flags, self.street, variant, board = RECORD.unpack_from(map_, offset)
+		self.variant = VARIANT_NAMES[variant]
+
+	def __repr__(self):
+		return 'HandRecord(seed=%r, seats=%r, street=%r, showdown=%r, variant=%r)' % (self.seed, self.seat_count, self.street, self.showdown, self.variant)
+
+	@property
+	def showdown(self):
+		return bool(self.flags & SHOWDOWN)
+
+	@property
+	def board(self):
+		return [code for code in RECORD.unpack_from(self.map, self.offset)[6] if code != NO_CARD]
+
+	@property
+	def seats(self):
+		seats = []
+		for position in range(self.seat_count):
+			id_, stack, hole, net, result = SEAT.unpack_from(self.map, self.offset + RECORD.size + position * SEAT.size)
+			hole = [code for code in hole if code != NO_CARD]
+			seats.append(SeatRecord(position, id_, stack, hole, net, result))
+		return seats
+
+	def seat(self, player_id):
+		for seat in self.seats:
+			if seat.id == player_id:
+				return seat
+		return None
+
+	'''
+	Decode the action stream, yielding ActionRecords in the order they happened.
+	'''
+	def actions(self):
+		offset = self.offset + RECORD.size + SEAT.size * self.seat_count
+		end = self.offset + self.length
+		street = 0
+		while offset < end:
+			value, offset = read_varint(self.map, offset)
+			position, kind = value >> 3, value & 7
+			if kind == STREET:
+				street = position
+				continue
+			amount = 0
+			if kind != FOLD:
+				amount, offset = read_varint(self.map, offset)
+			yield ActionRecord(street, position, kind, amount)
+
+
+'''
+Memory-mapped reader of a history file. Iterating yields every hand; hands() yields only matching hands,
+checking the fixed-width headers and seats and skipping the rest of each record.
+'''
+class HistoryReader(object):
+
+	def __init__(self, path):
+		self.path = path
+		with open(path, 'rb') as f:
+			if os.fstat(f.fileno()).st_size < FILE_HEADER.size:
+				raise ValueError('%s is not a hand history' % path)
+			self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+		magic, version = FILE_HEADER.unpack_from(self.map)
+		if magic != MAGIC:
+			raise ValueError('%s is not a hand history' % path)
+		if version != VERSION:
+			raise ValueError('%s is a version %d hand history, only version %d can be read' % (path, version, VERSION))
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc_info):
+		self.close()
+
+	def __iter__(self):
+		return self.hands()
+
+	'''
+	Yield the offset of every complete record (a record cut short by a crash is left out),
+	optionally only of the records from offset start up to offset end.
+	'''
+	def offsets(self, start = None, end = None):
+		map_, offset = self.map, FILE_HEADER.size if start is None else start
+		size = len(map_) if end is None else min(end, len(map_))
+		unpack_length = struct.Struct('<I').unpack_from
+		while offset + RECORD.size <= size:
+			length = unpack_length(map_, offset)[0]
+			if offset + length > size:
+				return
+			yield offset
+			offset += length
+
+	'''
+	Return the offset just after the last complete record.
+	'''
+	def end(self):
+		end = FILE_HEADER.size
+		for offset in self.offsets():
+			end = offset + struct.unpack_from('<I', self.map, offset)[0]
+		return end
+
+	'''
+	Yield the HandRecords that match every given filter:
+		player		id of a player who was dealt in
+		position	the player's position (0 = first left of the dealer), needs player
+		showdown	True for hands that went to showdown, False for hands won uncontested
+		won			True for hands the player won money in, False for hands they did not, needs player
+	'''
+	def hands(self, player = None, position = None, showdown = None, won = None):
+		if player is None and (position is not None or won is not None):
+			raise ValueError('position and won filters need a player')
+		map_ = self.map
+		unpack_seat = struct.Struct('<BB').unpack_from # seats, flags
+		unpack_id = struct.Struct('<H').unpack_from
+		unpack_result = struct.Struct('<B').unpack_from
+		for offset in self.offsets():
+			seats, flags = unpack_seat(map_, offset + 12)
+			if showdown is not None and bool(flags & SHOWDOWN) != showdown:
+				continue
+			if player is not None:
+				start = offset + RECORD.size
+				if position is None:
+					positions = range(seats)
+				else:
+					positions = (position,) if position < seats else ()
+				found = None
+				for i in positions:
+					if unpack_id(map_, start + i * SEAT.size)[0] == player:
+						found = i
+						break
+				if found is None:
+					continue
+				if won is not None and bool(unpack_result(map_, start + found * SEAT.size + SEAT.size - 1)[0] & WON) != won:
+					continue
+			yield HandRecord(map_, offset)
+
+	def count(self, **filters):
+		return sum(1 for hand in self.hands(**filters))
+
+	def close(self):
+		self.map.close()
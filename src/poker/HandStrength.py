@@ -0,0 +1,319 @@
+import glob
+import itertools
+import mmap
+import os
+import struct
+import sys
+from multiprocessing import Pool
+import numpy as np
+from .BatchEvaluator import evaluate_batch
+
+'''
+Precomputed hand strength tables for the flop, turn and river.
+
+For every suit-canonical board and every hole pair the build works out:
+	EHS		expected hand strength: the hand's strength against every other hand on the river, averaged over runouts
+	EHS2	the average of the squared river strength, which rewards draws that end up very strong or very weak
+	PPot	positive potential: how much the strength is expected to go up from now to the river
+	NPot	negative potential: how much it is expected to go down
+Strength on a board is exact: all hole pairs are ranked at once and each hand's share of the opponent hands
+it beats (ties counting half) is counted from the sorted ranks, less the opponent hands that share its cards.
+Runouts are enumerated (the flop's 1176, the turn's 48), so nothing is sampled.
+
+The features are clustered with k-means into buckets, numbered from weakest to strongest by EHS. Each street
+gets two files in the table directory:
+	<street>.features	npy float16[boards][1326][4]	EHS, EHS2, PPot, NPot (NaN where a hole card is on the board)
+	<street>.buckets	header (magic, version, board cards, boards, buckets), then
+						uint8[boards][board cards] canonical boards, uint8[boards][1326] buckets, float32[buckets][4] centroids
+Entries are found directly: the board's index among the canonical boards times 1326 plus the hole pair's index,
+so a lookup is a suit canonicalization, a dict read and an array read.
+
+Building is a long job (the flop and turn take a while), so boards are worked out in parts across a process pool
+and each finished part is saved; an interrupted build picks up from the parts it already has.
+'''
+
+MAGIC = b'PKHS'
+VERSION = 1
+HEADER = struct.Struct('<4sHHII') # magic, version, board cards, boards, buckets
+HEADER_SIZE = 16
+DEFAULT_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'strength')
+
+STREETS = {'flop': 3, 'turn': 4, 'river': 5}
+STREET_NAMES = {cards: street for street, cards in STREETS.items()}
+FEATURES = ('ehs', 'ehs2', 'ppot', 'npot')
+PAIRS = 1326
+NO_BUCKET = 255
+BUCKETS = 50
+PART_BOARDS = 16 # boards in a saved part of the build
+RUNOUT_CHUNK = 32 # runouts ranked at once
+KMEANS_SAMPLE = 200000
+KMEANS_ITERATIONS = 25
+
+# every hole pair (low code, high code) in pair index order: index = high * (high - 1) / 2 + low
+PAIR_CODES = np.array([(low, high) for high in range(52) for low in range(high)], dtype=np.int64)
+# pair indexes of the 51 pairs that hold each card
+PAIRS_OF_CARD = np.nonzero((PAIR_CODES[None, :, :] == np.arange(52)[:, None, None]).any(axis=2))[1].reshape(52, 51)
+# card codes under each of the 24 suit permutations
+SUIT_PERMUTATIONS = np.array([[code // 4 * 4 + permutation[code % 4] for code in range(52)]
+	for permutation in itertools.permutations(range(4))], dtype=np.int64)
+
+UNRANKED = np.int64(1 << 40) # rank of a pair that shares a card with the board: never beats or ties anything
+
+def pair_index(first, second):
+	low, high = min(first, second), max(first, second)
+	return high * (high - 1) // 2 + low
+
+
+#####################################################################
+
+'''
+Return every canonical board of the given size, in increasing order: the boards that are the smallest
+(as a sorted tuple of codes) of all their suit permutations. Each board is a row of sorted card codes.
+'''
+def canonical_boards(board_cards):
+	boards = np.array(list(itertools.combinations(range(52), board_cards)), dtype=np.int64)
+	keys = _board_keys(boards)
+	smallest = keys.copy()
+	for permutation in SUIT_PERMUTATIONS[1:]:
+		np.minimum(smallest, _board_keys(np.sort(permutation[boards], axis=1)), out=smallest)
+	return boards[keys == smallest]
+
+def _board_keys(boards):
+	keys = np.zeros(len(boards), dtype=np.int64)
+	for column in range(boards.shape[1]):
+		keys = keys * 52 + boards[:, column]
+	return keys
+
+'''
+Return (canonical board tuple, permuted hole codes) for hole and board card codes: the suit permutation that
+makes the board canonical, applied to both.
+'''
+def canonicalize(hole, board):
+	best, best_permutation = None, None
+	for permutation in SUIT_PERMUTATIONS.tolist():
+		key = tuple(sorted(permutation[code] for code in board))
+		if best is None or key < best:
+			best, best_permutation = key, permutation
+	return best, [best_permutation[code] for code in hole]
+
+'''
+Strength of every hole pair on each full or partial board (rows of card codes): an R x 1326 array of the
+share of opponent hands each pair beats, ties counting half (NaN for pairs that share a card with the board).
+'''
+def strengths(boards):
+	rows, board_cards = boards.shape
+	hands = np.concatenate([np.broadcast_to(PAIR_CODES[None, :, :], (rows, PAIRS, 2)),
+		np.broadcast_to(boards[:, None, :], (rows, PAIRS, board_cards))], axis=2)
+	on_board = np.zeros((rows, 52), dtype=bool)
+	on_board[np.arange(rows)[:, None], boards] = True
+	blocked = on_board[:, PAIR_CODES[:, 0]] | on_board[:, PAIR_CODES[:, 1]] # R x 1326
+	ranks = evaluate_batch(hands.reshape(-1, 2 + board_cards)).reshape(rows, PAIRS).astype(np.int64)
+	ranks[blocked] = UNRANKED
+	below, equal = _count_below_equal(np.sort(ranks, axis=1), ranks, np.arange(rows)[:, None])
+
+	# take out the opponent pairs that share a card with the hand (the hand itself is one of its equals)
+	card_ranks = np.sort(ranks[:, PAIRS_OF_CARD], axis=2).reshape(rows * 52, 51) # ranks of the pairs holding each card
+	for column in range(2):
+		card_below, card_equal = _count_below_equal(card_ranks, ranks, np.arange(rows)[:, None] * 52 + PAIR_CODES[None, :, column])
+		below -= card_below
+		equal -= card_equal
+	equal += 1
+	opponents = (52 - board_cards - 2) * (52 - board_cards - 3) // 2
+	strength = (below + equal / 2) / opponents
+	strength[blocked] = np.nan
+	return strength
+
+'''
+Return how many of the sorted values in rows[segments] are below and equal to each value, by one search
+of all the rows laid end to end.
+'''
+def _count_below_equal(rows, values, segments):
+	width = rows.shape[1]
+	offsets = np.arange(len(rows), dtype=np.int64)[:, None] * (UNRANKED + 1)
+	flat = (rows + offsets).ravel()
+	queries = values + segments * (UNRANKED + 1)
+	starts = segments * width
+	below = np.searchsorted(flat, queries, side='left') - starts
+	return below, np.searchsorted(flat, queries, side='right') - starts - below
+
+'''
+Return the features (1326 x 4: EHS, EHS2, PPot, NPot) of every hole pair on a board of card codes.
+'''
+def board_features(board):
+	board = np.array(board, dtype=np.int64)
+	now = strengths(board[None, :])[0]
+	features = np.full((PAIRS, 4), np.nan)
+	if len(board) == 5:
+		features[:, 0], features[:, 1] = now, now * now
+		features[:, 2] = features[:, 3] = np.where(np.isnan(now), np.nan, 0.0)
+		return features
+
+	live = [code for code in range(52) if code not in set(board.tolist())]
+	runouts = np.array(list(itertools.combinations(live, 5 - len(board))), dtype=np.int64)
+	totals = np.zeros((PAIRS, 4))
+	counts = np.zeros(PAIRS)
+	for start in range(0, len(runouts), RUNOUT_CHUNK):
+		chunk = runouts[start:start + RUNOUT_CHUNK]
+		river = strengths(np.hstack([np.broadcast_to(board, (len(chunk), len(board))), chunk]))
+		valid = ~np.isnan(river) # runouts that use neither hole card
+		river = np.where(valid, river, 0.0)
+		totals[:, 0] += river.sum(axis=0)
+		totals[:, 1] += (river * river).sum(axis=0)
+		totals[:, 2] += (np.maximum(river - now, 0.0) * valid).sum(axis=0)
+		totals[:, 3] += (np.maximum(now - river, 0.0) * valid).sum(axis=0)
+		counts += valid.sum(axis=0)
+	features = totals / np.maximum(counts, 1)[:, None]
+	features[np.isnan(now)] = np.nan
+	return features
+
+
+#####################################################################
+
+def _part_path(directory, street, part):
+	return os.path.join(directory, '%s.parts' % street, 'part-%05d.npy' % part)
+
+'''
+Worker task: work out one part of a street's boards and save it.
+'''
+def _build_part(args):
+	directory, street, part, boards = args
+	features = np.array([board_features(board) for board in boards], dtype=np.float16)
+	path = _part_path(directory, street, part)
+	with open(path + '.tmp', 'wb') as f:
+		np.save(f, features)
+	os.replace(path + '.tmp', path)
+	return part
+
+'''
+Lloyd's k-means on a sample of the feature rows, started from EHS quantiles. Return the centroids, weakest first.
+'''
+def kmeans(points, clusters, iterations = KMEANS_ITERATIONS, seed = 0):
+	rng = np.random.default_rng(seed)
+	if len(points) > KMEANS_SAMPLE:
+		points = points[rng.choice(len(points), KMEANS_SAMPLE, replace=False)]
+	order = np.argsort(points[:, 0], kind='stable')
+	centroids = points[order[(np.arange(clusters) * len(points)) // clusters + len(points) // (2 * clusters)]].copy()
+	for i in range(iterations):
+		labels = nearest(points, centroids)
+		for cluster in range(clusters):
+			members = points[labels == cluster]
+			if len(members):
+				centroids[cluster] = members.mean(axis=0)
+	return centroids[np.argsort(centroids[:, 0], kind='stable')]
+
+def nearest(points, centroids):
+	distances = ((points[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2)
+	return distances.argmin(axis=1)
+
+'''
+Build a street's tables in directory, on processes workers (all cores by default). Parts saved by an earlier,
+interrupted build are reused.
+'''
+def build(street, directory = DEFAULT_DIRECTORY, buckets = BUCKETS, processes = None, seed = 0):
+	board_cards = STREETS[street]
+	boards = canonical_boards(board_cards)
+	os.makedirs(os.path.join(directory, '%s.parts' % street), exist_ok=True)
+	parts = range(0, -(-len(boards) // PART_BOARDS))
+	missing = [(directory, street, part, boards[part * PART_BOARDS:(part + 1) * PART_BOARDS])
+		for part in parts if not os.path.exists(_part_path(directory, street, part))]
+	if missing:
+		with Pool(processes) as pool:
+			for done, part in enumerate(pool.imap_unordered(_build_part, missing), 1):
+				print('%s: %d of %d parts left' % (street, len(missing) - done, len(parts)), file=sys.stderr)
+
+	features_path = os.path.join(directory, '%s.features' % street)
+	features = np.lib.format.open_memmap(features_path + '.tmp', mode='w+', dtype=np.float16, shape=(len(boards), PAIRS, 4))
+	for part in parts:
+		features[part * PART_BOARDS:(part + 1) * PART_BOARDS] = np.load(_part_path(directory, street, part))
+	features.flush()
+
+	rows = features.reshape(-1, 4)
+	valid = ~np.isnan(rows[:, 0])
+	centroids = kmeans(rows[valid].astype(np.float64), buckets, seed=seed)
+	table = np.full(len(rows), NO_BUCKET, dtype=np.uint8)
+	for start in range(0, len(rows), 1 << 20):
+		chunk = rows[start:start + (1 << 20)].astype(np.float64)
+		chunk_valid = ~np.isnan(chunk[:, 0])
+		table[start:start + len(chunk)][chunk_valid] = nearest(chunk[chunk_valid], centroids)
+	del features, rows
+
+	buckets_path = os.path.join(directory, '%s.buckets' % street)
+	with open(buckets_path + '.tmp', 'wb') as f:
+		f.write(HEADER.pack(MAGIC, VERSION, board_cards, len(boards), buckets).ljust(HEADER_SIZE, b'\0'))
+		f.write(boards.astype(np.uint8).tobytes())
+		f.write(table.tobytes())
+		f.write(centroids.astype('<f4').tobytes())
+	os.replace(features_path + '.tmp', features_path)
+	os.replace(buckets_path + '.tmp', buckets_path)
+	for path in glob.glob(os.path.join(directory, '%s.parts' % street, 'part-*.npy')):
+		os.remove(path)
+	os.rmdir(os.path.join(directory, '%s.parts' % street))
+
+
+#####################################################################
+
+'''
+Memory-mapped bucket table and features of one street.
+'''
+class StrengthTable(object):
+
+	def __init__(self, street, directory = DEFAULT_DIRECTORY):
+		path = os.path.join(directory, '%s.buckets' % street)
+		with open(path, 'rb') as f:
+			self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+		magic, version, self.board_cards, boards, self.buckets = HEADER.unpack_from(self.map)
+		if magic != MAGIC or version != VERSION:
+			raise ValueError('%s is not a hand strength table' % path)
+		offset = HEADER_SIZE
+		board_rows = np.frombuffer(self.map, dtype=np.uint8, count=boards * self.board_cards, offset=offset).reshape(boards, self.board_cards)
+		offset += board_rows.nbytes
+		self.table = np.frombuffer(self.map, dtype=np.uint8, count=boards * PAIRS, offset=offset)
+		offset += self.table.nbytes
+		self.centroids = np.frombuffer(self.map, dtype='<f4', count=self.buckets * 4, offset=offset).reshape(self.buckets, 4)
+		self.boards = {tuple(board): index for index, board in enumerate(board_rows.tolist())}
+		self.features = np.load(os.path.join(directory, '%s.features' % street), mmap_mode='r').reshape(-1, 4)
+
+	def index(self, hole, board):
+		canonical_board, hole = canonicalize(hole, board)
+		return self.boards[canonical_board] * PAIRS + pair_index(*hole)
+
+	def bucket(self, hole, board):
+		return int(self.table[self.index(hole, board)])
+
+	'''
+	Return {feature name: value} for the hand.
+	'''
+	def lookup(self, hole, board):
+		return dict(zip(FEATURES, self.features[self.index(hole, board)].astype(float).tolist()))
+
+_tables = {}
+
+'''
+Return the table of a street, mapping it on first use.
+'''
+def strength_table(street, directory = DEFAULT_DIRECTORY):
+	key = (street, directory)
+	if key not in _tables:
+		_tables[key] = StrengthTable(street, directory)
+	return _tables[key]
+
+def _codes(cards):
+	return [card if isinstance(card, int) else card.code for card in getattr(cards, 'cards', cards)]
+
+'''
+Return the bucket (0 weakest) of a hand (a Hand, Cards or card codes) on a flop, turn or river board (i.e. Pot.cards).
+'''
+def hand_bucket(hole, board, directory = DEFAULT_DIRECTORY):
+	board = _codes(board)
+	return strength_table(STREET_NAMES[len(board)], directory).bucket(_codes(hole), board)
+
+'''
+Return the EHS, EHS2, PPot and NPot of a hand on a flop, turn or river board.
+'''
+def hand_strength(hole, board, directory = DEFAULT_DIRECTORY):
+	board = _codes(board)
+	return strength_table(STREET_NAMES[len(board)], directory).lookup(_codes(hole), board)
+
+if __name__ == '__main__':
+	# python -m poker.HandStrength street [directory] [buckets]
+	build(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else DEFAULT_DIRECTORY, int(sys.argv[3]) if len(sys.argv) > 3 else BUCKETS)
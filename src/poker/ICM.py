@@ -0,0 +1,124 @@
+import math
+import numpy as np
+from .Equity import EquityCache
+
+'''
+Independent Chip Model: each player's expected share of the prize pool from the chip stacks alone.
+A player finishes first with probability stack / total chips, then the next place is decided the same way
+among the players left, and so on (the Malmuth-Harville model).
+
+The exact calculation is a dynamic program over the set of players already placed (a bitmask), only going
+as deep as the places that pay: O(n * sum(C(n, j), j < paid places)) rather than O(n!). When that is too many
+states, finishing orders are sampled instead: ordering players by exponential arrival times with rate
+equal to their stacks gives the same distribution over orders.
+'''
+
+MAX_STATES = 200000 # largest dynamic program before falling back to Monte Carlo
+SAMPLES = 200000 # Monte Carlo finishing orders
+CHUNK = 50000 # finishing orders sampled at once
+
+ICM_CACHE = EquityCache() # results by (sorted stacks, payouts), shared by icm calls that do not pass their own
+
+'''
+Number of dynamic program states for n players and the given number of paid places.
+'''
+def states(n, places):
+	return sum(math.comb(n, j) for j in range(min(n, places)))
+
+'''
+Exact ICM equities. stacks holds one value per player: a number, or a numpy column of stacks to work out
+many stack configurations at once (every operation is then done over the whole column).
+'''
+def _harville(stacks, payouts):
+	total = sum(stacks)
+	players = len(stacks)
+	places = min(players, len(payouts))
+	equities = [0.0] * players
+	level = {0: (1.0, 0.0)} # mask of players placed -> (probability, their chips)
+	for place in range(places):
+		payout = payouts[place]
+		deeper = place + 1 < places
+		next_level = dict()
+		for mask, (probability, placed_chips) in level.items():
+			remaining = total - placed_chips
+			for i in range(players):
+				if mask >> i & 1:
+					continue
+				finish = probability * stacks[i] / remaining # player i takes this place
+				equities[i] = equities[i] + payout * finish
+				if deeper:
+					key = mask | 1 << i
+					entry = next_level.get(key)
+					next_level[key] = (finish, placed_chips + stacks[i]) if entry is None else (entry[0] + finish, entry[1])
+		level = next_level
+	return equities
+
+'''
+Monte Carlo ICM equities from sampled finishing orders.
+'''
+def monte_carlo_icm(stacks, payouts, samples = SAMPLES, seed = None):
+	rng = np.random.default_rng(seed)
+	stacks = np.asarray(stacks, dtype=np.float64)
+	players = len(stacks)
+	places = min(players, len(payouts))
+	totals = np.zeros(players)
+	for start in range(0, samples, CHUNK):
+		size = min(CHUNK, samples - start)
+		arrivals = rng.exponential(size=(size, players)) / stacks # earliest arrival finishes first
+		order = np.argpartition(arrivals, places - 1, axis=1)[:, :places] if places < players else np.arange(players)[None, :].repeat(size, axis=0)
+		order = np.take_along_axis(order, np.argsort(np.take_along_axis(arrivals, order, axis=1), axis=1), axis=1)
+		for place in range(places):
+			totals += payouts[place] * np.bincount(order[:, place], minlength=players)
+	return (totals / samples).tolist()
+
+'''
+ICM equity of each stack (players with no chips get nothing). Results are cached under the sorted stacks,
+so the same stacks in any seat order are only worked out once.
+'''
+def icm(stacks, payouts, max_states = MAX_STATES, samples = SAMPLES, seed = None, cache = ICM_CACHE):
+	alive = [i for i, stack in enumerate(stacks) if stack > 0]
+	order = sorted(alive, key=lambda i: stacks[i])
+	key = (tuple(stacks[i] for i in order), tuple(payouts))
+	sorted_equities = cache.get(key) if cache is not None else None
+	if sorted_equities is None:
+		if states(len(order), len(payouts)) <= max_states:
+			sorted_equities = _harville([float(stack) for stack in key[0]], payouts)
+		else:
+			sorted_equities = monte_carlo_icm(key[0], payouts, samples, seed)
+		if cache is not None:
+			cache.put(key, sorted_equities)
+	equities = [0.0] * len(stacks)
+	for i, equity in zip(order, sorted_equities):
+		equities[i] = equity
+	return equities
+
+'''
+ICM equity of each Player from their money, i.e. icm_players(game.players_left, payouts). Return {player: equity}.
+'''
+def icm_players(players, payouts, **options):
+	return dict(zip(players, icm([player.money for player in players], payouts, **options)))
+
+'''
+ICM equities of many stack configurations (rows of the same number of players). Return an array with a
+row of equities per configuration. Configurations are worked out together, one dynamic program over
+columns of stacks, and repeated configurations only once.
+'''
+def icm_batch(stack_rows, payouts, max_states = MAX_STATES, samples = SAMPLES, seed = None):
+	stack_rows = np.asarray(stack_rows, dtype=np.float64)
+	rows, players = stack_rows.shape
+	order = np.argsort(stack_rows, axis=1, kind='stable')
+	sorted_rows = np.take_along_axis(stack_rows, order, axis=1)
+	unique, inverse = np.unique(sorted_rows, axis=0, return_inverse=True)
+	inverse = inverse.reshape(-1)
+
+	if (unique <= 0).any():
+		# players with no chips change the number of players that share the payouts, so go one at a time
+		sorted_equities = np.array([icm(list(row), payouts, max_states, samples, seed, cache=None) for row in unique])
+	elif states(players, len(payouts)) <= max_states:
+		sorted_equities = np.column_stack(_harville([unique[:, i] for i in range(players)], payouts))
+	else:
+		sorted_equities = np.array([monte_carlo_icm(row, payouts, samples, seed) for row in unique])
+
+	equities = np.empty_like(stack_rows)
+	np.put_along_axis(equities, order, sorted_equities[inverse], axis=1)
+	return equities
@@ -0,0 +1,265 @@
+import json
+import math
+import os
+from bisect import bisect_left
+from time import perf_counter
+from .Agent import Agent
+from .Poker import Round
+
+'''
+In-process metrics registry (counters and histograms with labels) and the instrumentation of Poker and Round.
+
+A game only pays for metrics when it is given a GameMetrics: its rounds are then InstrumentedRounds, which
+time each phase, and each player's agent is wrapped to time its decisions. Without one the game plays plain
+Rounds and the only cost is checking for metrics once per round.
+
+	metrics = GameMetrics(Registry(), table='1')
+	Poker(100, agents=agents, metrics=metrics).play()
+	metrics.registry.write('metrics.prom')
+'''
+
+# seconds, from a microsecond up
+DEFAULT_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STREET_NAMES = ['preflop', 'flop', 'turn', 'river']
+
+class Counter(object):
+
+	def __init__(self):
+		self.value = 0
+
+	def inc(self, amount = 1):
+		self.value += amount
+
+	def sample(self):
+		return {'value': self.value}
+
+class Histogram(object):
+
+	def __init__(self, buckets = DEFAULT_BUCKETS):
+		self.buckets = tuple(buckets) # upper bounds, the +Inf bucket is implied
+		self.counts = [0] * (len(self.buckets) + 1) # per bucket, not cumulative
+		self.sum = 0.0
+		self.count = 0
+
+	def observe(self, value):
+		self.counts[bisect_left(self.buckets, value)] += 1
+		self.sum += value
+		self.count += 1
+
+	def sample(self):
+		cumulative, buckets = 0, {}
+		for bound, count in zip(self.buckets + (math.inf,), self.counts):
+			cumulative += count
+			buckets[_format_bound(bound)] = cumulative
+		return {'buckets': buckets, 'sum': self.sum, 'count': self.count}
+
+def _format_bound(bound):
+	return '+Inf' if bound == math.inf else repr(float(bound))
+
+'''
+A named metric with one child Counter or Histogram per set of label values.
+'''
+class Family(object):
+
+	def __init__(self, name, help_, type_, factory):
+		self.name = name
+		self.help = help_
+		self.type = type_
+		self.factory = factory
+		self.children = dict() # sorted (label, value) tuples -> child
+
+	def labels(self, **labels):
+		key = tuple(sorted((label, str(value)) for label, value in labels.items()))
+		child = self.children.get(key)
+		if child is None:
+			child = self.children[key] = self.factory()
+		return child
+
+class Registry(object):
+
+	def __init__(self):
+		self.families = dict()
+
+	def counter(self, name, help_ = ''):
+		return self._family(name, help_, 'counter', Counter)
+
+	def histogram(self, name, help_ = '', buckets = DEFAULT_BUCKETS):
+		return self._family(name, help_, 'histogram', lambda: Histogram(buckets))
+
+	def _family(self, name, help_, type_, factory):
+		family = self.families.get(name)
+		if family is None:
+			family = self.families[name] = Family(name, help_, type_, factory)
+		elif family.type != type_:
+			raise ValueError('%s is already registered as a %s' % (name, family.type))
+		return family
+
+	'''
+	Return the metrics in the Prometheus text exposition format.
+	'''
+	def to_prometheus(self):
+		lines = []
+		for family in self.families.values():
+			lines.append('# HELP %s %s' % (family.name, family.help))
+			lines.append('# TYPE %s %s' % (family.name, family.type))
+			for key, child in family.children.items():
+				sample = child.sample()
+				if family.type == 'counter':
+					lines.append('%s%s %s' % (family.name, _format_labels(key), sample['value']))
+					continue
+				for bound, count in sample['buckets'].items():
+					lines.append('%s_bucket%s %d' % (family.name, _format_labels(key + (('le', bound),)), count))
+				lines.append('%s_sum%s %r' % (family.name, _format_labels(key), sample['sum']))
+				lines.append('%s_count%s %d' % (family.name, _format_labels(key), sample['count']))
+		return '\n'.join(lines) + '\n'
+
+	def to_dict(self):
+		return {family.name: {
+				'help': family.help,
+				'type': family.type,
+				'samples': [dict(labels=dict(key), **child.sample()) for key, child in family.children.items()],
+			} for family in self.families.values()}
+
+	'''
+	Write the metrics to path, in the Prometheus text format or as JSON.
+	The file is replaced in one step, so a scraper never reads half a dump.
+	'''
+	def write(self, path, format_ = 'prometheus'):
+		if format_ == 'prometheus':
+			text = self.to_prometheus()
+		elif format_ == 'json':
+			text = json.dumps(self.to_dict(), indent=2)
+		else:
+			raise ValueError('Unknown metrics format %r' % format_)
+		with open(path + '.tmp', 'w') as f:
+			f.write(text)
+		os.replace(path + '.tmp', path)
+
+def _format_labels(key):
+	if not key:
+		return ''
+	return '{%s}' % ','.join('%s="%s"' % (label, value.replace('\\', '\\\\').replace('"', '\\"')) for label, value in key)
+
+
+#####################################################################
+
+'''
+Return method wrapped to add one to counter on every call.
+'''
+def counted(method, counter):
+	def wrapper(*args, **kwargs):
+		counter.value += 1
+		return method(*args, **kwargs)
+	return wrapper
+
+'''
+Agent that times another agent's decisions.
+'''
+class TimedAgent(Agent):
+
+	def __init__(self, agent, histogram):
+		self.agent = agent
+		self.histogram = histogram
+
+	def see_hand(self, player, hand):
+		self.agent.see_hand(player, hand)
+
+	def decide(self, player, curr_round, amount_to_call):
+		start = perf_counter()
+		try:
+			return self.agent.decide(player, curr_round, amount_to_call)
+		finally:
+			self.histogram.observe(perf_counter() - start)
+
+'''
+Round that times each of its phases into the game's GameMetrics.
+'''
+class InstrumentedRound(Round):
+
+	def __init__(self, game, players, seed = None):
+		super().__init__(game, players, seed)
+		self.metrics = game.metrics
+		self.seats.next_active = counted(self.seats.next_active, self.metrics.next_player)
+
+	def do_blinds(self):
+		start = perf_counter()
+		Round.do_blinds(self)
+		self.metrics.do_blinds.observe(perf_counter() - start)
+
+	def pre_flop(self):
+		start = perf_counter()
+		Round.pre_flop(self)
+		self.metrics.pre_flop.observe(perf_counter() - start)
+
+	# betting, flop and show_card do nothing once everyone else has folded, so only time them when they run
+
+	def betting(self, pot_balanced):
+		if self.winner() is not None:
+			return
+		street, start = self.street, perf_counter()
+		Round.betting(self, pot_balanced)
+		self.metrics.betting[street].observe(perf_counter() - start)
+
+	def flop(self):
+		if self.winner() is not None:
+			return
+		start = perf_counter()
+		Round.flop(self)
+		self.metrics.flop.observe(perf_counter() - start)
+
+	def show_card(self):
+		if self.winner() is not None:
+			return
+		start = perf_counter()
+		Round.show_card(self)
+		self.metrics.show_card[self.street].observe(perf_counter() - start)
+
+	def score_player_hands(self):
+		start = perf_counter()
+		if self.winner() is None: # hand trackers only work out a rank when it is asked for, here at showdown
+			self.metrics.evaluations.value += len(self.seats)
+		scores = Round.score_player_hands(self)
+		self.metrics.score_player_hands.observe(perf_counter() - start)
+		return scores
+
+	def give_out_winnings(self, scores):
+		start = perf_counter()
+		Round.give_out_winnings(self, scores)
+		self.metrics.give_out_winnings.observe(perf_counter() - start)
+
+	def play(self):
+		start = perf_counter()
+		Round.play(self)
+		self.metrics.rounds.observe(perf_counter() - start)
+
+'''
+Metrics of the games played at a table. Every metric carries the given labels (i.e. table='3'),
+so several tables can share one registry.
+'''
+class GameMetrics(object):
+
+	round_class = InstrumentedRound
+
+	def __init__(self, registry = None, **labels):
+		self.registry = registry if registry is not None else Registry()
+		phases = self.registry.histogram('poker_phase_seconds', 'Wall time of each phase of a round')
+		self.do_blinds = phases.labels(phase='do_blinds', **labels)
+		self.pre_flop = phases.labels(phase='pre_flop', **labels)
+		self.flop = phases.labels(phase='flop', **labels)
+		self.score_player_hands = phases.labels(phase='score_player_hands', **labels)
+		self.give_out_winnings = phases.labels(phase='give_out_winnings', **labels)
+		self.betting = [phases.labels(phase='betting', street=street, **labels) for street in STREET_NAMES]
+		self.show_card = {street: phases.labels(phase='show_card', street=STREET_NAMES[street], **labels) for street in (2, 3)}
+		self.rounds = self.registry.histogram('poker_round_seconds', 'Wall time of whole rounds').labels(**labels)
+		self.decisions = self.registry.histogram('poker_decision_seconds', 'Latency of agent decisions').labels(**labels)
+		self.evaluations = self.registry.counter('poker_hand_evaluations_total', 'Hand rank evaluations, one per player still in at showdown').labels(**labels)
+		self.next_player = self.registry.counter('poker_next_player_calls_total', 'Lookups of the next player to act or deal').labels(**labels)
+
+	'''
+	Wrap the agents of a game's players and count the game's dealer rotation, once its players are seated.
+	'''
+	def instrument_game(self, game):
+		for player in game.players:
+			if not isinstance(player.agent, TimedAgent):
+				player.agent = TimedAgent(player.agent, self.decisions)
+		game.seats.next_active = counted(game.seats.next_active, self.next_player)
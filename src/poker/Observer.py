@@ -0,0 +1,42 @@
+'''
+Observers receive the game's events instead of the game printing them.
+Each event has a name and keyword information, i.e. event('call', player=player, amount=2).
+'''
+class Observer(object):
+
+	def event(self, name, **info):
+		pass
+
+'''
+Observer that prints the game to the terminal.
+'''
+class ConsoleObserver(Observer):
+
+	MESSAGES = {
+		'start_money': lambda info: '\nPlayers start with %s dollars' % info['money'],
+		'dealer': lambda info: ' - Player %s is chosen as the dealer' % info['player'].id,
+		'round_start': lambda info: 'Starting a new round!',
+		'blind': lambda info: ' - Player %s posts a %s blind of %s' % (info['player'].id, info['type_'], info['amount']),
+		'blind_failed': lambda info: ' - Player %s cannot post a blind of %s and goes out' % (info['player'].id, info['amount']),
+		'betting': lambda info: 'Betting now begins with player %s' % info['player'].id,
+		'to_call': lambda info: 'Player %s the amount you need to call is %s' % (info['player'].id, info['amount']),
+		'all_in': lambda info: ' - Player %s is all in for %s' % (info['player'].id, info['amount']),
+		'fold': lambda info: ' - Player %s folds\n' % info['player'].id,
+		'call': lambda info: ' - Player %s calls with a bet of %s\n' % (info['player'].id, info['amount']),
+		'raise': lambda info: ' - Player %s raises %s for a total bid of %s\n' % (info['player'].id, info['raise_by'], info['amount']),
+		'invalid_action': lambda info: 'Action is not valid',
+		'insufficient_money': lambda info: 'You do not have enough money to bid that amount',
+		'flop': lambda info: '3 cards are now dealt face-up\n%s \n' % [str(card) for card in info['cards']],
+		'card': lambda info: 'Another card is dealt\n%s \n' % [str(card) for card in info['pot_cards']],
+		'showdown': lambda info: ' - Player %s uses the hand %s' % (info['player'].id, info['player'].hand.best_hand(info['pot_cards'], info['score'])),
+		'round_winner': lambda info: 'Player %s wins %s dollars this round! \n' % (info['player'].id, info['amount']),
+		'balance': lambda info: 'Player %s you have %s dollars' % (info['player'].id, info['player'].money),
+		'round_end': lambda info: '\n####################\n',
+		'bankrupt': lambda info: 'Player %s has gone bankrupt' % info['player'].id,
+		'game_winner': lambda info: 'Player %s you are the winner!' % info['player'].id,
+	}
+
+	def event(self, name, **info):
+		message = self.MESSAGES.get(name)
+		if message is not None:
+			print(message(info))
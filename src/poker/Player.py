@@ -0,0 +1,149 @@
+from .Deck import Deck
+from .Hand import Hand
+from .Agent import HumanAgent, CALL, RAISE
+from .Observer import Observer
+
+class Player:
+
+	def __init__(self, id_, money, hand = None, agent = None, observer = None):
+		self.id = id_ # id determines order of play
+		self.money = money
+		self.hand = hand # defaults to None
+		self.agent = agent if agent is not None else HumanAgent() # makes the player's decisions
+		self.observer = observer if observer is not None else Observer() # receives the player's events
+
+	def __repr__(self):
+		return 'Player(id=%r, money=%r, hand=%r)' % (self.id, self.money, self.hand)
+
+	def deal_hand(self, hand):
+		self.hand = hand
+		self.agent.see_hand(self, hand)
+
+	'''
+	Force a player's blind and return T/F if they can/cannot post a blind.
+	A player who cannot make the full blind goes all in with what they have.
+	'''
+	def force_blind(self, type_, pot, blind_money):
+		if self.money > 0:
+			blind_money = min(blind_money, self.money)
+			self.bid(pot, blind_money)
+			self.observer.event('blind', player=self, type_=type_, amount=blind_money)
+			return True
+		else: # player has no money to post a blind, goes out
+			self.observer.event('blind_failed', player=self, type_=type_, amount=blind_money)
+			return False
+
+	'''
+	Bet money into the pot. A bet of all the player's money puts them all in.
+	'''
+	def bid(self, pot, bid):
+		if self.money - bid < 0:
+			self.observer.event('insufficient_money', player=self, amount=bid)
+		else:
+			self.money -= bid
+			pot.add_bet(self, bid, all_in=self.money == 0)
+			if self.money == 0:
+				self.observer.event('all_in', player=self, amount=pot.money[self])
+
+	def action(self, curr_round):
+		# players who are all in have nothing left to decide
+		if curr_round.pot.is_all_in(self):
+			return
+
+		while True: # until the agent gives a valid action
+			amount_to_call = self.to_call(curr_round)
+			res, raise_by = self.agent.decide(self, curr_round, amount_to_call)
+			if self.act(curr_round, amount_to_call, res, raise_by):
+				return
+
+	'''
+	Tell the player the amount they need to call and return it.
+	If player cannot make the full call, calling puts them all in for less.
+	'''
+	def to_call(self, curr_round):
+		amount_to_call = curr_round.pot.amount_to_call(self)
+		self.observer.event('to_call', player=self, amount=amount_to_call)
+		return min(amount_to_call, self.money)
+
+	'''
+	Perform the agent's decision. Return False if it is not valid.
+	'''
+	def act(self, curr_round, amount_to_call, res, raise_by):
+		if res == CALL:
+			action = Call(self, curr_round, amount_to_call)
+		elif res == RAISE:
+			action = Raise(self, curr_round, amount_to_call, raise_by)
+		else: # assume 'f'
+			action = Fold(self, curr_round)
+
+		if action.is_valid():
+			action.perform()
+			return True
+		self.observer.event('invalid_action', player=self)
+		return False
+
+	def add_winnings(self, winnings):
+		self.money += winnings
+
+######################################################################
+
+class Action(object):
+	def __init__(self, player, _round):
+		self.player = player
+		self.round = _round
+
+	def is_valid():
+		raise NotImplementedError("Can not validate Action")
+
+	def perform():
+		raise NotImplementedError("Can not validate Action")
+
+class Fold(Action):
+	def __init__(self, player, _round):
+		super().__init__(player, _round)
+
+	def is_valid(self):
+		return self.player in self.round.player_order
+
+	def perform(self):
+		self.player.observer.event('fold', player=self.player)
+		self.round.add_folded_player(self.player)
+		self.round.pot.remove_player(self.player)
+
+class Call(Action):
+	def __init__(self, player, _round, amount_to_call):
+		super().__init__(player, _round)
+		self.amount_to_call = amount_to_call
+	
+	def is_valid(self):
+		return self.player.money >= self.amount_to_call
+
+	def perform(self):
+		self.player.observer.event('call', player=self.player, amount=self.amount_to_call)
+		self.player.bid(self.round.pot, self.amount_to_call)
+
+class Raise(Action):
+	def __init__(self, player, _round, amount_to_call, raise_by):
+		super().__init__(player, _round)
+		self.amount_to_call = amount_to_call
+		self.raise_by = raise_by
+
+	def is_valid(self):
+		return self.raise_by > 0 and self.player.money >= self.amount_to_call + self.raise_by
+
+	def perform(self):
+		total_bid = self.amount_to_call + self.raise_by
+		self.player.observer.event('raise', player=self.player, raise_by=self.raise_by, amount=total_bid)
+		self.player.bid(self.round.pot, total_bid)
+		self.round.raises += 1
+
+
+#####################################################################
+
+'''
+deck = Deck()
+h1 = Hand(deck.deal(2))
+p1 = Player(3, h1)
+print(p1.hand)
+'''
+
@@ -0,0 +1,442 @@
+from .Player import Player
+from .Hand import Hand
+from .Deck import Deck
+from .Pot import Pot
+from .Seats import SeatRing
+from .Card import Card
+from .GameState import GameState, BETTING, CHANCE, DONE, ACTIVE, FOLDED, ALL_IN, NO_BET
+from .Agent import HumanAgent
+from .Observer import Observer, ConsoleObserver
+from random import Random
+from array import array
+
+'''
+Function used by both classes. Return the object of the next player to bid.
+'''
+def get_next_player(prev_player, all_players, players_left):
+	prev_player_index = player_index(prev_player, all_players)
+	for offset in range(1, len(all_players) + 1): # go around the table once, wrapping past the end
+		next_player = all_players[(prev_player_index + offset) % len(all_players)]
+		if next_player in players_left:
+			return next_player
+
+	return all_players[0]
+
+'''
+Return the index of the given player in the list of players.
+'''
+def player_index(player, players):
+	player_ids = [p.id for p in players]
+	if player.id in player_ids:
+		return player_ids.index(player.id)
+	else:
+		raise Exception('Player does not exist with id', id_)
+
+'''
+Return the player object with the given id_.
+'''
+def player_from_id(id_, players):
+	objects = [player for player in players if player.id == id_]
+	if objects:
+		return objects[0]
+	else:
+		raise Exception('Player does not exist with id', id_)
+
+
+############################################################################
+
+
+class Poker:
+
+	'''
+	Without agents, players are asked for at the terminal and the game is printed.
+	With a list of agents (one per player), the game runs headless and only sends events to observer.
+	With a GameMetrics (see Metrics.py), each round's phases and the agents' decisions are timed.
+	minimum_bid is the big blind, the small blind is half of it.
+	With a Variant (see Variant.py) the game deals and scores that variant instead of Texas hold'em.
+	'''
+	def __init__(self, start_money, seed = None, agents = None, observer = None, metrics = None, minimum_bid = 2, variant = None):
+		# game objects
+		self.players = list()
+		self.players_left = list() # players who have not gone bankrupt
+		self.seats = None # ring of players who have not gone bankrupt, for dealer rotation
+		self.agents = agents
+		self.observer = observer if observer is not None else (Observer() if agents else ConsoleObserver())
+		self.metrics = metrics
+		self.rng = Random(seed) # table's random stream, hands are seeded from it
+		self.variant = variant
+		self.deck = Deck(variant=variant) # one deck for the table, reset each round
+		# game information
+		self.dealer = None
+		self.starting_money = start_money
+		self.minimum_bid = minimum_bid
+
+	'''
+	Initialize game by setting up player objects and dealing cards.
+	Players are numbered from 1 and start with start_money, unless ids and stacks are given
+	(i.e. to carry on a tournament table), and the dealer is the player with id dealer or chosen at random.
+	'''
+	def initialize(self, ids = None, stacks = None, dealer = None):
+		# generate players
+		agents = self.agents
+		if agents is None:
+			num_players = input('Welcome to Poker! How many players are playing? ')
+			agents = [HumanAgent() for i in range(int(num_players))]
+		self.observer.event('start_money', money=self.starting_money)
+		for i, agent in enumerate(agents):
+			self.players.append(Player(ids[i] if ids else i+1, stacks[i] if stacks else self.starting_money, agent=agent, observer=self.observer))
+		self.players_left = self.players.copy() # important so modifications to one don't affect the other
+		self.seats = SeatRing(self.players)
+		if self.metrics is not None:
+			self.metrics.instrument_game(self)
+		dealers = [player for player in self.players if player.id == dealer]
+		self.dealer = dealers[0] if dealers else self.rng.choice(self.players)
+		self.observer.event('dealer', player=self.dealer)
+
+	def remove_bankrupt_players(self):
+		# determine bankrupt players
+		bankrupt_players = list()
+		for player in self.players_left:
+			if player.money == 0:
+				self.observer.event('bankrupt', player=player)
+				bankrupt_players.append(player)
+
+		# remove players
+		for bankrupt_player in bankrupt_players:
+			self.remove_player(bankrupt_player)
+
+	'''
+	Take a player out of the game.
+	'''
+	def remove_player(self, player):
+		self.players_left.remove(player)
+		self.seats.remove(player)
+
+	'''
+	Play rounds until one player is left, or until max_rounds have been played. Return the number of rounds played.
+	'''
+	def play(self, max_rounds = None):
+		if self.seats is None: # not initialized yet
+			self.initialize()
+		rounds = 0
+		while len(self.players_left) > 1 and rounds != max_rounds:
+			this_round = self.new_round()
+			this_round.play()
+			rounds += 1
+			self.end_round()
+
+		self.end_game()
+		return rounds
+
+	'''
+	Start a round with the players left in the game.
+	'''
+	def new_round(self, round_class = None):
+		if round_class is None:
+			round_class = Round if self.metrics is None else self.metrics.round_class
+		this_round = round_class(self, self.players_left)
+		self.observer.event('round_start', round=this_round)
+		return this_round
+
+	def end_round(self):
+		self.remove_bankrupt_players() # remove any players who have gone bankrupt
+
+		# set next dealer in game
+		self.dealer = self.seats.next_active(self.dealer)
+
+	def end_game(self):
+		if len(self.players_left) == 1:
+			self.observer.event('game_winner', player=self.players_left[0])
+
+
+############################################################################
+
+
+'''
+A round ends when all 5 cards have been dealt and all hands scored.
+'''
+class Round:
+
+	'''
+	Initialize game information. Players assumed to sit by increasing player number clockwise.
+	'''
+	def __init__(self, game, players, seed = None):
+		# game information
+		self.game = game
+		self.seed = game.rng.getrandbits(64) if seed is None else seed # replays this round's cards
+		self.deck = game.deck
+		self.deck.reset(self.seed)
+		self.minimum_bid = game.minimum_bid # big blind
+		self.variant = game.variant
+		self.hole_cards = 2 if self.variant is None else self.variant.hole_cards
+		# round-specific information
+		self.pot = Pot() # pot holds community cards and money for the round
+		self.player_order = self.set_player_order(players)
+		self.seats = SeatRing(self.player_order) # players who have not folded, in turn order
+		self.folded_players = list()
+		self.street = 0 # 0 = pre-flop, 1 = flop, 2 = turn, 3 = river
+		# betting order information
+		self.small_blind = self.seats.next_active(game.dealer)
+		self.big_blind = self.seats.next_active(self.small_blind)
+		self.betting_player = None
+		self.actions_left = None # actions owed before the pot can close, None outside of betting
+		self.raises = 0 # raises made on this street
+
+	'''
+	Return list of player objects in the order that they will play, starting left of the dealer.
+	'''
+	def set_player_order(self, players):
+		if len(players) == len(self.game.seats):
+			return self.game.seats.order_after(self.game.dealer)
+		in_round = set(players) # only players in the round
+		return [player for player in self.game.seats.order_after(self.game.dealer) if player in in_round]
+
+	'''
+	Big and little blind are forced to make bids.
+	Players are assumed to sit in number order clockwise.
+	Play starts to the left of the dealer.
+	(i.e., if 5 players are playing and player 2 is the dealer, player 1 = the small blind, player 5 = the big blind)
+	'''
+	def do_blinds(self):
+		made_small_blind = self.small_blind.force_blind('small', self.pot, self.minimum_bid//2)
+		if not made_small_blind:
+			self.add_folded_player(self.small_blind, True)
+		
+		made_big_blind = self.big_blind.force_blind('big', self.pot, self.minimum_bid)
+		if not made_big_blind:
+			self.add_folded_player(self.big_blind, True)
+
+		# set next player
+		self.betting_player = self.seats.next_active(self.big_blind)
+
+	'''
+	Cards are dealt to each player.
+	'''
+	def pre_flop(self):
+		for player in self.player_order:
+			new_hand = Hand(self.deck.deal(self.hole_cards), variant=self.variant)
+			player.deal_hand(new_hand)
+
+	'''
+	Conducts 1 round of betting until all players have checked or folded (aka pot is balanced).
+	'''
+	def betting(self, pot_balanced):
+		for player in self.betting_turns(pot_balanced):
+			player.action(self) # pass in current round as parameter
+
+	'''
+	The betting loop: yield each player whose turn it is, once the player after them is known. The caller
+	gets the player's action before the loop goes on (betting with Player.action, AsyncRound by awaiting it).
+	'''
+	def betting_turns(self, pot_balanced):
+		if self.winner() is not None:
+			return
+
+		self.game.observer.event('betting', player=self.betting_player)
+		# if pot_balanced, give players the chance to bet: get an action from all players still in the round
+		self.actions_left = len(self.seats) if pot_balanced else 0
+		self.raises = 0
+		# then if the pot is not balanced, continue around
+		while self.actions_left > 0 or not self.pot.balanced():
+			next_up = self.seats.next_active(self.betting_player) # get next_up first, in case self.betting_player folds
+			yield self.betting_player
+			self.betting_player = next_up
+			if self.actions_left > 0:
+				self.actions_left -= 1
+			if self.seats.count == 1: # a winner
+				break
+		self.actions_left = None
+
+	'''
+	Deal 3 cards face-up from the deck and show to players.
+	'''
+	def flop(self):
+		if self.winner() is not None:
+			return
+		self.street = 1
+		flop_cards = self.deck.deal(3)
+		self.pot.add_cards(flop_cards)
+		self.track_cards(flop_cards)
+		self.game.observer.event('flop', cards=flop_cards)
+
+	'''
+	Flip over a new card and show it to players.
+	'''
+	def show_card(self):
+		if self.winner() is not None:
+			return
+		self.street += 1
+		face_up_card = self.deck.deal(1)
+		self.pot.add_cards(face_up_card)
+		self.track_cards(face_up_card)
+		self.game.observer.event('card', cards=face_up_card, pot_cards=self.pot.cards)
+	
+	'''
+	Update the hand strength of every player still in the round with new board cards.
+	'''
+	def track_cards(self, cards):
+		for player in self.seats:
+			player.hand.tracker.add_cards(cards)
+
+	'''
+	Returns players who have not folded in the round.
+	'''
+	@property
+	def active_players(self):
+		return list(self.seats)
+
+	'''
+	Remove player object from lists of players still in the round.
+	'''
+	def add_folded_player(self, player, remove_from_game = False):
+		self.folded_players.append(player)
+		self.seats.remove(player)
+		if remove_from_game:
+			self.game.remove_player(player)
+
+	'''
+	Check if there is a winner (i.e., just one player who has not folded)
+	'''
+	def winner(self):
+		return self.seats.winner()
+
+	'''
+	Score players' hands. Return the rank of every player still in the round.
+	'''
+	def score_player_hands(self):
+		if self.winner() is not None:
+			return {self.winner(): 0}
+		else:
+			scores = {}
+			for player in self.active_players:
+				score = player.hand.tracker.rank # tracked as the board cards were dealt
+				scores[player] = score
+				self.game.observer.event('showdown', player=player, score=score, pot_cards=self.pot.cards)
+		return scores
+
+	'''
+	Pay out the main pot and side pots to the best ranked players eligible for them.
+	'''
+	def give_out_winnings(self, scores):
+		payouts = self.pot.settle(scores, self.player_order)
+		for player in self.player_order:
+			if payouts.get(player):
+				self.game.observer.event('round_winner', player=player, amount=payouts[player])
+
+		# show everyone in the round's balance (including those who have folded)
+		for player in self.player_order:
+			self.game.observer.event('balance', player=player)
+		self.game.observer.event('round_end')
+
+	'''
+	Return a GameState of the round, seats numbered in player_order. Meant for after the cards are dealt,
+	i.e. from an agent's decision or between streets.
+	'''
+	def export_state(self):
+		if self.variant is not None:
+			raise ValueError('GameState only models Texas hold\'em, not %s' % self.variant.name)
+		seats = len(self.player_order)
+		state = GameState(seats, self.minimum_bid)
+		for seat, player in enumerate(self.player_order):
+			state.stacks[seat] = player.money
+			state.bets[seat] = self.pot.money.get(player, NO_BET)
+			state.contributions[seat] = self.pot.contributions.get(player, 0)
+			state.status[seat] = FOLDED if player not in self.seats else (ALL_IN if self.pot.is_all_in(player) else ACTIVE)
+			if player.hand is not None:
+				state.cards[2 * seat], state.cards[2 * seat + 1] = [card.code for card in player.hand.cards]
+		for i, card in enumerate(self.pot.cards):
+			state.cards[2 * seats + i] = card.code
+		state.deck = array('b', [card.code for card in self.deck.cards])
+		state.deck_remaining = self.deck.remaining
+		state.street = self.street
+		state.highest_bet = self.pot.highest_bet
+		state.to_act = self.player_order.index(self.betting_player) if self.betting_player is not None else 0
+		if self.winner() is not None:
+			state.phase = DONE
+		elif self.actions_left is not None:
+			state.phase = BETTING
+			state.actions_left = self.actions_left
+		else:
+			state.phase = DONE if self.street == 3 else CHANCE
+		return state
+
+	'''
+	Set the round's money, pot, folds, cards and deck from a GameState exported from this round.
+	'''
+	def import_state(self, state):
+		seats = len(self.player_order)
+		self.pot = Pot()
+		self.pot.cards = [Card.from_code(code) for code in state.cards[2 * seats:] if code >= 0]
+		self.seats = SeatRing(self.player_order)
+		self.folded_players = list()
+		for seat, player in enumerate(self.player_order):
+			player.money = state.stacks[seat]
+			if state.contributions[seat] or state.bets[seat] != NO_BET:
+				self.pot.contributions[player] = state.contributions[seat]
+			if state.bets[seat] != NO_BET:
+				self.pot.money[player] = state.bets[seat]
+			if state.status[seat] == ALL_IN:
+				self.pot.all_in.add(player)
+			elif state.status[seat] == FOLDED:
+				self.pot.folded_money += state.contributions[seat]
+				self.folded_players.append(player)
+				self.seats.remove(player)
+			if state.cards[2 * seat] >= 0:
+				player.hand = Hand([Card.from_code(state.cards[2 * seat]), Card.from_code(state.cards[2 * seat + 1])])
+				player.hand.tracker.add_cards(self.pot.cards)
+		self.pot.recount()
+
+		self.deck.cards[:] = [Card.from_code(code) for code in state.deck]
+		self.deck.remaining = state.deck_remaining
+		self.street = state.street
+		self.betting_player = self.player_order[state.to_act]
+		self.actions_left = state.actions_left if state.phase == BETTING else None
+
+	'''
+	Play poker.
+	'''
+	def play(self):
+		for pot_balanced in self.streets():
+			self.betting(pot_balanced)
+
+	'''
+	Deal the round, yielding before each round of betting whether the pot starts out balanced. The caller
+	runs the betting before asking for the next street. Once the river has been bet the hands are scored.
+	'''
+	def streets(self):
+		self.do_blinds()
+		self.pre_flop() # deal 2 cards to each player
+		yield False
+
+		self.flop() # deal 3 cards face-up
+		yield True
+
+		for i in range(2):
+			self.show_card() # each iteration, another card is shown
+			yield True
+
+		# score player's hands, pay out the pots
+		scores = self.score_player_hands()
+		self.give_out_winnings(scores)
+
+#################################################################
+
+'''
+Play n_hands headless rounds with the given agents, starting new games as they finish. Return the rounds played.
+'''
+def simulate(n_hands, agents, start_money = 100, seed = None, observer = None, metrics = None, variant = None):
+	if len(agents) < 2:
+		raise ValueError('A game needs at least 2 agents')
+	rng = Random(seed)
+	hands = 0
+	while hands < n_hands:
+		game = Poker(start_money, seed=rng.getrandbits(64), agents=agents, observer=observer, metrics=metrics, variant=variant)
+		hands += game.play(max_rounds=n_hands - hands)
+	return hands
+
+if __name__ == '__main__':
+	# python -m poker.Poker (or: poker play)
+	game = Poker(4)
+	game.play()
+
+
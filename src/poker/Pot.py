@@ -0,0 +1,146 @@
+from collections import defaultdict
+
+'''
+Pot keeps track of each player's bids and community cards.
+The highest bet and the number of players who have not matched it are kept up to date on every bet,
+so checking if the pot is balanced and the amount to call never scan the players.
+'''
+class Pot:
+
+	def __init__(self):
+		# pot starts with
+		self.money = dict() # bets of players still in the round
+		self.contributions = defaultdict(lambda: 0) # all money put in by each player, including folded players
+		self.folded_money = 0 # any money belonging to folded players
+		self.all_in = set() # players with no money left to bet
+		self.highest_bet = 0
+		self.live = 0 # players in self.money who can still bet
+		self.matched = 0 # players in self.money who can still bet and have bet highest_bet
+		self.cards = list()
+
+	def add_bet(self, player, money, all_in = False):
+		old_bet = self.money.get(player)
+		counted = player not in self.all_in and old_bet is not None
+		if counted and old_bet == self.highest_bet:
+			self.matched -= 1
+
+		bet = (old_bet or 0) + money
+		self.money[player] = bet
+		self.contributions[player] += money
+		if bet > self.highest_bet:
+			self.highest_bet = bet
+			self.matched = 0
+
+		if all_in:
+			self.all_in.add(player)
+			if counted:
+				self.live -= 1
+		elif player not in self.all_in:
+			if not counted:
+				self.live += 1
+			if bet == self.highest_bet:
+				self.matched += 1
+
+	def add_cards(self, cards):
+		for card in cards:
+			self.cards.append(card)
+
+	'''
+	Return true if every player who can still bet has matched the highest bet
+	'''
+	def balanced(self):
+		return self.matched == self.live
+
+	'''
+	Return amount needed to call for a specific player
+	'''
+	def amount_to_call(self, player):
+		return self.highest_bet - self.money.get(player, 0)
+
+	def is_all_in(self, player):
+		return player in self.all_in
+
+	'''
+	Remove folded player, adding their money to self.folded_money
+	'''
+	def remove_player(self, player):
+		if player not in self.money: # folded without betting
+			return
+		player_money = self.money.pop(player)
+		self.folded_money += player_money
+		if player not in self.all_in:
+			self.live -= 1
+			if player_money == self.highest_bet:
+				self.matched -= 1
+		if player_money == self.highest_bet and self.money and max(self.money.values()) < self.highest_bet:
+			# the only highest bet folded, so the next highest bet is the one to call
+			self.highest_bet = max(self.money.values())
+			self.matched = sum(1 for p, bet in self.money.items() if bet == self.highest_bet and p not in self.all_in)
+
+	def reward_winner(self, player):
+		winnings = sum(self.money.values()) + self.folded_money
+		player.add_winnings(winnings)
+
+	'''
+	Split the pot into layered side pots and pay each layer to the best ranked players eligible for it
+	(see settle_layers). Return each player's winnings.
+	'''
+	def settle(self, ranks, order = ()):
+		payouts = settle_layers(self.contributions.items(), ranks, order)
+		for player, winnings in payouts.items():
+			player.add_winnings(winnings)
+		return payouts
+
+	'''
+	Recompute the highest bet and the live and matched counts from the bets, after the pot was rebuilt.
+	'''
+	def recount(self):
+		self.highest_bet = max(self.money.values()) if self.money else 0
+		self.live = sum(1 for player in self.money if player not in self.all_in)
+		self.matched = sum(1 for player, bet in self.money.items() if bet == self.highest_bet and player not in self.all_in)
+
+#################################################################
+
+'''
+Split contributions ((player, amount) pairs, folded players included) into layered side pots and
+pay each layer to the best ranked players eligible for it. ranks maps every player still in the round to
+their hand rank (higher is better). A player is only eligible for the layers they paid into. Split pots
+are divided evenly, with odd chips going to the winners who come first in order (the seat order from the
+dealer). Return a dict of each winner's winnings.
+'''
+def settle_layers(contributions, ranks, order = ()):
+	contributors = sorted(contributions, key=lambda item: item[1])
+	seats = {player: i for i, player in enumerate(order)}
+
+	# suffix_winners[i] holds the best ranked players among contributors[i:] still in the round
+	suffix_winners = [None] * len(contributors)
+	best, winners = None, []
+	for i in range(len(contributors) - 1, -1, -1):
+		player = contributors[i][0]
+		if player in ranks:
+			if best is None or ranks[player] > best:
+				best, winners = ranks[player], [player]
+			elif ranks[player] == best:
+				winners = winners + [player]
+		suffix_winners[i] = winners
+
+	payouts = defaultdict(lambda: 0)
+	layer, previous, last_winners = 0, 0, None
+	for i, (player, contribution) in enumerate(contributors):
+		layer += (contribution - previous) * (len(contributors) - i) # everyone from i on paid this much more
+		previous = contribution
+		if player in ranks and layer:
+			# player is not eligible past this level, so the layer so far is paid out now
+			_split(layer, suffix_winners[i], seats, payouts)
+			layer = 0
+		if suffix_winners[i]:
+			last_winners = suffix_winners[i]
+	if layer and last_winners:
+		_split(layer, last_winners, seats, payouts) # money above every remaining player's bets
+	return dict(payouts)
+
+def _split(amount, winners, seats, payouts):
+	winners = sorted(winners, key=lambda player: seats.get(player, len(seats)))
+	share, odd_chips = divmod(amount, len(winners))
+	for i, player in enumerate(winners):
+		payouts[player] += share + (1 if i < odd_chips else 0)
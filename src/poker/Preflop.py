@@ -0,0 +1,193 @@
+import itertools
+import mmap
+import os
+import struct
+import sys
+from .FaceValues import FaceValues
+
+'''
+Preflop equity tables for the 169 canonical starting hands.
+
+Starting hands are indexed on a 13 x 13 grid of rank indexes (deuce=0, ..., ace=12):
+pairs on the diagonal, suited hands at (high, low) and offsuit hands at (low, high).
+
+The table file holds, as little-endian float32 arrays after a 16-byte header:
+	vs_random[169][max_opponents]	equity of each hand against 1 to max_opponents random hands
+	heads_up[169][169]				equity of each hand against each other hand
+At runtime the file is memory-mapped, so a lookup is one array read and processes share its pages.
+'''
+
+MAGIC = b'PKPF'
+VERSION = 1
+HEADER = struct.Struct('<4sHHII') # magic, version, hands, max_opponents, samples
+HEADER_SIZE = 16
+NUM_HANDS = 169
+MAX_OPPONENTS = 8 # up to 9-handed
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'preflop_equity.bin')
+
+'''
+Return the grid index of a starting hand of 2 Card objects.
+'''
+def starting_hand_index(cards):
+	first, second = cards
+	high, low = max(first.value, second.value) - 2, min(first.value, second.value) - 2
+	if high == low or first.suit == second.suit:
+		return high * 13 + low
+	return low * 13 + high
+
+'''
+Return the name (i.e., 'AKs', 'T9o', '77') of the starting hand with the given grid index.
+'''
+def starting_hand_name(index):
+	row, column = divmod(index, 13)
+	high, low = max(row, column), min(row, column)
+	name = ''.join('T' if value == 10 else str(FaceValues.FACEVALUES[value]) for value in (high + 2, low + 2))
+	if high == low:
+		return name
+	return name + ('s' if row > column else 'o')
+
+'''
+Return a pair of card codes (rank index * 4 + suit index) that makes the starting hand.
+'''
+def representative_codes(index):
+	row, column = divmod(index, 13)
+	if row == column:
+		return [row * 4, row * 4 + 1]
+	if row > column: # suited
+		return [row * 4, column * 4]
+	return [column * 4, row * 4 + 1]
+
+'''
+Return every pair of card codes that makes the starting hand.
+'''
+def combo_codes(index):
+	row, column = divmod(index, 13)
+	high, low = max(row, column), min(row, column)
+	if high == low:
+		return [list(pair) for pair in itertools.combinations(range(high * 4, high * 4 + 4), 2)]
+	suited = row > column
+	return [[high * 4 + s1, low * 4 + s2] for s1 in range(4) for s2 in range(4) if (s1 == s2) == suited]
+
+
+#####################################################################
+
+'''
+Memory-mapped preflop equity table.
+'''
+class PreflopTable(object):
+
+	def __init__(self, path = DEFAULT_PATH):
+		with open(path, 'rb') as f:
+			self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+		magic, version, hands, self.max_opponents, self.samples = HEADER.unpack_from(self.map)
+		if magic != MAGIC or version != VERSION or hands != NUM_HANDS:
+			raise ValueError('%s is not a preflop equity table' % path)
+		if sys.byteorder != 'little':
+			raise ValueError('Preflop equity tables can only be memory-mapped on little-endian machines')
+		view = memoryview(self.map)
+		vs_random_size = 4 * NUM_HANDS * self.max_opponents
+		self.vs_random = view[HEADER_SIZE:HEADER_SIZE + vs_random_size].cast('f')
+		self.heads_up = view[HEADER_SIZE + vs_random_size:HEADER_SIZE + vs_random_size + 4 * NUM_HANDS * NUM_HANDS].cast('f')
+
+	'''
+	Equity of a starting hand (2 Cards) against the given number of random hands.
+	'''
+	def equity(self, cards, opponents = 1):
+		if not 1 <= opponents <= self.max_opponents:
+			raise ValueError('The table covers 1 to %d opponents' % self.max_opponents)
+		return self.vs_random[starting_hand_index(cards) * self.max_opponents + opponents - 1]
+
+	'''
+	Equity of a starting hand against another starting hand, averaged over the other hand's suits.
+	'''
+	def equity_vs(self, cards, other_cards):
+		return self.heads_up[starting_hand_index(cards) * NUM_HANDS + starting_hand_index(other_cards)]
+
+_tables = {}
+
+'''
+Return the table at path, mapping it on first use.
+'''
+def preflop_table(path = DEFAULT_PATH):
+	if path not in _tables:
+		_tables[path] = PreflopTable(path)
+	return _tables[path]
+
+
+#####################################################################
+
+'''
+Monte Carlo equity of the starting hand against 1 to max_opponents random hands.
+'''
+def _vs_random_row(args):
+	import numpy as np
+	from .BatchEvaluator import evaluate_batch
+
+	index, max_opponents, samples, seed = args
+	rng = np.random.default_rng(seed)
+	hole = representative_codes(index)
+	live = np.array([code for code in range(52) if code not in hole], dtype=np.int64)
+	row = []
+	for opponents in range(1, max_opponents + 1):
+		draws = live[np.argsort(rng.random((samples, len(live))), axis=1)[:, :5 + 2 * opponents]]
+		board = draws[:, :5]
+		hero = evaluate_batch(np.hstack([np.broadcast_to(np.array(hole), (samples, 2)), board]))
+		villains = np.array([evaluate_batch(np.hstack([draws[:, 5 + 2 * k:7 + 2 * k], board])) for k in range(opponents)])
+		# a win or tie with every opponent splits the pot with the tied ones
+		shares = (villains <= hero).all(axis=0) / (1 + (villains == hero).sum(axis=0))
+		row.append(shares.mean())
+	return index, row
+
+'''
+Monte Carlo equity of the starting hand against every starting hand from index upwards.
+'''
+def _heads_up_row(args):
+	import numpy as np
+	from .BatchEvaluator import evaluate_batch
+
+	index, samples, seed = args
+	rng = np.random.default_rng(seed)
+	hole = representative_codes(index)
+	live = np.array([code for code in range(52) if code not in hole], dtype=np.int64)
+	hero_cards = np.broadcast_to(np.array(hole), (samples, 2))
+	row = []
+	for other in range(index, NUM_HANDS):
+		combos = np.array([combo for combo in combo_codes(other) if not set(combo) & set(hole)], dtype=np.int64)
+		villain = combos[rng.integers(len(combos), size=samples)]
+		# draw 7 cards and keep the first 5 that are not the villain's
+		draws = live[np.argsort(rng.random((samples, len(live))), axis=1)[:, :7]]
+		dealt = (draws == villain[:, :1]) | (draws == villain[:, 1:])
+		board = np.take_along_axis(draws, np.argsort(dealt, axis=1, kind='stable')[:, :5], axis=1)
+		hero_ranks = evaluate_batch(np.hstack([hero_cards, board]))
+		villain_ranks = evaluate_batch(np.hstack([villain, board]))
+		row.append(((hero_ranks > villain_ranks) + 0.5 * (hero_ranks == villain_ranks)).mean())
+	return index, row
+
+'''
+Compute both tables with samples rollouts per entry across a process pool and write them to path.
+'''
+def build(path = DEFAULT_PATH, samples = 10000, max_opponents = MAX_OPPONENTS, processes = None, seed = 0):
+	from multiprocessing import Pool
+	import numpy as np
+
+	seeds = np.random.SeedSequence(seed).spawn(2 * NUM_HANDS)
+	vs_random = np.zeros((NUM_HANDS, max_opponents), dtype='<f4')
+	heads_up = np.full((NUM_HANDS, NUM_HANDS), 0.5, dtype='<f4')
+	with Pool(processes) as pool:
+		for index, row in pool.imap_unordered(_vs_random_row, [(i, max_opponents, samples, seeds[i]) for i in range(NUM_HANDS)]):
+			vs_random[index] = row
+		for index, row in pool.imap_unordered(_heads_up_row, [(i, samples, seeds[NUM_HANDS + i]) for i in range(NUM_HANDS)]):
+			heads_up[index, index:] = row
+			heads_up[index + 1:, index] = 1 - np.array(row[1:]) # the two hands' shares add up to 1
+	np.fill_diagonal(heads_up, 0.5)
+
+	os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+	with open(path + '.tmp', 'wb') as f:
+		f.write(HEADER.pack(MAGIC, VERSION, NUM_HANDS, max_opponents, samples).ljust(HEADER_SIZE, b'\0'))
+		f.write(vs_random.tobytes())
+		f.write(heads_up.tobytes())
+	os.replace(path + '.tmp', path)
+
+if __name__ == '__main__':
+	# python -m poker.Preflop [path] [samples]
+	build(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PATH, int(sys.argv[2]) if len(sys.argv) > 2 else 10000)
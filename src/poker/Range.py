@@ -0,0 +1,289 @@
+import itertools
+import re
+import numpy as np
+from .BatchEvaluator import evaluate_batch
+from .Equity import EquityCache, card_codes
+from .Preflop import combo_codes
+
+'''
+Weighted hand ranges in the usual notation, and range-vs-range equity.
+
+A range is a comma separated list of:
+	QQ  AKs  AKo  AK			one starting hand (AK is both suited and offsuit)
+	QQ+  ATs+					a pair and every higher pair, or a hand and every higher kicker
+	QQ-88  A5s-A2s  T9s-76s		everything between two hands, stepping pairs, kickers or both cards
+	AhKh						one combo
+each optionally weighted as '50% of KJo' or 'KJo:0.5' (the chance the hand is played that way).
+A range holds {combo: weight}, where a combo is a sorted pair of card codes ((value - 2) * 4 + suit index).
+'''
+
+RANKS = '23456789TJQKA'
+SUITS = 'hdcs' # in Evaluator.SUIT_ORDER
+SAMPLES = 2000 # runouts sampled when there are too many to enumerate
+EXACT_RUNOUTS = 2000 # enumerate every runout up to this many
+CHUNK_PAIRS = 1 << 22 # board x combo x combo comparisons at once
+
+RANGE_CACHE = EquityCache(maxsize=10000) # results by suit-canonical ranges, board and dead cards
+
+_WEIGHT_PERCENT = re.compile(r'^(\d+(?:\.\d+)?)%\s*of\s+(.+)$')
+_HAND = re.compile(r'^([2-9TJQKA])([2-9TJQKA])([so]?)(\+?)$')
+_COMBO = re.compile(r'^([2-9TJQKA][hdcs])([2-9TJQKA][hdcs])$')
+
+'''
+Return the card codes of a card string like 'AhKd7c'.
+'''
+def parse_cards(text):
+	text = text.replace(' ', '')
+	if len(text) % 2:
+		raise ValueError('Cannot read cards from %r' % text)
+	codes = []
+	for i in range(0, len(text), 2):
+		rank, suit = text[i].upper(), text[i + 1].lower()
+		if rank not in RANKS or suit not in SUITS:
+			raise ValueError('Cannot read cards from %r' % text)
+		codes.append(RANKS.index(rank) * 4 + SUITS.index(suit))
+	return codes
+
+'''
+Return the Preflop grid indexes of a starting hand: high and low rank indexes and suitedness ('s', 'o' or '' for both).
+'''
+def _hand_indexes(high, low, suited):
+	if high == low:
+		return [high * 13 + low]
+	high, low = max(high, low), min(high, low)
+	return ([high * 13 + low] if suited != 'o' else []) + ([low * 13 + high] if suited != 's' else [])
+
+'''
+Return the grid indexes of one range item (without its weight).
+'''
+def _item_indexes(item):
+	if '-' in item:
+		first, last = [_HAND.match(part.strip()) for part in item.split('-')]
+		if first is None or last is None or first.group(3) != last.group(3) or first.group(4) or last.group(4):
+			raise ValueError('Cannot read range item %r' % item)
+		high1, low1 = RANKS.index(first.group(1)), RANKS.index(first.group(2))
+		high2, low2 = RANKS.index(last.group(1)), RANKS.index(last.group(2))
+		if high1 - low1 != high2 - low2 and high1 != high2:
+			raise ValueError('%r is neither a run of pairs, kickers or connected hands' % item)
+		steps = abs(low1 - low2)
+		sign = 1 if low2 >= low1 else -1
+		high_step = 0 if high1 == high2 and low1 != high1 else sign
+		return [index for step in range(steps + 1)
+			for index in _hand_indexes(high1 + step * high_step, low1 + step * sign, first.group(3))]
+
+	match = _HAND.match(item)
+	if match is None:
+		raise ValueError('Cannot read range item %r' % item)
+	high, low, suited, plus = RANKS.index(match.group(1)), RANKS.index(match.group(2)), match.group(3), match.group(4)
+	high, low = max(high, low), min(high, low)
+	if not plus:
+		return _hand_indexes(high, low, suited)
+	if high == low: # QQ+: this pair and every higher pair
+		return [rank * 13 + rank for rank in range(high, 13)]
+	return [index for kicker in range(low, high) for index in _hand_indexes(high, kicker, suited)] # ATs+: higher kickers
+
+
+#####################################################################
+
+class Range(object):
+
+	def __init__(self, weights = None):
+		self.weights = dict(weights or {}) # (low code, high code) -> weight
+
+	def __len__(self):
+		return len(self.weights)
+
+	def __repr__(self):
+		return 'Range(combos=%r, weight=%r)' % (len(self.weights), round(sum(self.weights.values()), 4))
+
+	'''
+	Parse range notation. A combo named by more than one item keeps its highest weight.
+	'''
+	@classmethod
+	def parse(cls, text):
+		weights = dict()
+		for item in text.split(','):
+			item = item.strip()
+			if not item:
+				continue
+			weight = 1.0
+			match = _WEIGHT_PERCENT.match(item)
+			if match is not None:
+				weight, item = float(match.group(1)) / 100, match.group(2).strip()
+			elif ':' in item:
+				item, weight = item.rsplit(':', 1)
+				item, weight = item.strip(), float(weight)
+
+			combo = _COMBO.match(item)
+			if combo is not None:
+				codes = parse_cards(item)
+				if codes[0] == codes[1]:
+					raise ValueError('%r names the same card twice' % item)
+				combos = [codes]
+			else:
+				combos = [codes for index in _item_indexes(item) for codes in combo_codes(index)]
+			for codes in combos:
+				combo = tuple(sorted(codes))
+				weights[combo] = max(weights.get(combo, 0.0), weight)
+		return cls(weights)
+
+	'''
+	Range of the one combo made by a Hand or 2 Cards.
+	'''
+	@classmethod
+	def from_cards(cls, cards):
+		return cls({tuple(sorted(card_codes(cards))): 1.0})
+
+	'''
+	Return the range without the combos that use any of the dead card codes.
+	'''
+	def without(self, dead):
+		dead = set(dead)
+		return Range({combo: weight for combo, weight in self.weights.items() if combo[0] not in dead and combo[1] not in dead and weight > 0})
+
+	'''
+	Canonical form of the range: its (combo, weight) pairs in order.
+	'''
+	@property
+	def key(self):
+		return tuple(sorted(self.weights.items()))
+
+	'''
+	Return the range with its suits relabeled, suit index i becoming suits[i].
+	'''
+	def relabel(self, suits):
+		return Range({tuple(sorted(_relabel(combo, suits))): weight for combo, weight in self.weights.items()})
+
+	'''
+	Return (codes, weights, masks) arrays: an m x 2 array of card codes, the weights and a bit mask of each combo's cards.
+	'''
+	def arrays(self):
+		combos = sorted(self.weights)
+		codes = np.array(combos, dtype=np.int64).reshape(-1, 2)
+		weights = np.array([self.weights[combo] for combo in combos], dtype=np.float64)
+		masks = (np.int64(1) << codes[:, 0]) | (np.int64(1) << codes[:, 1])
+		return codes, weights, masks
+
+'''
+Equity of two ranges against each other, weighted over every pair of combos that can be dealt together.
+'''
+class RangeEquity(object):
+
+	def __init__(self, win, tie, pairs, boards, exact):
+		self.win = [win, 1 - win - tie]
+		self.tie = [tie, tie]
+		self.pairs = pairs # combo pairs that do not share a card
+		self.boards = boards # runouts scored
+		self.exact = exact # every runout was enumerated
+
+	def __repr__(self):
+		return 'RangeEquity(equity=%r, pairs=%r, boards=%r, exact=%r)' % ([round(e, 4) for e in self.equity], self.pairs, self.boards, self.exact)
+
+	@property
+	def equity(self):
+		return [self.win[0] + self.tie[0] / 2, self.win[1] + self.tie[1] / 2]
+
+def _relabel(codes, suits):
+	return [code - code % 4 + suits[code % 4] for code in codes]
+
+'''
+Return the suit-canonical form of a situation, (range a, range b, board codes, dead codes): the one of its 24 suit
+relabelings with the smallest (board, dead, range a, range b) key, as Equity.canonical_key does for hands.
+Only the relabelings that tie on the board and dead cards have their ranges relabeled.
+'''
+def _canonical(range_a, range_b, board_codes, dead_codes):
+	best, candidates = None, []
+	for suits in itertools.permutations(range(4)):
+		cards = (sorted(_relabel(board_codes, suits)), sorted(_relabel(dead_codes, suits)))
+		if best is None or cards < best:
+			best, candidates = cards, [suits]
+		elif cards == best:
+			candidates.append(suits)
+	ranges = min(((range_a.relabel(suits), range_b.relabel(suits)) for suits in candidates), key=lambda pair: (pair[0].key, pair[1].key))
+	return ranges[0], ranges[1], best[0], best[1]
+
+def _as_range(hand_range):
+	if isinstance(hand_range, Range):
+		return hand_range
+	if isinstance(hand_range, str):
+		return Range.parse(hand_range)
+	return Range.from_cards(hand_range) # a Hand or 2 Cards
+
+def _as_codes(cards):
+	if isinstance(cards, str):
+		return parse_cards(cards)
+	return [card if isinstance(card, int) else card.code for card in getattr(cards, 'cards', cards)]
+
+'''
+Equity of range a against range b (Range objects, range notation, or Hands) given the board (i.e. Pot.cards)
+and other dead cards (i.e. known hole cards). Combos using a board or dead card are removed first.
+Every combo of both ranges is scored on each runout with one batch evaluation, and the pairs are compared as
+arrays; runouts are enumerated when there are at most EXACT_RUNOUTS of them and sampled otherwise.
+Equity does not depend on suit names, so the situation is relabeled to its suit-canonical form before it is
+looked up, computed and cached: situations that only differ by suits share one result.
+'''
+def range_equity(a, b, board = (), dead = (), samples = SAMPLES, seed = 0, cache = RANGE_CACHE):
+	board_codes = sorted(_as_codes(board))
+	dead_codes = sorted(set(_as_codes(dead)) | set(board_codes))
+	range_a, range_b = _as_range(a).without(dead_codes), _as_range(b).without(dead_codes)
+	if not range_a or not range_b:
+		raise ValueError('A range has no combos left once the dead cards are removed')
+	range_a, range_b, board_codes, dead_codes = _canonical(range_a, range_b, board_codes, dead_codes)
+
+	key = (range_a.key, range_b.key, tuple(board_codes), tuple(dead_codes), samples, seed)
+	result = cache.get(key) if cache is not None else None
+	if result is not None:
+		return result
+
+	codes_a, weights_a, masks_a = range_a.arrays()
+	codes_b, weights_b, masks_b = range_b.arrays()
+	pair_weights = np.outer(weights_a, weights_b) * ((masks_a[:, None] & masks_b[None, :]) == 0)
+
+	live = [code for code in range(52) if code not in set(dead_codes)]
+	needed = 5 - len(board_codes)
+	exact = _count_runouts(len(live), needed) <= EXACT_RUNOUTS
+	if exact:
+		runouts = list(itertools.combinations(live, needed))
+		runouts = np.array(runouts, dtype=np.int64).reshape(len(runouts), needed)
+	else:
+		rng = np.random.default_rng(seed)
+		runouts = np.array(live, dtype=np.int64)[np.argsort(rng.random((samples, len(live))), axis=1)[:, :needed]]
+
+	total = win = tie = 0.0
+	chunk = max(1, CHUNK_PAIRS // (len(codes_a) * len(codes_b)))
+	for start in range(0, len(runouts), chunk):
+		boards = np.hstack([np.broadcast_to(np.array(board_codes, dtype=np.int64), (len(runouts[start:start + chunk]), len(board_codes))), runouts[start:start + chunk]])
+		runout_masks = np.bitwise_or.reduce(np.int64(1) << runouts[start:start + chunk], axis=1) if needed else np.zeros(len(boards), dtype=np.int64)
+		# combos that use none of a runout's cards, the only ones that can be dealt (or scored) with it
+		usable_a = (masks_a[None, :] & runout_masks[:, None]) == 0
+		usable_b = (masks_b[None, :] & runout_masks[:, None]) == 0
+		ranks_a = _score(codes_a, boards, usable_a)
+		ranks_b = _score(codes_b, boards, usable_b)
+		# weight of each (board, combo a, combo b): pairs that share no card, with neither combo using a runout card
+		weights = pair_weights[None, :, :] * usable_a[:, :, None] * usable_b[:, None, :]
+		total += weights.sum()
+		win += (weights * (ranks_a[:, :, None] > ranks_b[:, None, :])).sum()
+		tie += (weights * (ranks_a[:, :, None] == ranks_b[:, None, :])).sum()
+	if total == 0:
+		raise ValueError('The ranges have no combos that can be dealt together')
+
+	result = RangeEquity(float(win / total), float(tie / total), int((pair_weights > 0).sum()), len(runouts), exact)
+	if cache is not None:
+		cache.put(key, result)
+	return result
+
+def _count_runouts(live, needed):
+	count = 1
+	for i in range(needed):
+		count = count * (live - i) // (i + 1)
+	return count
+
+'''
+Rank every combo on every board: a boards x combos array. Only the usable (board, combo) pairs, those that
+share no card, are evaluated; the rest rank 0 and must be weighted out by the caller.
+'''
+def _score(combo_codes, boards, usable):
+	hands = np.concatenate([np.repeat(boards, len(combo_codes), axis=0), np.tile(combo_codes, (len(boards), 1))], axis=1)
+	ranks = np.zeros(usable.shape, dtype=np.int32)
+	ranks[usable] = evaluate_batch(hands[usable.ravel()])
+	return ranks
@@ -0,0 +1,77 @@
+'''
+Ring of seats around a table, kept as a doubly linked list over seat indexes.
+Finding the next seat still in, taking a player out (fold or bust) and checking for a
+single remaining player are all O(1), however many players sit at the table.
+'''
+class SeatRing(object):
+
+	def __init__(self, players):
+		self.players = list(players) # players by seat, clockwise
+		self.seat_of = {player: seat for seat, player in enumerate(self.players)}
+		seats = len(self.players)
+		self.next = [(seat + 1) % seats for seat in range(seats)]
+		self.prev = [(seat - 1) % seats for seat in range(seats)]
+		self.active = [True] * seats
+		self.count = seats
+		self.head = 0 if seats else None # any seat still in
+
+	def __len__(self):
+		return self.count
+
+	def __contains__(self, player):
+		seat = self.seat_of.get(player)
+		return seat is not None and self.active[seat]
+
+	'''
+	Iterate over the players still in, clockwise from the head seat.
+	'''
+	def __iter__(self):
+		return iter(self.order_from(self.prev[self.head])) if self.count else iter(())
+
+	'''
+	Return the players still in, clockwise, starting with the seat after the given seat.
+	'''
+	def order_from(self, seat):
+		order = []
+		for i in range(self.count):
+			seat = self.next[seat]
+			while not self.active[seat]:
+				seat = self.next[seat]
+			order.append(self.players[seat])
+		return order
+
+	'''
+	Return the players still in, clockwise, starting with the seat after player's seat.
+	'''
+	def order_after(self, player):
+		return self.order_from(self.seat_of[player])
+
+	'''
+	Take a player out of the ring. A player who is out keeps pointing at the seat that was next when
+	they left, so next_active still works from their seat.
+	'''
+	def remove(self, player):
+		seat = self.seat_of[player]
+		if not self.active[seat]:
+			return
+		self.active[seat] = False
+		self.count -= 1
+		self.next[self.prev[seat]] = self.next[seat]
+		self.prev[self.next[seat]] = self.prev[seat]
+		if self.head == seat:
+			self.head = self.next[seat] if self.count else None
+
+	'''
+	Return the next player clockwise from player (who may be out) who is still in.
+	'''
+	def next_active(self, player):
+		seat = self.next[self.seat_of[player]]
+		while not self.active[seat]: # only when players left after player did
+			seat = self.next[seat]
+		return self.players[seat]
+
+	'''
+	Return the only player still in, or None.
+	'''
+	def winner(self):
+		return self.players[self.head] if self.count == 1 else None
@@ -0,0 +1,395 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from .Agent import Agent, FOLD, CALL, RAISE
+from .Card import Card
+from .Observer import Observer
+from .Player import Player
+from .Poker import Poker, Round
+
+'''
+asyncio game server. Every table is a coroutine driving a Poker game with AsyncRounds, which await each
+player's decision instead of blocking on input(), so thousands of tables share one event loop.
+
+Players connect over TCP or a Unix socket and speak a line protocol: one JSON object per line, or plain
+text lines for people typing at a terminal (i.e. nc localhost 9000).
+	client:	{"type": "join", "events": true}					or	join
+			{"type": "action", "action": "r", "raise_by": 4}	or	f / c / r 4
+	server:	{"type": "welcome", "table": 3, "player": 2}
+			{"type": "hand", "cards": ["10♥", "A♠"]}
+			{"type": "decide", "to_call": 2, "money": 98, "minimum_bid": 2, "timeout": 30.0}
+			{"type": "timeout"}
+			{"type": "event", "name": "call", "player": 2, "amount": 2}	(every game event, see Observer)
+			{"type": "game_over"}
+A player who joins with "events": false (like the load-test bots) is only sent their own messages.
+A table starts once table_size players have joined and plays a game to the end, or for max_rounds.
+A player who does not answer within the action timeout, or who disconnects, folds (or checks, when
+calling is free). So does a client that reads so slowly that MAX_WRITE_BUFFER bytes queue up for it, which
+is disconnected. A line that is not a valid message gets an {"type": "error"} reply.
+'''
+
+TABLE_SIZE = 6
+START_MONEY = 100
+ACTION_TIMEOUT = 30.0
+BACKLOG = 4096 # pending connections, for many players connecting at once
+MAX_WRITE_BUFFER = 1 << 20 # bytes queued for a client before it is dropped as too slow
+
+'''
+Return an event's information as JSON values: players become their ids and cards their names.
+'''
+def _jsonable(value):
+	if isinstance(value, (int, float, str)) or value is None:
+		return value
+	if isinstance(value, (list, tuple)):
+		return [_jsonable(item) for item in value]
+	if isinstance(value, Card):
+		return str(value)
+	if isinstance(value, Player):
+		return value.id
+	return None
+
+'''
+Parse a client line, JSON or plain text, into a message dict. Raise ValueError for a line that is not
+a message, or an action that is not a fold, call or raise of a whole number of chips.
+'''
+def parse_message(line):
+	line = line.strip()
+	if line.startswith(('{', '[', '"')):
+		message = json.loads(line)
+		if not isinstance(message, dict):
+			raise ValueError('a JSON message must be an object')
+	else:
+		words = line.split()
+		if not words:
+			return {}
+		if words[0] == 'join':
+			return {'type': 'join'}
+		message = {'type': 'action', 'action': words[0], 'raise_by': words[1] if len(words) > 1 else 0}
+
+	if message.get('type') == 'action':
+		if message.get('action') not in (FOLD, CALL, RAISE):
+			raise ValueError('the action must be one of %s, %s or %s' % (FOLD, CALL, RAISE))
+		raise_by = message.get('raise_by', 0)
+		if isinstance(raise_by, bool) or not isinstance(raise_by, (int, str)):
+			raise ValueError('raise_by must be a whole number of chips')
+		message['raise_by'] = int(raise_by)
+	return message
+
+#####################################################################
+
+class Connection(object):
+
+	def __init__(self, reader, writer):
+		self.reader = reader
+		self.writer = writer
+		self.closed = False
+		self.pending = None # future waiting for this player's decision
+		self.table = None
+		self.player_id = None # id at the table, given on joining
+		self.events = True # send every game event
+
+	def send(self, message):
+		self.send_line((json.dumps(message) + '\n').encode())
+
+	'''
+	Queue a line for the client, dropping a client that has fallen MAX_WRITE_BUFFER bytes behind rather
+	than buffering for it without limit (the table does not wait for a slow reader).
+	'''
+	def send_line(self, line):
+		if self.closed:
+			return
+		self.writer.write(line)
+		if self.writer.transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+			self.close(abort=True)
+
+	'''
+	Answer the pending decision, if there is one.
+	'''
+	def resolve(self, decision):
+		if self.pending is not None and not self.pending.done():
+			self.pending.set_result(decision)
+
+	'''
+	Close the connection, folding any pending decision. abort drops the queued output instead of sending it.
+	'''
+	def close(self, abort = False):
+		if not self.closed:
+			self.closed = True
+			self.resolve(None)
+			if abort:
+				self.writer.transport.abort()
+			else:
+				self.writer.close()
+
+'''
+Agent for a player at the other end of a Connection. Decisions are awaited with a timeout.
+'''
+class RemoteAgent(Agent):
+
+	def __init__(self, connection, timeout = ACTION_TIMEOUT):
+		self.connection = connection
+		self.timeout = timeout
+
+	def see_hand(self, player, hand):
+		self.connection.send({'type': 'hand', 'cards': [str(card) for card in hand.cards]})
+
+	def decide(self, player, curr_round, amount_to_call):
+		raise NotImplementedError('RemoteAgent decisions must be awaited with decide_async')
+
+	async def decide_async(self, player, curr_round, amount_to_call):
+		connection = self.connection
+		decision = None
+		if not connection.closed:
+			loop = asyncio.get_running_loop()
+			connection.pending = loop.create_future()
+			# a timer rather than asyncio.wait_for, so waiting does not need a task of its own
+			timer = loop.call_later(self.timeout, connection.resolve, None)
+			connection.send({'type': 'decide', 'to_call': amount_to_call, 'money': player.money,
+				'minimum_bid': curr_round.minimum_bid, 'timeout': self.timeout})
+			decision = await connection.pending
+			timer.cancel()
+			connection.pending = None
+			if decision is None and not connection.closed:
+				connection.send({'type': 'timeout'})
+		if decision is None: # timed out or gone: fold, unless checking is free
+			return (CALL, 0) if amount_to_call == 0 else (FOLD, 0)
+		return decision
+
+'''
+Sends every game event at a table to all of its players.
+'''
+class TableObserver(Observer):
+
+	def __init__(self, connections):
+		self.connections = connections
+
+	def event(self, name, **info):
+		message = {'type': 'event', 'name': name}
+		for key, value in info.items():
+			if key != 'round':
+				message[key] = _jsonable(value)
+		if name == 'showdown':
+			message['cards'] = [str(card) for card in info['player'].hand.cards]
+		line = (json.dumps(message) + '\n').encode() # encoded once for the whole table
+		for connection in self.connections:
+			if connection.events:
+				connection.send_line(line)
+
+'''
+Round that awaits the players' decisions. The rules are Round's own: only the decisions are awaited.
+Agents without decide_async are asked directly.
+'''
+class AsyncRound(Round):
+
+	async def betting(self, pot_balanced):
+		for player in self.betting_turns(pot_balanced):
+			await self.action(player)
+
+	'''
+	Player.action, awaiting the decision.
+	'''
+	async def action(self, player):
+		if self.pot.is_all_in(player):
+			return
+		decide_async = getattr(player.agent, 'decide_async', None)
+		while True:
+			amount_to_call = player.to_call(self)
+			if decide_async is not None:
+				res, raise_by = await decide_async(player, self, amount_to_call)
+			else:
+				res, raise_by = player.agent.decide(player, self, amount_to_call)
+			if player.act(self, amount_to_call, res, raise_by):
+				return
+
+	async def play(self):
+		for pot_balanced in self.streets():
+			await self.betting(pot_balanced)
+
+
+#####################################################################
+
+class Table(object):
+
+	def __init__(self, server, id_):
+		self.server = server
+		self.id = id_
+		self.connections = list()
+		self.next_player = 1 # ids are never reused, so a player who leaves before the start frees no id
+		self.task = None
+
+	def full(self):
+		return len(self.connections) == self.server.table_size
+
+	'''
+	Seat a connection and tell it its player id, which the game's Player keeps.
+	'''
+	def add(self, connection):
+		connection.table = self
+		connection.player_id = self.next_player
+		self.next_player += 1
+		self.connections.append(connection)
+		connection.send({'type': 'welcome', 'table': self.id, 'player': connection.player_id})
+
+	async def run(self):
+		server = self.server
+		agents = [RemoteAgent(connection, server.action_timeout) for connection in self.connections]
+		game = Poker(server.start_money, seed=server.rng.getrandbits(64), agents=agents, observer=TableObserver(self.connections))
+		try:
+			game.initialize(ids=[connection.player_id for connection in self.connections])
+			rounds = 0
+			while len(game.players_left) > 1 and rounds != server.max_rounds and not all(connection.closed for connection in self.connections):
+				this_round = game.new_round(AsyncRound)
+				await this_round.play()
+				game.end_round()
+				rounds += 1
+				server.rounds += 1
+				await asyncio.sleep(0) # let other tables run, even if every player here has left
+			game.end_game()
+			for connection in self.connections:
+				connection.send({'type': 'game_over'})
+				connection.close()
+		finally:
+			server.games += 1
+			del server.tables[self.id]
+
+'''
+Seats connecting players at tables and runs every table on the event loop.
+'''
+class GameServer(object):
+
+	def __init__(self, table_size = TABLE_SIZE, start_money = START_MONEY, action_timeout = ACTION_TIMEOUT, max_rounds = None, seed = None):
+		self.table_size = table_size
+		self.max_rounds = max_rounds # rounds per game, None to play until one player is left
+		self.start_money = start_money
+		self.action_timeout = action_timeout
+		self.rng = random.Random(seed)
+		self.tables = dict() # tables waiting or playing, by id
+		self.waiting = None # table waiting for players
+		self.next_table = 1
+		self.rounds = 0
+		self.games = 0
+
+	async def handle_client(self, reader, writer):
+		connection = Connection(reader, writer)
+		try:
+			while True:
+				line = await reader.readline()
+				if not line:
+					break
+				try:
+					message = parse_message(line.decode())
+				except ValueError as error: # bad JSON or UTF-8 included
+					connection.send({'type': 'error', 'message': 'could not read %r: %s' % (line.decode(errors='replace').strip(), error)})
+					continue
+				if message.get('type') == 'join' and connection.table is None:
+					connection.events = bool(message.get('events', True))
+					self.seat(connection)
+				elif message.get('type') == 'action':
+					connection.resolve((message['action'], message['raise_by']))
+		except (ConnectionError, asyncio.IncompleteReadError):
+			pass
+		finally:
+			if connection.table is self.waiting and self.waiting is not None:
+				self.waiting.connections.remove(connection) # left before the game started
+			connection.close()
+
+	def seat(self, connection):
+		if self.waiting is None:
+			self.waiting = Table(self, self.next_table)
+			self.tables[self.waiting.id] = self.waiting
+			self.next_table += 1
+		table = self.waiting
+		table.add(connection)
+		if table.full():
+			self.waiting = None
+			table.task = asyncio.get_running_loop().create_task(table.run())
+
+	async def serve(self, host = '127.0.0.1', port = 9000, path = None):
+		if path is not None:
+			return await asyncio.start_unix_server(self.handle_client, path, backlog=BACKLOG)
+		return await asyncio.start_server(self.handle_client, host, port, backlog=BACKLOG)
+
+
+#####################################################################
+
+'''
+Load-test client: a simulated player that joins a table and answers every decision at random.
+'''
+async def bot(address, rng, stats, think_time = 0.0):
+	if isinstance(address, str):
+		reader, writer = await asyncio.open_unix_connection(address)
+	else:
+		reader, writer = await asyncio.open_connection(*address)
+	writer.write(b'{"type": "join", "events": false}\n')
+	while True:
+		line = await reader.readline()
+		if not line:
+			break
+		message = json.loads(line)
+		if message['type'] == 'decide':
+			if think_time:
+				await asyncio.sleep(rng.uniform(0, think_time))
+			roll = rng.random()
+			if roll < 0.2 and message['to_call'] > 0:
+				action = {'type': 'action', 'action': FOLD}
+			elif roll > 0.8 and message['money'] > message['to_call'] + message['minimum_bid']:
+				action = {'type': 'action', 'action': RAISE, 'raise_by': message['minimum_bid']}
+			else:
+				action = {'type': 'action', 'action': CALL}
+			writer.write((json.dumps(action) + '\n').encode())
+			stats['decisions'] += 1
+		elif message['type'] == 'timeout':
+			stats['timeouts'] += 1
+	writer.close()
+
+'''
+Connect clients simulated players to the server at address ((host, port) or a Unix socket path)
+and play until every game is over. With server set, the server runs in the same event loop.
+'''
+async def load_test(address, clients, think_time = 0.0, seed = 0, server = None):
+	if server is not None:
+		listener = await (server.serve(path=address) if isinstance(address, str) else server.serve(*address))
+	rng = random.Random(seed)
+	stats = {'decisions': 0, 'timeouts': 0}
+	start = time.perf_counter()
+	await asyncio.gather(*[bot(address, random.Random(rng.getrandbits(64)), stats, think_time) for i in range(clients)])
+	elapsed = time.perf_counter() - start
+	if server is not None:
+		listener.close()
+	stats['seconds'] = elapsed
+	stats['decisions_per_second'] = stats['decisions'] / elapsed
+	return stats
+
+def main(argv = None):
+	parser = argparse.ArgumentParser(description='Poker table server and load-test client.')
+	parser.add_argument('command', choices=['serve', 'load'])
+	parser.add_argument('--host', default='127.0.0.1')
+	parser.add_argument('--port', type=int, default=9000)
+	parser.add_argument('--unix', help='Unix socket path, instead of TCP')
+	parser.add_argument('--table-size', type=int, default=TABLE_SIZE)
+	parser.add_argument('--start-money', type=int, default=START_MONEY)
+	parser.add_argument('--timeout', type=float, default=ACTION_TIMEOUT, help='seconds to act before folding')
+	parser.add_argument('--max-rounds', type=int, help='rounds per game, instead of playing until one player is left')
+	parser.add_argument('--clients', type=int, default=600, help='simulated players (load)')
+	parser.add_argument('--think', type=float, default=0.0, help='longest random think time of a simulated player (load)')
+	parser.add_argument('--local', action='store_true', help='run the server in the load test\'s event loop (load)')
+	args = parser.parse_args(argv)
+
+	address = args.unix if args.unix else (args.host, args.port)
+	server = GameServer(args.table_size, args.start_money, args.timeout, args.max_rounds)
+	if args.command == 'serve':
+		async def serve():
+			listener = await server.serve(args.host, args.port, args.unix)
+			async with listener:
+				await listener.serve_forever()
+		asyncio.run(serve())
+	else:
+		stats = asyncio.run(load_test(address, args.clients, args.think, server=server if args.local else None))
+		if args.local:
+			stats['games'], stats['rounds'] = server.games, server.rounds
+		print(json.dumps(stats))
+
+if __name__ == '__main__':
+	main()
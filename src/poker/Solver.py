@@ -0,0 +1,490 @@
+import mmap
+import os
+import struct
+import sys
+from multiprocessing import Pool
+from random import Random
+import numpy as np
+from .Agent import Agent, FOLD, CALL, RAISE
+from .BatchEvaluator import evaluate_batch
+from .GameState import GameState, CHANCE, DONE
+from .Pot import settle_layers
+from .Preflop import DEFAULT_PATH, NUM_HANDS, combo_codes, preflop_table
+
+'''
+Heads-up counterfactual regret minimization on an abstraction of the game.
+
+The betting tree is built by stepping a GameState, so it follows the rules Round enforces: the blinds come
+from minimum_bid, and every decision is a fold, call or raise. Raises are abstracted to fractions of the pot
+(RAISE_SIZES) and all in, with at most max_raises raises a street, and the cards are abstracted to equity
+buckets: the preflop equity of the starting hand, then the equity against a random hand on each street.
+
+Nodes are numbered breadth first, so the children of a node are contiguous. A decision is keyed by the
+public state it is taken in: street, seat to act, raises so far on the street, actions left before the pot can
+close and each seat's contribution. The key fixes everything the rest of the tree depends on, so decision nodes
+reached by different earlier betting that share a key are one decision, and every decision with a bucket is
+an information set with a row in the flat regret and strategy arrays:
+	infoset = decision index * buckets + bucket
+
+Training is external sampling Monte Carlo CFR with regret matching+ (regrets are floored at 0) and linear
+averaging: each iteration samples a deal, explores every action of the traversing player and samples one
+action of the other. Workers train on copies of the arrays and the coordinator adds up their changes every
+sync_every iterations.
+
+The average strategy is exported with the tree's decision nodes to a file that StrategyTable memory-maps:
+	header (magic, version, buckets, decision nodes, max actions, stack, minimum bid, samples)
+	preflop buckets	uint8[169]
+	keys			int32[decisions][KEY_SIZE]	street, seat to act, raises, actions left, each seat's contribution
+	actions			int32[decisions][max actions]	raise_by, CALL_ACTION, FOLD_ACTION or NO_ACTION
+	strategy		float32[decisions * buckets][max actions]
+'''
+
+MAGIC = b'PKCF'
+VERSION = 2
+KEY_SIZE = 6
+HEADER = struct.Struct('<4sHHIIIII') # magic, version, buckets, decisions, max actions, stack, minimum bid, samples
+HEADER_SIZE = 32
+
+# node kinds
+DECISION = 0
+FOLD_END = 1 # everyone else folded
+SHOWDOWN = 2
+
+# outcomes of a showdown, and the ranks that make them
+SEAT_0_WINS = 0
+SEAT_1_WINS = 1
+TIE = 2
+OUTCOME_RANKS = [{0: 1, 1: 0}, {0: 0, 1: 1}, {0: 1, 1: 1}]
+
+# actions in an exported table (raises are stored as their raise_by)
+CALL_ACTION = 0
+FOLD_ACTION = -1
+NO_ACTION = -2
+
+RAISE_SIZES = (0.5, 1.0) # raises, as fractions of the pot after calling
+MAX_RAISES = 2 # raises a street, after which a player can only fold or call
+BUCKETS = 8
+SAMPLES = 64 # rollouts for each postflop equity
+DEAL_BATCH = 256 # deals bucketed at once
+
+'''
+Return the preflop grid index of each row of 2 hole card codes.
+'''
+def starting_hand_indexes(holes):
+	ranks, suits = holes // 4, holes % 4
+	high, low = ranks.max(axis=1), ranks.min(axis=1)
+	paired_or_suited = (high == low) | (suits[:, 0] == suits[:, 1])
+	return np.where(paired_or_suited, high * 13 + low, low * 13 + high)
+
+'''
+Monte Carlo equity of each row of 2 hole card codes against one random hand, given the board card codes
+of the row (K x 0 to K x 5), over samples random opponent hands and runouts.
+'''
+def rollout_equity(holes, boards, samples = SAMPLES, rng = None):
+	rng = rng if rng is not None else np.random.default_rng()
+	rows, board_size = boards.shape
+	known = np.hstack([holes, boards])
+	keys = rng.random((rows, samples, 52))
+	keys[np.arange(rows)[:, None, None], np.arange(samples)[None, :, None], known[:, None, :]] = 2.0 # never drawn
+	needed = 2 + 5 - board_size
+	draws = np.argpartition(keys, needed - 1, axis=2)[:, :, :needed]
+	board = np.concatenate([np.broadcast_to(boards[:, None, :], (rows, samples, board_size)), draws[:, :, 2:]], axis=2)
+	hero = evaluate_batch(np.concatenate([np.broadcast_to(holes[:, None, :], (rows, samples, 2)), board], axis=2).reshape(-1, 7))
+	villain = evaluate_batch(np.concatenate([draws[:, :, :2], board], axis=2).reshape(-1, 7))
+	shares = (hero > villain) + 0.5 * (hero == villain)
+	return shares.reshape(rows, samples).mean(axis=1)
+
+
+#####################################################################
+
+'''
+Hand abstraction: a bucket from 0 (weakest) to buckets - 1 for each street. Preflop, the 169 starting hands
+are split into buckets holding about the same number of combos by their equity against a random hand (read
+from the preflop table when it has been built). After the flop, the equity against a random hand is split
+into equal ranges.
+'''
+class EquityBuckets(object):
+
+	def __init__(self, buckets = BUCKETS, samples = SAMPLES, preflop_path = DEFAULT_PATH, seed = 0, preflop = None):
+		self.buckets = buckets
+		self.samples = samples
+		self.rng = np.random.default_rng(seed)
+		self.preflop = preflop if preflop is not None else self._preflop_buckets(preflop_path) # bucket of each starting hand
+
+	def _preflop_buckets(self, path):
+		if os.path.exists(path):
+			table = preflop_table(path)
+			equities = np.array([table.vs_random[index * table.max_opponents] for index in range(NUM_HANDS)])
+		else:
+			holes = np.array([combo_codes(index)[0] for index in range(NUM_HANDS)], dtype=np.int64)
+			equities = rollout_equity(holes, np.zeros((NUM_HANDS, 0), dtype=np.int64), 2000, self.rng)
+		combos = np.array([len(combo_codes(index)) for index in range(NUM_HANDS)])
+		order = np.argsort(equities, kind='stable')
+		below = np.cumsum(combos[order]) - combos[order] # combos of weaker starting hands
+		preflop = np.empty(NUM_HANDS, dtype=np.uint8)
+		preflop[order] = below * self.buckets // combos.sum()
+		return preflop
+
+	def postflop(self, equities):
+		return np.minimum((equities * self.buckets).astype(np.int64), self.buckets - 1)
+
+	'''
+	Return the bucket of one hand (2 hole card codes) with the given board card codes.
+	'''
+	def bucket(self, hole, board):
+		if not board:
+			return int(self.preflop[starting_hand_indexes(np.array([hole]))[0]])
+		equity = rollout_equity(np.array([hole], dtype=np.int64), np.array([board], dtype=np.int64), self.samples, self.rng)
+		return int(self.postflop(equity)[0])
+
+	'''
+	Deal count heads-up deals. Return buckets (count x 2 seats x 4 streets) and the showdown outcome of each deal.
+	'''
+	def deal(self, count):
+		cards = np.argsort(self.rng.random((count, 52)), axis=1)[:, :9]
+		holes, board = [cards[:, 0:2], cards[:, 2:4]], cards[:, 4:9]
+		buckets = np.empty((count, 2, 4), dtype=np.int64)
+		for seat in range(2):
+			buckets[:, seat, 0] = self.preflop[starting_hand_indexes(holes[seat])]
+			for street, board_size in enumerate((3, 4, 5), 1):
+				buckets[:, seat, street] = self.postflop(rollout_equity(holes[seat], board[:, :board_size], self.samples, self.rng))
+		ranks = [evaluate_batch(np.hstack([hole, board])) for hole in holes]
+		outcomes = np.where(ranks[0] > ranks[1], SEAT_0_WINS, np.where(ranks[0] < ranks[1], SEAT_1_WINS, TIE))
+		return buckets, outcomes
+
+
+#####################################################################
+
+'''
+Abstract heads-up betting tree, in flat arrays indexed by node.
+'''
+class BettingTree(object):
+
+	def __init__(self, stack = 200, minimum_bid = 2, raise_sizes = RAISE_SIZES, max_raises = MAX_RAISES):
+		self.stack = stack
+		self.minimum_bid = minimum_bid
+		self.raise_sizes = raise_sizes
+		self.max_raises = max_raises
+		self.kinds, self.players, self.streets = [], [], []
+		self.first_child, self.num_children = [], []
+		self.actions = [] # action that leads to the node (raise_by, CALL_ACTION or FOLD_ACTION)
+		self.decisions = [] # decision index of the node, -1 for terminal nodes
+		self.utilities = [] # seat 0's winnings: one value after a fold, one per outcome at a showdown
+		self.keys = [] # (street, seat to act, raises, actions left, contribution of seat 0, contribution of seat 1) of each decision
+		self.decision_of_key = dict()
+		self.decision_nodes = [] # first node of each decision
+		self.build()
+		self.max_actions = max(self.num_children)
+
+	def __len__(self):
+		return len(self.kinds)
+
+	'''
+	Return the state after the blinds, as Round.do_blinds leaves it.
+	'''
+	def root(self):
+		state = GameState(2, self.minimum_bid)
+		state.stacks[0] = state.stacks[1] = self.stack
+		state.bid(0, self.minimum_bid // 2)
+		state.bid(1, self.minimum_bid)
+		state.to_act = 0 # left of the big blind
+		state.advance()
+		return state
+
+	'''
+	Return the abstract actions of the player to act, as (decision, raise_by) pairs.
+	'''
+	def abstract_actions(self, state, raises):
+		seat = state.to_act
+		to_call = min(state.amount_to_call(seat), state.stacks[seat])
+		actions = [(FOLD, 0)] if to_call > 0 else []
+		actions.append((CALL, 0))
+		most = state.stacks[seat] - to_call
+		if most > 0 and raises < self.max_raises:
+			pot = sum(state.contributions) + to_call
+			sizes = {min(most, max(self.minimum_bid, int(fraction * pot) // self.minimum_bid * self.minimum_bid)) for fraction in self.raise_sizes}
+			actions.extend((RAISE, raise_by) for raise_by in sorted(sizes | {most}))
+		return actions
+
+	def build(self):
+		dealer = Random(0) # the tree does not depend on the cards, any will do
+		queue = [(self.root(), 0)] # (state, raises this street) of each node, in node order
+		self._add_node(queue[0][0], None, 0)
+		for node, (state, raises) in enumerate(queue):
+			if self.kinds[node] != DECISION:
+				continue
+			self.first_child[node] = len(queue)
+			actions = self.abstract_actions(state, raises)
+			self.num_children[node] = len(actions)
+			for decision, raise_by in actions:
+				child = state.clone().step(decision, raise_by)
+				street = child.street
+				while child.phase == CHANCE:
+					child.deal(dealer)
+				child_raises = raises + (decision == RAISE) if child.street == street else 0
+				queue.append((child, child_raises))
+				self._add_node(child, FOLD_ACTION if decision == FOLD else (raise_by if decision == RAISE else CALL_ACTION), child_raises)
+			# a node sharing its key with an earlier one must offer the same actions, or the key would not identify it
+			first = self.decision_nodes[self.decisions[node]]
+			assert self._child_actions(node) == self._child_actions(first), 'Decision nodes %d and %d share key %r but not actions' % (first, node, self.keys[self.decisions[node]])
+		self.utilities = [tuple(utility) for utility in self.utilities]
+
+	def _child_actions(self, node):
+		first = self.first_child[node]
+		return self.actions[first:first + self.num_children[node]]
+
+	def _add_node(self, state, action, raises):
+		self.actions.append(action)
+		self.first_child.append(0)
+		self.num_children.append(0)
+		contributions = list(state.contributions)
+		if state.phase == DONE:
+			self.kinds.append(FOLD_END if state.winner() is not None else SHOWDOWN)
+			self.players.append(-1)
+			self.decisions.append(-1)
+			outcomes = [{state.winner(): 0}] if state.winner() is not None else OUTCOME_RANKS
+			self.utilities.append([settle_layers(enumerate(contributions), ranks, range(2)).get(0, 0) - contributions[0] for ranks in outcomes])
+		else:
+			self.kinds.append(DECISION)
+			self.players.append(state.to_act)
+			self.utilities.append([])
+			key = (state.street, state.to_act, raises, state.actions_left, contributions[0], contributions[1])
+			decision = self.decision_of_key.get(key)
+			if decision is None: # first node with this key
+				decision = self.decision_of_key[key] = len(self.keys)
+				self.keys.append(key)
+				self.decision_nodes.append(len(self.kinds) - 1)
+			self.decisions.append(decision)
+		self.streets.append(state.street)
+
+
+#####################################################################
+
+class CFRSolver(object):
+
+	def __init__(self, tree = None, bucketer = None, seed = None):
+		self.tree = tree if tree is not None else BettingTree()
+		self.bucketer = bucketer if bucketer is not None else EquityBuckets(seed=seed)
+		self.rng = Random(seed)
+		infosets = len(self.tree.keys) * self.bucketer.buckets
+		self.regrets = np.zeros((infosets, self.tree.max_actions))
+		self.strategy_sum = np.zeros((infosets, self.tree.max_actions))
+		self.iterations = 0
+		self.uniform = [None] + [[1.0 / n] * n for n in range(1, self.tree.max_actions + 1)]
+
+	'''
+	Run iterations of external sampling MCCFR in this process.
+	'''
+	def iterate(self, iterations):
+		done = 0
+		while done < iterations:
+			batch = min(DEAL_BATCH, iterations - done)
+			buckets, outcomes = self.bucketer.deal(batch)
+			for deal_buckets, outcome in zip(buckets.tolist(), outcomes.tolist()):
+				self.iterations += 1
+				for traverser in (0, 1):
+					self._traverse(0, traverser, deal_buckets, outcome)
+			done += batch
+
+	def _traverse(self, node, traverser, buckets, outcome):
+		tree = self.tree
+		kind = tree.kinds[node]
+		if kind != DECISION:
+			utility = tree.utilities[node][0 if kind == FOLD_END else outcome]
+			return utility if traverser == 0 else -utility
+
+		player = tree.players[node]
+		infoset = tree.decisions[node] * self.bucketer.buckets + buckets[player][tree.streets[node]]
+		first, n = tree.first_child[node], tree.num_children[node]
+		# rows are a handful of actions, where list arithmetic beats numpy's per-call overhead
+		regrets = self.regrets[infoset, :n].tolist() # never negative with regret matching+
+		total = sum(regrets)
+		strategy = [regret / total for regret in regrets] if total > 0 else self.uniform[n]
+
+		if player == traverser:
+			values = [self._traverse(first + a, traverser, buckets, outcome) for a in range(n)]
+			value = sum(p * v for p, v in zip(strategy, values))
+			self.regrets[infoset, :n] = [max(regret + v - value, 0.0) for regret, v in zip(regrets, values)]
+			return value
+
+		weight = self.iterations # linear averaging
+		self.strategy_sum[infoset, :n] += [weight * p for p in strategy]
+		roll = self.rng.random()
+		for action in range(n - 1):
+			roll -= strategy[action]
+			if roll < 0:
+				break
+		else:
+			action = n - 1
+		return self._traverse(first + action, traverser, buckets, outcome)
+
+	'''
+	Train for iterations, on processes workers (all cores by default, in this process with processes=0)
+	that merge their regrets every sync_every iterations each.
+	'''
+	def train(self, iterations, processes = None, sync_every = 1000):
+		if processes == 0:
+			self.iterate(iterations)
+			return self
+		workers = processes or os.cpu_count() or 1
+		with Pool(workers, initializer=_init_worker, initargs=(self.tree, self.bucketer.buckets, self.bucketer.samples, self.bucketer.preflop)) as pool:
+			while iterations > 0:
+				chunks = [min(sync_every, -(-iterations // workers)) for i in range(workers)]
+				chunks = [chunk for chunk in chunks if chunk > 0]
+				tasks = [(self.regrets, self.strategy_sum, chunk, self.iterations, self.rng.getrandbits(64)) for chunk in chunks]
+				for regret_change, strategy_change in pool.imap_unordered(_train_chunk, tasks):
+					self.regrets += regret_change
+					self.strategy_sum += strategy_change
+				np.maximum(self.regrets, 0.0, out=self.regrets)
+				self.iterations += sum(chunks)
+				iterations -= sum(chunks)
+		return self
+
+	'''
+	Return the average strategy, one row of action probabilities per infoset (uniform where never reached).
+	'''
+	def average_strategy(self):
+		strategy = np.zeros_like(self.strategy_sum)
+		buckets = self.bucketer.buckets
+		for decision, node in enumerate(self.tree.decision_nodes):
+			n = self.tree.num_children[node]
+			rows = self.strategy_sum[decision * buckets:(decision + 1) * buckets, :n]
+			totals = rows.sum(axis=1, keepdims=True)
+			strategy[decision * buckets:(decision + 1) * buckets, :n] = np.where(totals > 0, rows / np.maximum(totals, 1e-300), 1.0 / n)
+		return strategy
+
+	'''
+	Write the average strategy and the tree's decision nodes to path for StrategyTable.
+	'''
+	def export(self, path):
+		tree, buckets = self.tree, self.bucketer.buckets
+		nodes = tree.decision_nodes
+		actions = np.full((len(nodes), tree.max_actions), NO_ACTION, dtype='<i4')
+		for decision, node in enumerate(nodes):
+			first = tree.first_child[node]
+			actions[decision, :tree.num_children[node]] = tree.actions[first:first + tree.num_children[node]]
+		with open(path + '.tmp', 'wb') as f:
+			f.write(HEADER.pack(MAGIC, VERSION, buckets, len(nodes), tree.max_actions, tree.stack, tree.minimum_bid, self.bucketer.samples).ljust(HEADER_SIZE, b'\0'))
+			f.write(self.bucketer.preflop.astype(np.uint8).tobytes())
+			f.write(np.array(tree.keys, dtype='<i4').reshape(-1, KEY_SIZE).tobytes())
+			f.write(actions.tobytes())
+			f.write(self.average_strategy().astype('<f4').tobytes())
+		os.replace(path + '.tmp', path)
+
+_worker_solver = None
+
+def _init_worker(tree, buckets, samples, preflop):
+	global _worker_solver
+	_worker_solver = CFRSolver(tree, EquityBuckets(buckets, samples, seed=os.getpid(), preflop=preflop))
+
+'''
+Worker task: train a chunk of iterations from the coordinator's arrays and return how they changed.
+'''
+def _train_chunk(args):
+	regrets, strategy_sum, iterations, start, seed = args
+	solver = _worker_solver
+	solver.regrets[:] = regrets
+	solver.strategy_sum[:] = 0
+	solver.iterations = start
+	solver.rng.seed(seed)
+	solver.bucketer.rng = np.random.default_rng(seed)
+	solver.iterate(iterations)
+	return solver.regrets - regrets, solver.strategy_sum
+
+
+#####################################################################
+
+'''
+Memory-mapped average strategy exported by CFRSolver.export. Decisions are found by their key (street, seat
+to act, raises, actions left, contributions in the table's chips), so a lookup is a dict read and a row read.
+'''
+class StrategyTable(object):
+
+	def __init__(self, path):
+		with open(path, 'rb') as f:
+			self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+		magic, version, self.buckets, decisions, self.max_actions, self.stack, self.minimum_bid, self.samples = HEADER.unpack_from(self.map)
+		if magic != MAGIC or version != VERSION:
+			raise ValueError('%s is not a CFR strategy table' % path)
+		if sys.byteorder != 'little':
+			raise ValueError('Strategy tables can only be memory-mapped on little-endian machines')
+		offset = HEADER_SIZE
+		self.preflop = np.frombuffer(self.map, dtype=np.uint8, count=NUM_HANDS, offset=offset)
+		offset += NUM_HANDS
+		self.keys = np.frombuffer(self.map, dtype='<i4', count=decisions * KEY_SIZE, offset=offset).reshape(decisions, KEY_SIZE)
+		offset += self.keys.nbytes
+		self.actions = np.frombuffer(self.map, dtype='<i4', count=decisions * self.max_actions, offset=offset).reshape(decisions, self.max_actions)
+		offset += self.actions.nbytes
+		self.strategy = np.frombuffer(self.map, dtype='<f4', count=decisions * self.buckets * self.max_actions, offset=offset).reshape(-1, self.max_actions)
+		self.index = {tuple(key): decision for decision, key in enumerate(self.keys.tolist())}
+		self.by_street = dict() # (street, seat) -> decisions, for keys that are not in the tree
+		self.by_spot = dict() # (street, seat, raises, actions left) -> decisions
+		for decision, (street, seat, raises, actions_left, first, second) in enumerate(self.keys.tolist()):
+			self.by_street.setdefault((street, seat), []).append(decision)
+			self.by_spot.setdefault((street, seat, raises, actions_left), []).append(decision)
+
+	'''
+	Return the decision for the key, or else the one with the nearest contributions in the same spot
+	(street, seat, raises and actions left), or failing that on the same street and seat.
+	'''
+	def decision(self, street, seat, raises, actions_left, contribution_0, contribution_1):
+		decision = self.index.get((street, seat, raises, actions_left, contribution_0, contribution_1))
+		if decision is not None:
+			return decision
+		candidates = self.by_spot.get((street, seat, raises, actions_left)) or self.by_street.get((street, seat))
+		if not candidates:
+			return None
+		keys = self.keys[candidates]
+		distance = np.abs(np.log1p(keys[:, 4]) - np.log1p(contribution_0)) + np.abs(np.log1p(keys[:, 5]) - np.log1p(contribution_1))
+		return candidates[int(np.argmin(distance))]
+
+	'''
+	Return the (actions, probabilities) of a decision node and bucket.
+	'''
+	def strategy_at(self, decision, bucket):
+		actions = self.actions[decision]
+		n = int((actions != NO_ACTION).sum())
+		return actions[:n], self.strategy[decision * self.buckets + bucket, :n]
+
+'''
+Agent that plays a trained strategy heads-up (and calls otherwise). Bets are scaled from the table's
+blinds to the game's, and bets the tree does not have are read as the nearest one it does.
+'''
+class SolverAgent(Agent):
+
+	def __init__(self, table, seed = None):
+		self.table = table if isinstance(table, StrategyTable) else StrategyTable(table)
+		self.bucketer = EquityBuckets(self.table.buckets, self.table.samples, seed=seed, preflop=self.table.preflop)
+		self.rng = Random(seed)
+
+	def decide(self, player, curr_round, amount_to_call):
+		order = curr_round.player_order
+		if len(order) != 2 or player.hand is None:
+			return CALL, 0
+		scale = self.table.minimum_bid / curr_round.minimum_bid
+		contributions = [int(round(curr_round.pot.contributions.get(p, 0) * scale)) for p in order]
+		decision = self.table.decision(curr_round.street, order.index(player), curr_round.raises, curr_round.actions_left, *contributions)
+		if decision is None:
+			return CALL, 0
+		bucket = self.bucketer.bucket([card.code for card in player.hand.cards], [card.code for card in curr_round.pot.cards])
+		actions, probabilities = self.table.strategy_at(decision, bucket)
+		roll, cumulative = self.rng.random() * float(probabilities.sum()), 0.0
+		for action, probability in zip(actions.tolist(), probabilities.tolist()):
+			cumulative += probability
+			if roll < cumulative:
+				break
+
+		if action == FOLD_ACTION:
+			return (FOLD, 0) if amount_to_call > 0 else (CALL, 0)
+		if action == CALL_ACTION:
+			return CALL, 0
+		raise_by = max(1, int(round(action / scale)))
+		if player.money < amount_to_call + raise_by:
+			raise_by = player.money - amount_to_call # all in
+		return (RAISE, raise_by) if raise_by > 0 else (CALL, 0)
+
+if __name__ == '__main__':
+	# python -m poker.Solver [iterations] [path]
+	solver = CFRSolver(seed=0).train(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
+	solver.export(sys.argv[2] if len(sys.argv) > 2 else 'strategy.bin')
+	print('%d iterations over %d information sets' % (solver.iterations, len(solver.regrets)))
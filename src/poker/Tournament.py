@@ -0,0 +1,209 @@
+import math
+import struct
+import sys
+from multiprocessing import Pool
+from random import Random
+from .Agent import CallingStationAgent, RandomAgent
+from .Observer import Observer
+from .Poker import Poker
+
+'''
+Multi-table tournaments. A coordinator seats the players at tables and plays the tournament in levels:
+every table plays hands_per_level hands at the level's blinds on a worker in a process pool, then the
+coordinator takes out the players who went bust (Poker.remove_bankrupt_players, run by each table),
+breaks tables that are no longer needed and rebalances the rest.
+
+Tables travel between the coordinator and the workers as packed messages of ids, stacks and agent names,
+not as pickled games:
+	table	header (table id, minimum bid, hands, seed, dealer id, players), then per seat (id, stack, agent)
+	result	header (table id, hands played, dealer id, players), then per seat (id, stack, hand it went bust in)
+'''
+
+TABLE_HEADER = struct.Struct('<IIIQiH')
+TABLE_SEAT = struct.Struct('<IqB')
+RESULT_HEADER = struct.Struct('<IIiH')
+RESULT_SEAT = struct.Struct('<IqI')
+NO_DEALER = -1
+
+# minimum bids (big blinds) of each level; past the last level they keep doubling
+DEFAULT_SCHEDULE = [2, 4, 6, 10, 16, 24, 40, 60, 100, 150, 200, 300, 400, 600, 800, 1000]
+
+# agents a tournament player can be, by name; agents get their seed from the table's seed
+AGENT_NAMES = ['random', 'calling_station']
+AGENTS = {
+	'random': lambda seed: RandomAgent(seed),
+	'calling_station': lambda seed: CallingStationAgent(),
+}
+
+def minimum_bid(level, schedule = DEFAULT_SCHEDULE):
+	if level < len(schedule):
+		return schedule[level]
+	return schedule[-1] * 2 ** (level - len(schedule) + 1)
+
+def encode_table(table_id, minimum_bid, hands, seed, dealer, seats):
+	message = bytearray(TABLE_HEADER.pack(table_id, minimum_bid, hands, seed, NO_DEALER if dealer is None else dealer, len(seats)))
+	for id_, stack, agent in seats:
+		message += TABLE_SEAT.pack(id_, stack, AGENT_NAMES.index(agent))
+	return bytes(message)
+
+def decode_table(message):
+	table_id, minimum_bid, hands, seed, dealer, players = TABLE_HEADER.unpack_from(message)
+	seats = []
+	for i in range(players):
+		id_, stack, agent = TABLE_SEAT.unpack_from(message, TABLE_HEADER.size + i * TABLE_SEAT.size)
+		seats.append((id_, stack, AGENT_NAMES[agent]))
+	return table_id, minimum_bid, hands, seed, None if dealer == NO_DEALER else dealer, seats
+
+def encode_result(table_id, hands, dealer, seats):
+	message = bytearray(RESULT_HEADER.pack(table_id, hands, NO_DEALER if dealer is None else dealer, len(seats)))
+	for seat in seats:
+		message += RESULT_SEAT.pack(*seat)
+	return bytes(message)
+
+def decode_result(message):
+	table_id, hands, dealer, players = RESULT_HEADER.unpack_from(message)
+	seats = [RESULT_SEAT.unpack_from(message, RESULT_HEADER.size + i * RESULT_SEAT.size) for i in range(players)]
+	return table_id, hands, None if dealer == NO_DEALER else dealer, seats
+
+
+#####################################################################
+
+'''
+Records the hand each player went bust in.
+'''
+class BustObserver(Observer):
+
+	def __init__(self):
+		self.hands = 0
+		self.busted = dict()
+
+	def event(self, name, **info):
+		if name == 'round_start':
+			self.hands += 1
+		elif name == 'bankrupt':
+			self.busted[info['player'].id] = self.hands
+
+'''
+Worker task: play a table message's hands and return the result message.
+'''
+def play_table(message):
+	table_id, minimum_bid, hands, seed, dealer, seats = decode_table(message)
+	rng = Random(seed)
+	agents = [AGENTS[agent](rng.getrandbits(64)) for id_, stack, agent in seats]
+	observer = BustObserver()
+	game = Poker(0, seed=rng.getrandbits(64), agents=agents, observer=observer, minimum_bid=minimum_bid)
+	game.initialize(ids=[id_ for id_, stack, agent in seats], stacks=[stack for id_, stack, agent in seats], dealer=dealer)
+	played = game.play(max_rounds=hands)
+	return encode_result(table_id, played, game.dealer.id,
+		[(player.id, player.money, observer.busted.get(player.id, 0)) for player in game.players])
+
+
+#####################################################################
+
+class Tournament(object):
+
+	'''
+	agents holds the agent name (see AGENTS) of every player; players are numbered from 1.
+	With processes=0 tables are played in the calling process.
+	'''
+	def __init__(self, agents, start_money = 1000, table_size = 9, schedule = DEFAULT_SCHEDULE,
+			hands_per_level = 20, seed = None, processes = None):
+		if len(agents) < 2:
+			raise ValueError('A tournament needs at least 2 players')
+		self.agents = {id_: agent for id_, agent in enumerate(agents, 1)}
+		self.stacks = {id_: start_money for id_ in self.agents}
+		self.table_size = table_size
+		self.schedule = schedule
+		self.hands_per_level = hands_per_level
+		self.rng = Random(seed)
+		self.processes = processes
+		self.tables = dict() # table id -> player ids in seat order
+		self.dealers = dict() # table id -> id of the next dealer
+		self.standings = [] # players who went bust, first out first
+		self.level = 0
+		self.hands = 0 # hands played over all tables
+		self.moves = 0 # players moved to another table
+
+		players = list(self.agents)
+		self.rng.shuffle(players)
+		tables = math.ceil(len(players) / table_size)
+		for table_id in range(tables):
+			self.tables[table_id] = players[table_id::tables]
+
+	def players_left(self):
+		return sum(len(players) for players in self.tables.values())
+
+	'''
+	Return the table messages for the current level.
+	'''
+	def table_messages(self):
+		bid = minimum_bid(self.level, self.schedule)
+		return [encode_table(table_id, bid, self.hands_per_level, self.rng.getrandbits(64), self.dealers.get(table_id),
+			[(id_, self.stacks[id_], self.agents[id_]) for id_ in players]) for table_id, players in self.tables.items()]
+
+	'''
+	Take in a table's result: new stacks, and players who went bust in the order they did.
+	'''
+	def add_result(self, message, busted):
+		table_id, hands, dealer, seats = decode_result(message)
+		self.hands += hands
+		self.dealers[table_id] = dealer
+		for id_, stack, bust_hand in seats:
+			if stack == 0:
+				busted.append((bust_hand, self.stacks[id_], id_))
+			self.stacks[id_] = stack
+		self.tables[table_id] = [id_ for id_, stack, bust_hand in seats if stack > 0]
+
+	'''
+	Break tables that are no longer needed, then move players from the fullest tables to the emptiest
+	until table sizes differ by at most one.
+	'''
+	def rebalance(self):
+		for table_id in [table_id for table_id, players in self.tables.items() if not players]:
+			del self.tables[table_id]
+		needed = math.ceil(self.players_left() / self.table_size)
+		while len(self.tables) > needed:
+			broken = min(self.tables, key=lambda table_id: len(self.tables[table_id]))
+			for id_ in self.tables.pop(broken):
+				smallest = min(self.tables, key=lambda table_id: len(self.tables[table_id]))
+				self.tables[smallest].append(id_)
+				self.moves += 1
+			self.dealers.pop(broken, None)
+		while True:
+			largest = max(self.tables, key=lambda table_id: len(self.tables[table_id]))
+			smallest = min(self.tables, key=lambda table_id: len(self.tables[table_id]))
+			if len(self.tables[largest]) - len(self.tables[smallest]) <= 1:
+				break
+			self.tables[smallest].append(self.tables[largest].pop())
+			self.moves += 1
+
+	'''
+	Play the tournament to the end. Return the player ids in finishing order, winner first.
+	'''
+	def run(self):
+		pool = Pool(self.processes) if self.processes != 0 else None
+		try:
+			while self.players_left() > 1:
+				busted = []
+				messages = self.table_messages()
+				results = pool.imap_unordered(play_table, messages) if pool is not None else map(play_table, messages)
+				for message in results:
+					self.add_result(message, busted)
+				# players out in the same level are placed by the hand they went out in, then by their stack at the start of the level
+				self.standings.extend(id_ for bust_hand, stack, id_ in sorted(busted))
+				self.level += 1
+				self.rebalance()
+		finally:
+			if pool is not None:
+				pool.close()
+				pool.join()
+		winners = [id_ for players in self.tables.values() for id_ in players]
+		return winners + self.standings[::-1]
+
+if __name__ == '__main__':
+	# python -m poker.Tournament [players] [table size]
+	players = int(sys.argv[1]) if len(sys.argv) > 1 else 180
+	tournament = Tournament(['random'] * players, table_size=int(sys.argv[2]) if len(sys.argv) > 2 else 9, seed=0)
+	standings = tournament.run()
+	print('Player %d wins after %d levels and %d hands (%d players moved between tables)' % (
+		standings[0], tournament.level, tournament.hands, tournament.moves))
@@ -0,0 +1,218 @@
+import itertools
+from .Card import Card
+from .Evaluator import evaluate, evaluate5, hand_category, RankTables, FLUSHES, UNIQUE5, PRODUCTS, STRAIGHTS
+from .Hand import HandTracker
+
+'''
+Poker variants. A variant decides the deck, how many hole cards each player gets and how a hand is scored,
+and is given to Poker (i.e. Poker(100, agents=agents, variant=Omaha())), which passes it on to its Deck
+and to every Hand. Games without a variant play Texas hold'em through the default code paths.
+
+	Variant		Texas hold'em: 2 hole cards, best 5 of 7, 52 cards
+	Omaha		4 hole cards, the hand must use exactly 2 of them and 3 board cards
+	ShortDeck	2 hole cards, 36 cards (6 up to ace), a flush beats a full house and A-6-7-8-9 is a straight
+'''
+
+class Variant(object):
+
+	name = 'holdem'
+	hole_cards = 2
+	minimum_board = 3 # board cards needed before a hand has a rank
+
+	def __init__(self):
+		self.cards = list(Card.CARDS) # every card in the deck
+
+	def __repr__(self):
+		return '%s()' % type(self).__name__
+
+	def tracker(self, cards):
+		return HandTracker(cards)
+
+	'''
+	Return the rank of the best hand made from the encoded hole and board cards (higher is better).
+	'''
+	def evaluate(self, hole, board):
+		return evaluate(hole + board)
+
+	def evaluate5(self, c1, c2, c3, c4, c5):
+		return evaluate5(c1, c2, c3, c4, c5)
+
+	'''
+	Return every 5 card hand the rules allow from the hole and board cards.
+	'''
+	def combinations(self, hole, board):
+		return itertools.combinations(list(board) + list(hole), 5)
+
+	def category(self, rank):
+		return hand_category(rank)
+
+	'''
+	Rank the best hand made from the hole and board Cards.
+	'''
+	def score(self, hole_cards, board_cards):
+		return self.evaluate([card.bits for card in hole_cards], [card.bits for card in board_cards])
+
+'''
+Hand strength of a player's cards plus the board cards seen so far, for variants that do not use
+HandTracker. The rank is only worked out when it is asked for.
+'''
+class VariantTracker(object):
+
+	def __init__(self, variant, cards = ()):
+		self.variant = variant
+		self.bits = [card.bits for card in cards] # hole cards first, then the board
+		self._rank = None
+
+	def add_cards(self, cards):
+		self.bits.extend(card.bits for card in cards)
+		self._rank = None
+
+	def add(self, card):
+		self.add_cards([card])
+
+	'''
+	Best rank so far, 0 until the board has enough cards to make a hand.
+	'''
+	@property
+	def rank(self):
+		if self._rank is None:
+			hole = self.variant.hole_cards
+			if len(self.bits) - hole < self.variant.minimum_board:
+				return 0
+			self._rank = self.variant.evaluate(self.bits[:hole], self.bits[hole:])
+		return self._rank
+
+	@property
+	def category(self):
+		rank = self.rank
+		return self.variant.category(rank) if rank else None
+
+
+#####################################################################
+
+# 9 ranks from the six up, with the ace also playing low below the six
+SHORT_DECK_RANKS = range(4, 13)
+SHORT_DECK_STRAIGHTS = [0b1000011110000] + [0b11111 << i for i in range(4, 9)]
+
+_short_deck_tables = None
+
+def short_deck_tables():
+	global _short_deck_tables
+	if _short_deck_tables is None:
+		_short_deck_tables = RankTables(SHORT_DECK_RANKS, SHORT_DECK_STRAIGHTS, flush_beats_full_house=True)
+	return _short_deck_tables
+
+class ShortDeck(Variant):
+
+	name = 'short_deck'
+
+	def __init__(self):
+		self.cards = [card for card in Card.CARDS if card.value >= 6]
+		self.tables = short_deck_tables()
+
+	def tracker(self, cards):
+		return VariantTracker(self, cards)
+
+	def evaluate(self, hole, board):
+		return self.tables.evaluate(hole + board)
+
+	def evaluate5(self, c1, c2, c3, c4, c5):
+		return self.tables.evaluate5(c1, c2, c3, c4, c5)
+
+	def category(self, rank):
+		return self.tables.category(rank)
+
+
+#####################################################################
+
+'''
+What a board allows, worked out once and shared by every Omaha hand scored on it:
+	flush_suit		suit bit of the suit with 3 or more board cards (0 if no flush is possible)
+	flush_triples	rank masks of the 3 board cards of the flush suit a hand can use
+	paired			whether two board cards share a rank (no full house or quads without it)
+	straights		straights with at least 3 of their ranks on the board, strongest first
+	triples			distinct (prime product, rank mask) of the 3 board cards a hand can use
+'''
+class BoardTexture(object):
+
+	def __init__(self, board):
+		self.rank_mask = 0
+		suit_counts = dict()
+		for card in board:
+			self.rank_mask |= card >> 16
+			suit_counts[card & 0xF000] = suit_counts.get(card & 0xF000, 0) + 1
+		self.paired = bin(self.rank_mask).count('1') < len(board)
+		self.flush_suit = max(suit_counts, key=suit_counts.get) if max(suit_counts.values()) >= 3 else 0
+		triples = dict()
+		self.flush_triples = []
+		for c1, c2, c3 in itertools.combinations(board, 3):
+			triples[(c1 & 0xFF) * (c2 & 0xFF) * (c3 & 0xFF)] = (c1 | c2 | c3) >> 16
+			if c1 & c2 & c3 & self.flush_suit:
+				self.flush_triples.append((c1 | c2 | c3) >> 16)
+		self.triples = list(triples.items())
+		self.straights = [straight for straight in reversed(STRAIGHTS) if bin(straight & self.rank_mask).count('1') >= 3]
+
+'''
+Return the rank of the best Omaha hand: exactly 2 of the encoded hole cards and 3 cards of the board's texture.
+Rather than scoring all 60 ways (6 hole pairs by 10 board triples) of a 4-card hand, hand classes the board
+rules out are skipped: flushes are only looked for when the board has 3 cards of a suit, and on an unpaired
+board (where no full house or quads can be made) a flush, then the best straight, is the answer as soon as it is
+found. Otherwise hole pairs and board triples with the same ranks are only scored once.
+'''
+def omaha_rank(hole, texture):
+	pairs = list(itertools.combinations(hole, 2))
+	best = 0
+	if texture.flush_suit:
+		for a, b in pairs:
+			if a & b & texture.flush_suit:
+				hole_mask = (a | b) >> 16
+				for triple in texture.flush_triples:
+					rank = FLUSHES[hole_mask | triple]
+					if rank > best:
+						best = rank
+		if best and not texture.paired:
+			return best
+
+	if not texture.paired and texture.straights:
+		hole_masks = {(a | b) >> 16 for a, b in pairs if (a ^ b) >> 16}
+		for straight in texture.straights:
+			for hole_mask in hole_masks:
+				needed = straight & ~hole_mask # the 3 ranks the board has to supply
+				if hole_mask & straight == hole_mask and needed & texture.rank_mask == needed:
+					return UNIQUE5[straight]
+
+	hole_pairs = {(a & 0xFF) * (b & 0xFF): (a | b) >> 16 for a, b in pairs}
+	for hole_product, hole_mask in hole_pairs.items():
+		for board_product, board_mask in texture.triples:
+			rank = UNIQUE5[hole_mask | board_mask] or PRODUCTS[hole_product * board_product]
+			if rank > best:
+				best = rank
+	return best
+
+class Omaha(Variant):
+
+	name = 'omaha'
+	hole_cards = 4
+
+	def __init__(self):
+		super().__init__()
+		self._texture = (None, None) # (board, texture) of the last board scored
+
+	def tracker(self, cards):
+		return VariantTracker(self, cards)
+
+	def texture(self, board):
+		board = tuple(board)
+		if self._texture[0] != board:
+			self._texture = (board, BoardTexture(board))
+		return self._texture[1]
+
+	def evaluate(self, hole, board):
+		return omaha_rank(hole, self.texture(board))
+
+	def combinations(self, hole, board):
+		for pair in itertools.combinations(hole, 2):
+			for triple in itertools.combinations(board, 3):
+				yield pair + triple
+
+VARIANTS = {variant.name: variant for variant in (Variant, Omaha, ShortDeck)}
@@ -0,0 +1,23 @@
+'''
+Poker game, hand evaluators and analysis tools.
+
+Importing the package runs nothing and loads none of its modules: each module is imported the first time it
+is used, either directly (from poker.Poker import Poker) or as an attribute of the package (poker.Equity).
+Lookup tables are read from precomputed files on first use rather than built at startup, so the short-lived
+worker processes of the simulators only pay for what they touch. The command line lives in poker/__main__.py.
+'''
+
+__version__ = '0.1.0'
+
+MODULES = ('Agent', 'Analytics', 'BatchEvaluator', 'Benchmark', 'BenchmarkSuite', 'Card', 'Deck', 'Equity',
+	'Evaluator', 'FaceValues', 'GameState', 'Hand', 'HandHistory', 'HandStrength', 'ICM', 'Metrics', 'Observer',
+	'Player', 'Poker', 'Pot', 'Preflop', 'Range', 'Seats', 'Server', 'Solver', 'Suits', 'Tournament', 'Variant')
+
+def __getattr__(name):
+	if name in MODULES:
+		import importlib
+		return importlib.import_module('.' + name, __name__) # also sets it as an attribute of the package
+	raise AttributeError('module %r has no attribute %r' % (__name__, name))
+
+def __dir__():
+	return sorted(set(globals()) | set(MODULES))
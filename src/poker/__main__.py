@@ -0,0 +1,98 @@
+import argparse
+import sys
+import time
+
+'''
+Command line for the game, installed as the poker script (or run with python -m poker):
+
+	poker play [--players 4] [--bots 0] [--money 100] [--variant omaha] [--rounds N] [--seed S]
+	poker simulate [--hands 10000] [--players 6] [--agent random] [--variant omaha] [--seed 0] [--metrics path]
+	poker bench run|startup|compare ...		see BenchmarkSuite.py
+
+Each command imports what it needs only once it runs, so starting the script costs little more than the
+interpreter itself.
+'''
+
+VARIANT_NAMES = ['holdem', 'omaha', 'short_deck']
+AGENT_NAMES = ['random', 'calling']
+
+'''
+Return the Variant to play, or None for Texas hold'em (which takes the default code paths).
+'''
+def make_variant(name):
+	if name == 'holdem':
+		return None
+	from .Variant import VARIANTS
+	return VARIANTS[name]()
+
+def make_agent(name, seed):
+	from .Agent import CallingStationAgent, RandomAgent
+	return RandomAgent(seed) if name == 'random' else CallingStationAgent()
+
+def play(args):
+	from .Agent import HumanAgent
+	from .Observer import ConsoleObserver
+	from .Poker import Poker
+	agents = None # asks for the number of players, as python -m poker.Poker does
+	if args.players is not None:
+		if args.players < 2 or not 0 <= args.bots <= args.players:
+			raise SystemExit('A game needs at least 2 players, and no more bots than players')
+		agents = [HumanAgent() for i in range(args.players - args.bots)]
+		agents += [make_agent('random', None if args.seed is None else args.seed + i) for i in range(args.bots)]
+	game = Poker(args.money, seed=args.seed, agents=agents, observer=ConsoleObserver(), variant=make_variant(args.variant))
+	game.play(max_rounds=args.rounds)
+	return 0
+
+def simulate(args):
+	from .Poker import simulate
+	metrics = None
+	if args.metrics:
+		from .Metrics import GameMetrics
+		metrics = GameMetrics()
+	agents = [make_agent(args.agent, args.seed + i) for i in range(args.players)]
+	start = time.perf_counter()
+	hands = simulate(args.hands, agents, args.money, seed=args.seed, metrics=metrics, variant=make_variant(args.variant))
+	seconds = time.perf_counter() - start
+	print('%d hands between %d %s agents in %.2f s (%.0f hands/s)' % (hands, args.players, args.agent, seconds, hands / seconds))
+	if metrics is not None:
+		metrics.registry.write(args.metrics)
+	return 0
+
+def bench(arguments):
+	from .BenchmarkSuite import main
+	return main(arguments, prog='poker bench')
+
+def main(argv = None):
+	argv = sys.argv[1:] if argv is None else list(argv)
+	if argv[:1] == ['bench']: # its arguments (--help included) all belong to BenchmarkSuite
+		return bench(argv[1:])
+
+	parser = argparse.ArgumentParser(prog='poker', description='Play, simulate and benchmark poker games.')
+	commands = parser.add_subparsers(dest='command', required=True)
+
+	game = commands.add_parser('play', help='play at the terminal, against other people or random bots')
+	game.add_argument('--players', type=int, help='players at the table (asked for when not given)')
+	game.add_argument('--bots', type=int, default=0, help='how many of the players are random bots')
+	game.add_argument('--money', type=int, default=100, help='starting stack of each player')
+	game.add_argument('--variant', choices=VARIANT_NAMES, default='holdem')
+	game.add_argument('--rounds', type=int, help='stop after this many rounds')
+	game.add_argument('--seed', type=int)
+	game.set_defaults(run=play)
+
+	headless = commands.add_parser('simulate', help='play headless hands between computer agents')
+	headless.add_argument('--hands', type=int, default=10000)
+	headless.add_argument('--players', type=int, default=6)
+	headless.add_argument('--agent', choices=AGENT_NAMES, default='random')
+	headless.add_argument('--money', type=int, default=100, help='starting stack of each player')
+	headless.add_argument('--variant', choices=VARIANT_NAMES, default='holdem')
+	headless.add_argument('--seed', type=int, default=0)
+	headless.add_argument('--metrics', help='write Prometheus metrics of the games to this file')
+	headless.set_defaults(run=simulate)
+
+	commands.add_parser('bench', help='run, compare and check startup benchmarks (see poker bench --help)')
+
+	args = parser.parse_args(argv)
+	return args.run(args)
+
+if __name__ == '__main__':
+	sys.exit(main())
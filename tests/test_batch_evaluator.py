@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from poker.BatchEvaluator import evaluate_batch
+from poker.Evaluator import CARD_BITS, evaluate, evaluate5
+
+'''
+The batch evaluator must rank every hand exactly as the scalar evaluator does.
+'''
+
+SAMPLES = 20000
+
+'''
+Return an n x size array of card codes from a fixed seed, without repeated cards in a row.
+'''
+def sample_codes(n, size, seed):
+	rng = np.random.default_rng(seed)
+	return np.argsort(rng.random((n, 52)), axis=1)[:, :size]
+
+def scalar_ranks(codes):
+	return [evaluate([CARD_BITS[code] for code in row]) for row in codes.tolist()]
+
+@pytest.mark.parametrize('size', [5, 6, 7])
+def test_matches_scalar_evaluator(size):
+	codes = sample_codes(SAMPLES, size, seed=size)
+	assert evaluate_batch(codes).tolist() == scalar_ranks(codes)
+
+def test_five_cards_match_evaluate5():
+	codes = sample_codes(SAMPLES, 5, seed=0)
+	expected = [evaluate5(*[CARD_BITS[code] for code in row]) for row in codes.tolist()]
+	assert evaluate_batch(codes).tolist() == expected
+
+'''
+Hands a uniform sample rarely hits: flushes beside a pair or trips, straight flushes and the wheel.
+'''
+@pytest.mark.parametrize('hand', [
+	[48, 44, 40, 36, 32], # royal flush in hearts
+	[48, 0, 4, 8, 12], # steel wheel
+	[49, 1, 6, 10, 15], # wheel
+	[0, 1, 2, 3, 4, 5, 8], # four deuces beside a pair
+	[0, 4, 8, 12, 24, 1, 5], # heart flush holding two pairs
+	[0, 4, 8, 12, 16, 20, 24], # seven-card straight flush
+	[51, 50, 47, 46, 43, 42, 39], # three pairs
+])
+def test_matches_scalar_evaluator_on_edge_hands(hand):
+	assert evaluate_batch([hand]).tolist() == scalar_ranks(np.array([hand]))
+
+def test_rejects_bad_shapes():
+	with pytest.raises(ValueError):
+		evaluate_batch([[0, 1, 2, 3]])
+	with pytest.raises(ValueError):
+		evaluate_batch([0, 1, 2, 3, 4])
+
+def test_rejects_hands_with_five_of_a_rank():
+	with pytest.raises(ValueError):
+		evaluate_batch([[48, 49, 48, 49, 50, 51, 44]])
+	with pytest.raises(ValueError):
+		evaluate_batch([[0, 1, 2, 3, 4], [0, 0, 1, 2, 3]]) # only the second hand repeats a card
@@ -0,0 +1,12 @@
+import pytest
+
+from poker.Card import Card
+
+def test_cards_are_interned():
+	assert Card(14, 'Spades') is Card.from_code(51)
+	assert Card(2, 'Hearts') is Card.from_code(0)
+
+@pytest.mark.parametrize('value, suit', [(1, 'Hearts'), (15, 'Hearts'), (0, 'Spades'), (-3, 'Clubs'), (10, 'Stars')])
+def test_rejects_cards_outside_the_deck(value, suit):
+	with pytest.raises(ValueError):
+		Card(value, suit)
@@ -0,0 +1,28 @@
+import pytest
+
+from poker.Card import Card
+from poker.Equity import EquityCache, exact_equity
+from poker.Range import parse_cards
+
+'''
+Exact equity rejects bad input before it reaches the cache, as EquityCalculator.equity does.
+'''
+
+def cards(text):
+	return [Card.from_code(code) for code in parse_cards(text)]
+
+@pytest.mark.parametrize('hands, board', [
+	(['AhKh', 'AhQd'], 'Kd7h2c'), # a card in two hands
+	(['AhKh', 'QsQd'], 'Kh7h2c'), # a hole card on the board
+	(['AhKh', 'QsQd'], 'Kd7h2c2c'), # a board card twice
+	(['AhKh', 'QsQd'], 'Kd7h2c3s4s5s'), # 6 board cards
+])
+def test_exact_equity_rejects_bad_cards(hands, board):
+	cache = EquityCache()
+	with pytest.raises(ValueError):
+		exact_equity([cards(hand) for hand in hands], cards(board), cache=cache)
+	assert len(cache.entries) == 0
+
+def test_exact_equity_on_the_river():
+	result = exact_equity([cards('AhAd'), cards('KsKc')], cards('2c7d9hTsJc'), cache=None)
+	assert list(result.equity) == [1.0, 0.0]
@@ -0,0 +1,108 @@
+from poker.Agent import Agent, CALL, FOLD, RAISE
+from poker.GameState import ACTIVE, ALL_IN, BETTING, CHANCE, DONE, FOLDED, NO_BET, NO_CARD
+from poker.Poker import Poker
+
+'''
+A Round's flat GameState, exported at each decision, steps the same way the Round plays.
+'''
+
+BOARD_SLICES = [None, slice(0, 3), slice(3, 4), slice(4, 5)] # board cards dealt to start each street
+
+'''
+Agent playing a shared script of decisions, exporting the round's state at each one.
+'''
+class ScriptedAgent(Agent):
+
+	def __init__(self, script, states):
+		self.script = script
+		self.states = states
+
+	def decide(self, player, curr_round, amount_to_call):
+		self.states.append(curr_round.export_state())
+		return self.script.pop(0) if self.script else (CALL, 0)
+
+def play_round(script, stacks):
+	states, script = [], list(script)
+	agents = [ScriptedAgent(script, states) for stack in stacks]
+	game = Poker(100, seed=3, agents=agents)
+	game.initialize(stacks=list(stacks), dealer=1)
+	round_ = game.new_round()
+	round_.play()
+	return round_, states
+
+def flat(state):
+	return ([list(state.stacks), list(state.bets), list(state.contributions), list(state.status), list(state.cards)]
+		+ [state.street, state.to_act, state.highest_bet, state.phase, state.actions_left, state.deck_remaining])
+
+def deal_board(state, board):
+	while state.phase == CHANCE:
+		state.deal(codes=board[BOARD_SLICES[state.street + 1]])
+
+'''
+Replay the decisions on a clone of the first exported state, dealing the board the round dealt, and check the
+state before every decision against the one the round exported. Return the state at the end of the round.
+'''
+def replay(round_, states, decisions):
+	board = [card.code for card in round_.pot.cards]
+	state = states[0].clone()
+	for exported, decision in zip(states, decisions):
+		deal_board(state, board)
+		assert flat(state) == flat(exported)
+		state.step(*decision)
+	deal_board(state, board)
+	return state
+
+SCRIPT = [
+	(RAISE, 4), (CALL, 0), (CALL, 0), # preflop: seat 2 raises to 6, the blinds call
+	(CALL, 0), (RAISE, 10), (FOLD, 0), (CALL, 0), # flop, from seat 2: check, seat 0 bets, seat 1 folds, seat 2 calls
+	(CALL, 0), (CALL, 0), # turn: check, check
+	(CALL, 0), (RAISE, 6), (CALL, 0), # river: check, bet, call
+]
+
+def test_exported_state_at_the_first_decision():
+	round_, states = play_round(SCRIPT, (100, 100, 100))
+	state = states[0]
+	seats = len(round_.player_order)
+	assert state.phase == BETTING and state.street == 0 and state.to_act == 2 # left of the big blind
+	assert list(state.bets) == [1, 2, NO_BET] and list(state.contributions) == [1, 2, 0]
+	assert list(state.stacks) == [99, 98, 100] and state.highest_bet == 2
+	assert list(state.status) == [ACTIVE] * 3
+	holes = [card.code for player in round_.player_order for card in player.hand.cards]
+	assert list(state.cards[:2 * seats]) == holes
+	assert list(state.cards[2 * seats:]) == [NO_CARD] * 5
+	assert state.deck_remaining == 52 - 2 * seats
+	assert sorted(list(state.deck[:state.deck_remaining]) + holes) == list(range(52))
+
+def test_replay_matches_the_round():
+	stacks = (100, 100, 100)
+	round_, states = play_round(SCRIPT, stacks)
+	assert len(states) == len(SCRIPT)
+	state = replay(round_, states, SCRIPT)
+
+	assert state.phase == DONE and state.street == 3
+	assert list(state.status) == [ACTIVE, FOLDED, ACTIVE]
+	assert list(state.cards[2 * 3:]) == [card.code for card in round_.pot.cards]
+	# what the flat state pays out is what the round paid out
+	start = dict(zip(round_.player_order, [stacks[player.id - 1] for player in round_.player_order]))
+	paid = [player.money - start[player] + state.contributions[seat] for seat, player in enumerate(round_.player_order)]
+	assert state.payoffs() == paid
+	assert sum(state.payoffs()) == sum(state.contributions) == 3 * 6 + 2 * 10 + 2 * 6
+
+def test_replay_with_an_all_in():
+	stacks = (100, 100, 30) # by player id: player 3, the big blind, is short
+	script = [(RAISE, 48), (CALL, 0), (CALL, 0)] # seat 2 raises to 50, the small blind calls, the big blind calls all in for 30
+	round_, states = play_round(script, stacks)
+	state = replay(round_, states, script + [(CALL, 0)] * (len(states) - len(script)))
+	assert state.phase == DONE and state.status[1] == ALL_IN
+	start = dict(zip(round_.player_order, [stacks[player.id - 1] for player in round_.player_order]))
+	paid = [player.money - start[player] + state.contributions[seat] for seat, player in enumerate(round_.player_order)]
+	assert state.payoffs() == paid
+
+def test_clone_and_restore_are_independent():
+	round_, states = play_round(SCRIPT, (100, 100, 100))
+	state = states[0]
+	copy = state.clone()
+	copy.step(RAISE, 10)
+	assert flat(state) != flat(copy)
+	copy.restore(state)
+	assert flat(copy) == flat(state)
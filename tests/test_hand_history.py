@@ -0,0 +1,111 @@
+import pytest
+
+from poker.Agent import RandomAgent
+from poker.HandHistory import (HistoryReader, HistoryWriter, BIG_BLIND, CALL, FOLD, RAISE, SMALL_BLIND,
+	SHOWDOWN, WON)
+from poker.Poker import simulate
+from poker.Variant import Omaha
+
+'''
+Hands written by HistoryWriter read back from HistoryReader as they were played.
+'''
+
+KINDS = {'fold': FOLD, 'call': CALL, 'raise': RAISE}
+
+'''
+HistoryWriter that also keeps what it was told, in the shape HistoryReader gives it back.
+'''
+class RecordingWriter(HistoryWriter):
+
+	def __init__(self, path):
+		super().__init__(path)
+		self.expected = []
+
+	def event(self, name, **info):
+		if name == 'round_start':
+			self.order = info['round'].player_order
+			self.start = [player.money for player in self.order]
+			self.played, self.winners = [], set()
+		elif name == 'blind':
+			self.played.append((0, self.order.index(info['player']), SMALL_BLIND if info['type_'] == 'small' else BIG_BLIND, info['amount']))
+		elif name in KINDS:
+			amount = info['amount'] if name != 'fold' else 0
+			self.played.append((self.round.street, self.order.index(info['player']), KINDS[name], amount))
+		elif name == 'round_winner':
+			self.winners.add(info['player'].id)
+		elif name == 'round_end':
+			self.expected.append({
+				'board': [card.code for card in self.round.pot.cards],
+				'seats': [(player.id, stack, [card.code for card in player.hand.cards], player.money - stack)
+					for player, stack in zip(self.order, self.start)],
+				'actions': self.played,
+				'winners': self.winners,
+				'variant': self.round.variant.name if self.round.variant is not None else 'holdem',
+			})
+		super().event(name, **info)
+
+def record(path, hands, players, seed, variant = None):
+	with RecordingWriter(path) as writer:
+		simulate(hands, [RandomAgent(seed + i) for i in range(players)], seed=seed, observer=writer, variant=variant)
+	return writer.expected
+
+def check_round_trip(path, expected):
+	with HistoryReader(path) as reader:
+		hands = list(reader)
+		assert len(hands) == len(expected)
+		for hand, played in zip(hands, expected):
+			assert hand.variant == played['variant']
+			assert hand.board == played['board']
+			assert [(seat.id, seat.stack, seat.hole, seat.net) for seat in hand.seats] == played['seats']
+			assert [tuple(action) for action in hand.actions()] == played['actions']
+			assert {seat.id for seat in hand.seats if seat.result & WON} == played['winners']
+			assert sum(seat.net for seat in hand.seats) == 0
+
+def test_round_trip(tmp_path):
+	path = str(tmp_path / 'hands.phh')
+	expected = record(path, 300, 4, seed=5)
+	check_round_trip(path, expected)
+	assert any(len(played['board']) == 5 for played in expected)
+
+def test_omaha_round_trip(tmp_path):
+	path = str(tmp_path / 'omaha.phh')
+	expected = record(path, 100, 3, seed=6, variant=Omaha())
+	check_round_trip(path, expected)
+	assert all(len(seat[2]) == 4 for played in expected for seat in played['seats'])
+
+def test_filters(tmp_path):
+	path = str(tmp_path / 'hands.phh')
+	expected = record(path, 300, 4, seed=7)
+	with HistoryReader(path) as reader:
+		hands = list(reader)
+		assert reader.count(showdown=True) == sum(1 for hand in hands if hand.flags & SHOWDOWN) > 0
+		assert reader.count(showdown=False) == len(hands) - reader.count(showdown=True)
+		for player_id in (1, 2, 3, 4):
+			seated = [played for played in expected if player_id in [seat[0] for seat in played['seats']]]
+			assert reader.count(player=player_id) == len(seated)
+			assert reader.count(player=player_id, won=True) == sum(1 for played in seated if player_id in played['winners'])
+			for position in range(4):
+				found = list(reader.hands(player=player_id, position=position))
+				assert all(hand.seats[position].id == player_id for hand in found)
+			assert sum(reader.count(player=player_id, position=position) for position in range(4)) == len(seated)
+		with pytest.raises(ValueError):
+			reader.count(won=True)
+
+def test_record_cut_short_is_skipped(tmp_path):
+	path = str(tmp_path / 'hands.phh')
+	expected = record(path, 50, 3, seed=8)
+	with open(path, 'rb') as f:
+		data = f.read()
+	with open(path, 'wb') as f:
+		f.write(data[:-3]) # as if the process died while writing the last record
+	check_round_trip(path, expected[:-1])
+
+	# hands added after a crash follow on from the complete ones
+	more = record(path, 20, 3, seed=9)
+	check_round_trip(path, expected[:-1] + more)
+
+def test_writer_refuses_another_file(tmp_path):
+	path = tmp_path / 'other.bin'
+	path.write_bytes(b'not a hand history')
+	with pytest.raises(ValueError):
+		HistoryWriter(str(path))
@@ -0,0 +1,55 @@
+import pytest
+
+from poker.ICM import icm, icm_batch, monte_carlo_icm
+
+'''
+The Harville dynamic program and the Monte Carlo sampler against a naive recursion over finishing orders.
+'''
+
+'''
+ICM by brute force: each remaining player takes the next place with probability stack / chips left.
+'''
+def naive_icm(stacks, payouts):
+	equities = [0.0] * len(stacks)
+	def place(left, probability, depth):
+		if depth == len(payouts) or not left:
+			return
+		chips = sum(stacks[i] for i in left)
+		for i in left:
+			p = probability * stacks[i] / chips
+			equities[i] += p * payouts[depth]
+			place([j for j in left if j != i], p, depth + 1)
+	place(list(range(len(stacks))), 1.0, 0)
+	return equities
+
+CASES = [
+	([5000, 3000, 2000], [50, 30, 20]),
+	([1000, 1000, 1000], [60, 40]),
+	([7000, 1500, 1000, 500], [50, 30, 20]),
+	([4000, 3500, 1200, 800, 500], [40, 25, 15, 12, 8]),
+	([9000, 400, 300, 200, 100], [65, 35]),
+]
+
+@pytest.mark.parametrize('stacks, payouts', CASES)
+def test_exact_icm_matches_naive(stacks, payouts):
+	assert icm(stacks, payouts, cache=None) == pytest.approx(naive_icm(stacks, payouts), abs=1e-9)
+
+@pytest.mark.parametrize('stacks, payouts', CASES)
+def test_monte_carlo_icm_is_close_to_naive(stacks, payouts):
+	estimate = monte_carlo_icm(stacks, payouts, samples=200000, seed=1)
+	assert estimate == pytest.approx(naive_icm(stacks, payouts), abs=0.01 * sum(payouts))
+
+def test_icm_falls_back_to_monte_carlo():
+	stacks, payouts = CASES[3]
+	estimate = icm(stacks, payouts, max_states=1, seed=2, cache=None)
+	assert estimate == pytest.approx(naive_icm(stacks, payouts), abs=0.01 * sum(payouts))
+
+def test_batch_and_seat_order():
+	stacks, payouts = CASES[2]
+	rows = [stacks, stacks[::-1], [1500, 7000, 500, 1000]]
+	for row, equities in zip(rows, icm_batch(rows, payouts).tolist()):
+		assert equities == pytest.approx(naive_icm(row, payouts), abs=1e-9)
+
+def test_busted_players_get_nothing():
+	first, third = naive_icm([3000, 1000], [70, 30])
+	assert icm([3000, 0, 1000], [70, 30], cache=None) == pytest.approx([first, 0, third], abs=1e-9)
@@ -0,0 +1,69 @@
+from poker.Player import Player
+from poker.Pot import Pot, settle_layers
+
+'''
+Side pots: every chip put in is paid out, each layer to the best hands that paid into it.
+'''
+
+def players(*stacks):
+	return [Player(i + 1, stack) for i, stack in enumerate(stacks)]
+
+'''
+Each player bids their amount, as Player.bid does (all in when it is their whole stack).
+'''
+def bet(pot, bids):
+	for player, amount in bids:
+		player.bid(pot, amount)
+
+def test_multiway_all_ins_with_different_stacks():
+	a, b, c, d = players(10, 30, 100, 100)
+	pot = Pot()
+	bet(pot, [(a, 10), (b, 30), (c, 50), (d, 50)])
+	assert pot.is_all_in(a) and pot.is_all_in(b) and not pot.is_all_in(c)
+	assert pot.balanced()
+
+	payouts = pot.settle({a: 4, b: 3, c: 2, d: 2}, [a, b, c, d])
+	assert payouts == {a: 40, b: 60, c: 20, d: 20} # main pot, side pot, and the top layer split
+	assert sum(payouts.values()) == 140
+	assert [player.money for player in (a, b, c, d)] == [40, 60, 70, 70]
+
+def test_short_stack_winning_only_takes_the_main_pot():
+	a, b, c = players(20, 100, 100)
+	pot = Pot()
+	bet(pot, [(a, 20), (b, 60), (c, 60)])
+	payouts = pot.settle({a: 9, b: 5, c: 1}, [a, b, c])
+	assert payouts == {a: 60, b: 80}
+	assert sum(payouts.values()) == 140
+
+def test_split_pot_odd_chips_go_first_in_order():
+	a, b, c = players(100, 100, 100)
+	pot = Pot()
+	bet(pot, [(a, 5), (b, 5), (c, 5)])
+	payouts = pot.settle({a: 7, b: 7, c: 1}, [b, c, a])
+	assert payouts == {b: 8, a: 7}
+
+	payouts = settle_layers([(a, 5), (b, 5), (c, 6)], {a: 7, b: 7, c: 7}, [c, a, b])
+	assert payouts == {c: 6, a: 5, b: 5}
+	payouts = settle_layers([(a, 4), (b, 4), (c, 3)], {a: 7, b: 7, c: 7}, [b, c, a])
+	assert payouts == {b: 4, c: 3, a: 4} # 9 chips three ways, then the 2 above c split between b and a
+
+def test_top_bettor_who_folds_leaves_their_chips_in_the_pot():
+	a, b, c = players(100, 100, 100)
+	pot = Pot()
+	bet(pot, [(a, 10), (b, 30), (c, 10)])
+	assert not pot.balanced() and pot.amount_to_call(a) == 20
+
+	pot.remove_player(b)
+	assert pot.highest_bet == 10
+	assert pot.balanced() and pot.amount_to_call(a) == 0
+	assert pot.folded_money == 30
+
+	payouts = pot.settle({a: 1, c: 2}, [a, b, c])
+	assert payouts == {c: 50} # b's chips go to the best hand still in
+	assert sum(player.money for player in (a, b, c)) == 300
+
+def test_folded_player_is_never_paid():
+	a, b, c = players(50, 50, 50)
+	payouts = settle_layers([(a, 50), (b, 20), (c, 50)], {a: 1, c: 1}, [a, b, c])
+	assert b not in payouts
+	assert payouts == {a: 60, c: 60}
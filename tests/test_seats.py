@@ -0,0 +1,70 @@
+from poker.Agent import CallingStationAgent
+from poker.Poker import Poker
+from poker.Seats import SeatRing
+
+'''
+SeatRing turn order, and the dealer and blinds moving around a table as players go bust.
+'''
+
+def test_remove_while_iterating():
+	ring = SeatRing('ABCDE')
+	seen = []
+	for player in ring:
+		seen.append(player)
+		ring.remove(player)
+		if player == 'B':
+			ring.remove('D') # someone further round goes too
+	assert seen == list('ABCDE') # iteration runs over the players in when it started
+	assert len(ring) == 0 and ring.head is None and list(ring) == []
+
+def test_next_active_skips_and_survives_removed_seats():
+	ring = SeatRing('ABCDE')
+	ring.remove('C')
+	ring.remove('D')
+	assert ring.next_active('B') == 'E'
+	assert ring.next_active('C') == 'E' # from a seat that is out
+	assert ring.next_active('E') == 'A'
+	assert list(ring) == ['A', 'B', 'E']
+	assert ring.order_after('B') == ['E', 'A', 'B']
+	assert 'C' not in ring and 'A' in ring
+	ring.remove('A')
+	ring.remove('B')
+	assert ring.winner() == 'E'
+
+def game(players, dealer):
+	game = Poker(100, seed=0, agents=[CallingStationAgent() for i in range(players)])
+	game.initialize(dealer=dealer)
+	return game
+
+def ids(players):
+	return [player.id for player in players]
+
+def test_blinds_skip_busted_seats():
+	table = game(5, dealer=1)
+	table.players[1].money = 0 # player 2, left of the dealer, goes bust
+	table.remove_bankrupt_players()
+	round_ = table.new_round()
+	assert (round_.small_blind.id, round_.big_blind.id) == (3, 4)
+	assert ids(round_.player_order) == [3, 4, 5, 1]
+
+def test_dealer_moves_past_busted_players():
+	table = game(5, dealer=2)
+	table.new_round()
+	table.players[1].money = 0 # the dealer goes bust
+	table.players[2].money = 0 # and so does the next seat
+	table.end_round()
+	assert table.dealer.id == 4
+	assert ids(table.players_left) == [1, 4, 5]
+	round_ = table.new_round()
+	assert (round_.small_blind.id, round_.big_blind.id) == (5, 1)
+
+def test_heads_up_dealer_rotation():
+	table = game(3, dealer=3)
+	table.players[0].money = 0
+	table.end_round()
+	dealers = []
+	for hand in range(4):
+		dealers.append(table.dealer.id)
+		table.new_round()
+		table.end_round()
+	assert dealers == [2, 3, 2, 3]
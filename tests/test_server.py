@@ -0,0 +1,54 @@
+import asyncio
+import json
+
+from poker.Server import GameServer
+
+'''
+The id a player is welcomed with is the id the game gives them, even after someone leaves the waiting table.
+'''
+
+async def join(address):
+	reader, writer = await asyncio.open_connection(*address)
+	writer.write(b'{"type": "join"}\n')
+	welcome = json.loads(await reader.readline())
+	return reader, writer, welcome['player']
+
+'''
+Fold every decision and return the ids the game used for this player's own folds.
+'''
+async def play(reader, writer):
+	ids, answered = [], False
+	while True:
+		line = await reader.readline()
+		if not line:
+			return ids
+		message = json.loads(line)
+		if message['type'] == 'decide':
+			writer.write(b'f\n')
+			answered = True
+		elif message['type'] == 'event' and message['name'] == 'fold' and answered:
+			ids.append(message['player'])
+			answered = False
+		elif message['type'] == 'game_over':
+			writer.close()
+			return ids
+
+async def leave_then_fill_table():
+	server = GameServer(table_size=3, max_rounds=4, seed=0)
+	listener = await server.serve(port=0)
+	address = listener.sockets[0].getsockname()[:2]
+	a_reader, a_writer, a = await join(address)
+	b = await join(address)
+	a_writer.close()
+	await asyncio.sleep(0.05) # the server sees A leave before C and D join
+	c = await join(address)
+	d = await join(address)
+	games = await asyncio.wait_for(asyncio.gather(*[play(reader, writer) for reader, writer, id_ in (b, c, d)]), 10)
+	listener.close()
+	return a, [id_ for reader, writer, id_ in (b, c, d)], games
+
+def test_welcome_ids_are_the_game_ids():
+	a, ids, games = asyncio.run(leave_then_fill_table())
+	assert a not in ids and len(set(ids)) == 3
+	for id_, folds in zip(ids, games):
+		assert folds and set(folds) == {id_}
@@ -0,0 +1,21 @@
+from poker.Solver import BettingTree, DECISION
+
+'''
+A decision's key has to identify it: every node with the key offers the same actions, and keys are unique.
+'''
+
+def test_decision_keys_are_unique():
+	tree = BettingTree()
+	assert len(set(tree.keys)) == len(tree.keys) == len(tree.decision_nodes)
+
+def test_nodes_sharing_a_decision_offer_the_same_actions():
+	tree = BettingTree(stack=40)
+	for node in range(len(tree)):
+		if tree.kinds[node] == DECISION:
+			first = tree.decision_nodes[tree.decisions[node]]
+			assert tree._child_actions(node) == tree._child_actions(first)
+
+def test_first_to_act_and_acting_after_a_check_are_different_decisions():
+	tree = BettingTree()
+	flop = [key for key in tree.keys if key[0] == 1 and key[2] == 0 and key[4] == key[5] == 2]
+	assert sorted(key[3] for key in flop) == [1, 2] # actions left: first to act, then after a check
@@ -0,0 +1,67 @@
+import itertools
+import random
+
+from poker.Card import Card
+from poker.Evaluator import evaluate, evaluate5, FLUSH, FOUR_OF_A_KIND, FULL_HOUSE, STRAIGHT, STRAIGHT_FLUSH
+from poker.Variant import Omaha, ShortDeck
+
+'''
+Omaha uses exactly two hole cards; the short deck ranks A-6-7-8-9 as a straight and a flush over a full house.
+'''
+
+def cards(text):
+	values = {'T': 10, 'J': 11, 'Q': 12, 'K': 13, 'A': 14}
+	suits = {'h': 'Hearts', 'd': 'Diamonds', 'c': 'Clubs', 's': 'Spades'}
+	return [Card(values.get(name[0]) or int(name[0]), suits[name[1]]) for name in text.split()]
+
+def test_omaha_uses_exactly_two_hole_cards():
+	omaha = Omaha()
+	# four hearts in the hand and one on the board: a royal flush in hold'em, not even a flush in Omaha
+	hole, board = cards('Ah Kh Qh Jh'), cards('Th 2c 3d 4s 9c')
+	assert evaluate([card.bits for card in hole + board]) > omaha.score(hole, board)
+	assert omaha.category(omaha.score(hole, board)) not in (FLUSH, STRAIGHT_FLUSH)
+	# four board hearts and one in the hand: still no flush
+	hole, board = cards('Ah Kc Qd Js'), cards('5h 6h 7h 8h 2c')
+	assert omaha.category(omaha.score(hole, board)) != FLUSH
+	# quads need two of them from the hand
+	hole, board = cards('Ah Kd 2s 3s'), cards('As Ad Ac 5c 6d')
+	assert omaha.category(omaha.score(hole, board)) == FOUR_OF_A_KIND
+
+def test_omaha_matches_brute_force():
+	omaha, rng = Omaha(), random.Random(0)
+	for deal in range(500):
+		dealt = rng.sample(Card.CARDS, 9)
+		hole, board = dealt[:4], dealt[4:]
+		best = max(evaluate5(*[card.bits for card in pair + triple])
+			for pair in itertools.combinations(hole, 2) for triple in itertools.combinations(board, 3))
+		assert omaha.score(hole, board) == best
+
+def test_short_deck_wheel_is_a_straight():
+	short = ShortDeck()
+	wheel = short.evaluate5(*[card.bits for card in cards('Ah 6d 7c 8s 9h')])
+	assert short.category(wheel) == STRAIGHT
+	assert wheel < short.evaluate5(*[card.bits for card in cards('6h 7d 8c 9s Th')]) # the lowest straight
+	assert wheel > short.evaluate5(*[card.bits for card in cards('Ah Ad Ac 8s 9h')]) # above three of a kind
+
+def test_short_deck_flush_beats_full_house():
+	short = ShortDeck()
+	flush = short.evaluate5(*[card.bits for card in cards('6h 7h 9h Jh Kh')])
+	full_house = short.evaluate5(*[card.bits for card in cards('Ah Ad Ac Ks Kh')])
+	assert short.category(flush) == FLUSH and short.category(full_house) == FULL_HOUSE
+	assert flush > full_house
+	# with seven cards holding both, the flush is the hand
+	seven = [card.bits for card in cards('Kh Kd Ks 7h 7d 9h Jh')]
+	assert short.category(short.evaluate(seven[:2], seven[2:])) == FULL_HOUSE
+	seven = [card.bits for card in cards('Kh Kd Ks 7h 6h 9h Jh')]
+	assert short.category(short.evaluate(seven[:2], seven[2:])) == FLUSH
+
+def test_short_deck_matches_brute_force():
+	short, rng = ShortDeck(), random.Random(1)
+	for deal in range(500):
+		dealt = [card.bits for card in rng.sample(short.cards, 7)]
+		best = max(short.evaluate5(*five) for five in itertools.combinations(dealt, 5))
+		assert short.evaluate(dealt[:2], dealt[2:]) == best
+
+def test_short_deck_has_36_cards():
+	assert len(ShortDeck().cards) == 36
+	assert min(card.value for card in ShortDeck().cards) == 6